@@ -0,0 +1,155 @@
+import csv
+import time
+from typing import Dict, Iterable, Iterator, List, Sequence
+
+LOAD_MODES = ('infile', 'executemany', 'values')
+
+# Placeholder style, duplicate-key clause and bind-parameter ceiling per driver.
+# sqlite3 stands in for MySQL in benchmarks and tests; mysql.connector is the real target.
+DIALECTS = {
+    'mysql': {'param': '%s', 'insert': 'INSERT IGNORE INTO', 'max_params': 65535},
+    'sqlite': {'param': '?', 'insert': 'INSERT OR IGNORE INTO', 'max_params': 32766},
+}
+
+
+def read_header(path: str) -> List[str]:
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        return next(csv.reader(f))
+
+
+def iter_csv_chunks(path: str, chunk_rows: int) -> Iterator[List[tuple]]:
+    """Yield the data rows of a CSV as lists of at most `chunk_rows` tuples; empty fields become None.
+
+    As with pd.read_csv, blank lines are skipped and short rows are padded with None; a row
+    with more fields than the header raises ValueError with its line number.
+    """
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.reader(f)
+        width = len(next(reader, []))
+        chunk = []
+        for row in reader:
+            if not row:
+                continue
+            if len(row) != width:
+                if len(row) > width:
+                    raise ValueError(f"{path}, line {reader.line_num}: expected {width} fields, saw {len(row)}")
+                row += [''] * (width - len(row))
+            chunk.append(tuple([None if value == '' else value for value in row]) if '' in row else tuple(row))
+            if len(chunk) >= chunk_rows:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+class BulkLoader:
+    """Streams CSV files into tables in fixed-size chunks, so memory is bounded by `chunk_rows`.
+
+    Modes:
+      infile      — LOAD DATA LOCAL INFILE; the server parses the file itself. The connection needs
+                    allow_local_infile=True; if the server refuses, the load falls back to executemany.
+      executemany — cursor.executemany per chunk, one commit per chunk.
+      values      — one multi-row INSERT ... VALUES (...), (...) per chunk.
+    """
+
+    def __init__(self, conn, dialect: str = 'mysql', chunk_rows: int = 5000):
+        if dialect not in DIALECTS:
+            raise ValueError(f"Unknown dialect {dialect!r}; expected one of {', '.join(DIALECTS)}")
+        self.conn = conn
+        self.dialect = dialect
+        self.chunk_rows = max(1, chunk_rows)
+        self._syntax = DIALECTS[dialect]
+
+    def load(self, table: str, path: str, mode: str = 'executemany', profile=None) -> Dict:
+        """Load one CSV; returns {'table', 'mode', 'rows', 'inserted', 'batches', 'seconds', 'rows_per_sec'}.
+
+        `profile` is a csv_profiler.CSVProfile whose spooled chunks replace re-reading `path`.
+        """
+        if mode not in LOAD_MODES:
+            raise ValueError(f"Unknown load mode {mode!r}; expected one of {', '.join(LOAD_MODES)}")
+        start = time.perf_counter()
+        fallback = None
+        if mode == 'infile':
+            try:
+                stats = self._load_infile(table, path)
+            except Exception as e:
+                # Typically local_infile=0 on the server or a connection opened without allow_local_infile
+                self.conn.rollback()
+                fallback, mode = f"LOAD DATA LOCAL INFILE refused ({e})", 'executemany'
+        if mode != 'infile':
+            if profile is not None and profile.spooled:
+                stats = self.load_chunks(table, profile.columns, profile.replay(), mode)
+            else:
+                stats = self.load_chunks(table, read_header(path), iter_csv_chunks(path, self.chunk_rows), mode)
+        seconds = time.perf_counter() - start
+        stats.update(table=table, mode=mode, seconds=round(seconds, 3),
+                     rows_per_sec=round(stats['rows'] / seconds) if seconds > 0 else 0)
+        if fallback:
+            stats['fallback'] = fallback
+        return stats
+
+    def load_chunks(self, table: str, columns: Sequence[str], chunks: Iterable[List[tuple]],
+                    mode: str = 'executemany') -> Dict:
+        """Insert already-parsed row chunks — the entry point for callers that read the CSV themselves"""
+        cur = self.conn.cursor()
+        rows = inserted = batches = 0
+        try:
+            for chunk in chunks:
+                if mode == 'values':
+                    inserted += self._insert_values(cur, table, columns, chunk)
+                else:
+                    cur.executemany(self._insert_sql(table, columns, 1), chunk)
+                    inserted += cur.rowcount if cur.rowcount >= 0 else len(chunk)
+                self.conn.commit()
+                rows += len(chunk)
+                batches += 1
+        finally:
+            cur.close()
+        return {'rows': rows, 'inserted': inserted, 'batches': batches}
+
+    def _insert_sql(self, table: str, columns: Sequence[str], row_count: int) -> str:
+        row = '(' + ', '.join([self._syntax['param']] * len(columns)) + ')'
+        return (f"{self._syntax['insert']} {table} ({', '.join(columns)}) VALUES "
+                + ', '.join([row] * row_count))
+
+    def _insert_values(self, cur, table: str, columns: Sequence[str], chunk: List[tuple]) -> int:
+        # A chunk wider than the driver's bind-parameter ceiling is split across statements
+        per_statement = max(1, min(len(chunk), self._syntax['max_params'] // max(1, len(columns))))
+        full_sql = self._insert_sql(table, columns, per_statement)
+        inserted = 0
+        for i in range(0, len(chunk), per_statement):
+            part = chunk[i:i + per_statement]
+            sql = full_sql if len(part) == per_statement else self._insert_sql(table, columns, len(part))
+            cur.execute(sql, [value for row in part for value in row])
+            inserted += cur.rowcount if cur.rowcount >= 0 else len(part)
+        return inserted
+
+    def _load_infile(self, table: str, path: str) -> Dict:
+        if self.dialect != 'mysql':
+            raise RuntimeError(f"LOAD DATA LOCAL INFILE needs MySQL, not {self.dialect}")
+        columns = read_header(path)
+        cur = self.conn.cursor()
+        try:
+            cur.execute(self._infile_sql(table, path, columns))
+            inserted = cur.rowcount
+        finally:
+            cur.close()
+        self.conn.commit()
+        return {'rows': inserted, 'inserted': inserted, 'batches': 1}
+
+    @staticmethod
+    def _infile_sql(table: str, path: str, columns: Sequence[str]) -> str:
+        with open(path, 'rb') as f:
+            first_line = f.readline()
+        eol = '\\r\\n' if first_line.endswith(b'\r\n') else '\\n'
+        # Forward slashes work on Windows too; quotes are doubled inside the string literal
+        literal = path.replace('\\', '/').replace("'", "''")
+        variables = ', '.join(f"@v{i}" for i in range(len(columns)))
+        # Empty fields become NULL, as in the chunked modes
+        assignments = ', '.join(f"{column} = NULLIF(@v{i}, '')" for i, column in enumerate(columns))
+        return (f"LOAD DATA LOCAL INFILE '{literal}' IGNORE INTO TABLE {table} "
+                "CHARACTER SET utf8mb4 "
+                "FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' ESCAPED BY '' "
+                f"LINES TERMINATED BY '{eol}' IGNORE 1 LINES "
+                f"({variables}) SET {assignments}")
+
@@ -0,0 +1,195 @@
+import heapq
+import os
+import pickle
+import re
+from typing import Dict, Iterator, List, Optional
+
+from bulk_loader import iter_csv_chunks, read_header
+
+# Column kinds from narrowest to widest; a column only ever widens
+KINDS = ('int', 'decimal', 'date', 'datetime', 'text')
+
+# One regex call per column per chunk: the chunk's values are joined by newlines and matched at once
+CHUNK_PATTERNS = {
+    'int': re.compile(r"(?:[+-]?(?:0|[1-9]\d*)\n)*[+-]?(?:0|[1-9]\d*)"),
+    'decimal': re.compile(r"(?:[+-]?(?:(?:0|[1-9]\d*)(?:\.\d*)?|\.\d+)\n)*[+-]?(?:(?:0|[1-9]\d*)(?:\.\d*)?|\.\d+)"),
+    'date': re.compile(r"(?:\d{4}-\d{2}-\d{2}\n)*\d{4}-\d{2}-\d{2}"),
+    'datetime': re.compile(r"(?:\d{4}-\d{2}-\d{2}(?:[ T]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?)?\n)*"
+                           r"\d{4}-\d{2}-\d{2}(?:[ T]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?)?"),
+}
+SKETCH_SIZE = 1024  # KMV sketch: distinct counts are exact up to here, ~3% error beyond
+HASH_SPACE = 2 ** 64
+HASH_MASK = HASH_SPACE - 1
+INT_RANGE = 2 ** 31
+BIGINT_RANGE = 2 ** 63
+MAX_DECIMAL_PRECISION = 65  # MySQL's DECIMAL(p, s) limits
+MAX_DECIMAL_SCALE = 30
+
+
+class ColumnProfile:
+    """Running statistics for one CSV column, updated one chunk of values at a time"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.kind = KINDS[0]
+        self.count = 0
+        self.nulls = 0
+        self.max_length = 0
+        self.minimum = None
+        self.maximum = None
+        self.int_digits = 0  # widest integer part, for DECIMAL(p, s)
+        self.scale = 0       # most digits after the point
+        self._sketch = []    # max-heap (negated) of the SKETCH_SIZE smallest value hashes
+        self._sketched = set()
+
+    def update(self, values: List[Optional[str]]):
+        present = [v for v in values if v is not None]
+        self.count += len(values)
+        self.nulls += len(values) - len(present)
+        if not present:
+            return
+        self.max_length = max(self.max_length, max(map(len, present)))
+        self._widen(present)
+        self._update_range(present)
+        self._update_sketch(set(present))
+
+    def _widen(self, present: List[str]):
+        if self.kind == 'text':
+            return
+        joined = '\n'.join(present)
+        kind = next(k for k in KINDS[KINDS.index(self.kind):] if k == 'text' or CHUNK_PATTERNS[k].fullmatch(joined))
+        if kind in ('date', 'datetime') and self.minimum is not None and self.kind in ('int', 'decimal'):
+            kind = 'text'  # numbers in earlier chunks, dates in this one
+        if kind == 'text':
+            self.minimum = self.maximum = None
+        self.kind = kind
+
+    def _update_range(self, present: List[str]):
+        if self.kind == 'text':
+            return
+        if self.kind == 'int':
+            low, high = min(map(int, present)), max(map(int, present))
+            self.int_digits = max(self.int_digits, len(str(max(abs(low), abs(high)))))
+        elif self.kind == 'decimal':
+            numbers = list(map(float, present))
+            low, high = min(numbers), max(numbers)
+            fractions = [v.partition('.')[2] for v in present]
+            self.scale = max(self.scale, max(map(len, fractions)))
+            self.int_digits = max(self.int_digits, len(str(int(max(abs(low), abs(high))))))
+        else:
+            # ISO dates and timestamps sort as strings
+            low, high = min(present), max(present)
+        self.minimum = low if self.minimum is None else min(self.minimum, low)
+        self.maximum = high if self.maximum is None else max(self.maximum, high)
+
+    def _update_sketch(self, distinct: set):
+        sketch, kept = self._sketch, self._sketched
+        threshold = -sketch[0] if len(sketch) >= SKETCH_SIZE else HASH_SPACE
+        for h in [h for h in {hash(v) & HASH_MASK for v in distinct} if h < threshold and h not in kept]:
+            if len(sketch) < SKETCH_SIZE:
+                heapq.heappush(sketch, -h)
+            elif h < -sketch[0]:
+                kept.discard(-heapq.heappushpop(sketch, -h))
+            else:
+                continue
+            kept.add(h)
+
+    @property
+    def distinct(self) -> int:
+        """Estimated distinct non-null values (k-minimum-values sketch)"""
+        if len(self._sketch) < SKETCH_SIZE:
+            return len(self._sketch)
+        return int((SKETCH_SIZE - 1) * HASH_SPACE / -self._sketch[0])
+
+    def sql_type(self) -> str:
+        """Narrowest MySQL type that holds every value seen"""
+        if self.count == self.nulls:
+            return 'VARCHAR(255)'
+        if self.kind == 'int':
+            if -INT_RANGE <= self.minimum and self.maximum < INT_RANGE:
+                return 'INT'
+            if -BIGINT_RANGE <= self.minimum and self.maximum < BIGINT_RANGE:
+                return 'BIGINT'
+            return f"DECIMAL({self.int_digits},0)" if self.int_digits <= MAX_DECIMAL_PRECISION else 'DOUBLE'
+        if self.kind == 'decimal':
+            precision = max(1, self.int_digits + self.scale)
+            if precision > MAX_DECIMAL_PRECISION or self.scale > MAX_DECIMAL_SCALE:
+                return 'DOUBLE'  # wider than any DECIMAL MySQL accepts
+            return f"DECIMAL({precision},{self.scale})"
+        if self.kind == 'date':
+            return 'DATE'
+        if self.kind == 'datetime':
+            return 'DATETIME'
+        return f"VARCHAR({self.max_length})" if self.max_length <= 16383 else 'TEXT'
+
+    def details(self) -> str:
+        parts = [self.sql_type(), f"{self.nulls:,} nulls" if self.nulls else "no nulls"]
+        if self.minimum is not None:
+            parts.append(f"range {self.minimum}..{self.maximum}")
+        if self.kind == 'text':
+            parts.append(f"max length {self.max_length}")
+        distinct = self.distinct
+        present = self.count - self.nulls
+        approximate = '~' if len(self._sketch) >= SKETCH_SIZE else ''
+        parts.append("unique" if present and distinct >= present else f"{approximate}{distinct:,} distinct")
+        return ", ".join(parts)
+
+
+class CSVProfile:
+    """One streaming pass over a CSV: column statistics for the DDL prompt, and (optionally) a spool
+    of the parsed chunks that the loader replays instead of reading and parsing the CSV again.
+
+    The spool is a second, larger copy of the data in local temp storage: it saves the loader's parse
+    at the price of that disk space and write I/O, so it is meant for sources on a slow network share."""
+
+    def __init__(self, path: str, columns: List[str]):
+        self.path = path
+        self.columns = columns
+        self.rows = 0
+        self.chunks = 0
+        self.column_profiles = [ColumnProfile(name) for name in columns]
+        self.spool_path = None
+
+    def update(self, chunk: List[tuple]):
+        # zip(*rows) stops at the shortest row: skip blank rows and pad short ones so every column sees every row
+        width = len(self.columns)
+        rows = [row if len(row) == width else tuple(row[:width]) + (None,) * (width - len(row)) for row in chunk if row]
+        self.rows += len(rows)
+        self.chunks += 1
+        for profile, values in zip(self.column_profiles, zip(*rows)):
+            profile.update(values)
+
+    @property
+    def spooled(self) -> bool:
+        return self.spool_path is not None and os.path.exists(self.spool_path)
+
+    def replay(self) -> Iterator[List[tuple]]:
+        """The spooled chunks, in file order"""
+        with open(self.spool_path, 'rb') as f:
+            for _ in range(self.chunks):
+                yield pickle.load(f)
+
+    def describe(self) -> str:
+        header = f"CSV: {os.path.basename(self.path)} ({self.rows:,} rows)\n"
+        return header + "".join(f"- {p.name}: {p.details()}\n" for p in self.column_profiles)
+
+    def summary(self) -> Dict:
+        return {p.name: p.details() for p in self.column_profiles}
+
+
+def profile_csv(path: str, chunk_rows: int = 5000, spool_dir: Optional[str] = None) -> CSVProfile:
+    """Profile a CSV in chunks of `chunk_rows`; with `spool_dir` (slow shares only), keep the parsed chunks for the loader"""
+    profile = CSVProfile(path, read_header(path))
+    spool = None
+    if spool_dir:
+        profile.spool_path = os.path.join(spool_dir, os.path.basename(path) + '.chunks')
+        spool = open(profile.spool_path, 'wb')
+    try:
+        for chunk in iter_csv_chunks(path, chunk_rows):
+            profile.update(chunk)
+            if spool:
+                pickle.dump(chunk, spool, protocol=pickle.HIGHEST_PROTOCOL)
+    finally:
+        if spool:
+            spool.close()
+    return profile
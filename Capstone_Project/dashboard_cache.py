@@ -0,0 +1,105 @@
+import hashlib
+import json
+import os
+import time
+from typing import Callable, Dict, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+CACHE_VERSION = 1  # bump when a cleaning function changes what a cached table holds
+
+
+def file_sha256(path: str, block_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def write_arrow(df: pd.DataFrame, data_path: str):
+    """Write `df` as an uncompressed Arrow IPC file, atomically"""
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    tmp_path = data_path + '.tmp'
+    with pa.OSFile(tmp_path, 'wb') as sink, ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    # Readers never see a half-written file
+    os.replace(tmp_path, data_path)
+
+
+class DashboardCache:
+    """Cleaned, typed copies of the dashboard's CSVs as uncompressed Arrow IPC files, memory-mapped on read.
+
+    A cached table is used as long as its CSV's size and mtime are unchanged. When they change
+    but the content hash does not (a re-copy, a touch), only the stored mtime is refreshed;
+    otherwise the CSV is parsed and cleaned once more and the cache file replaced.
+    """
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+        self.stats = {}  # name -> {'source': 'cache' | 'revalidated' | 'rebuilt', 'ms': float}
+
+    def load(self, name: str, csv_path: str, clean: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None) -> pd.DataFrame:
+        start = time.perf_counter()
+        meta_path = os.path.join(self.cache_dir, f"{name}.json")
+        stat = os.stat(csv_path)
+        meta = self._read_meta(meta_path)
+        usable = (meta is not None and meta.get('version') == CACHE_VERSION
+                  and meta.get('source') == os.path.abspath(csv_path)
+                  and os.path.exists(os.path.join(self.cache_dir, meta.get('data_file', ''))))
+        source = 'cache'
+        if not (usable and meta['size'] == stat.st_size and meta['mtime_ns'] == stat.st_mtime_ns):
+            digest = file_sha256(csv_path)
+            if usable and meta['sha256'] == digest:
+                source = 'revalidated'
+                data_file = meta['data_file']
+            else:
+                # A new name per content: a file still mapped by an earlier reader is never overwritten
+                data_file = f"{name}.{digest[:16]}.arrow"
+                self._build(csv_path, os.path.join(self.cache_dir, data_file), clean)
+                if usable and meta['data_file'] != data_file:
+                    self._remove(os.path.join(self.cache_dir, meta['data_file']))
+                source = 'rebuilt'
+            meta = {'version': CACHE_VERSION, 'source': os.path.abspath(csv_path), 'size': stat.st_size,
+                    'mtime_ns': stat.st_mtime_ns, 'sha256': digest, 'data_file': data_file}
+            self._write_meta(meta_path, meta)
+        df = self.read(os.path.join(self.cache_dir, meta['data_file']))
+        self.stats[name] = {'source': source, 'ms': (time.perf_counter() - start) * 1000}
+        return df
+
+    @staticmethod
+    def read(data_path: str) -> pd.DataFrame:
+        # The IPC file is uncompressed, so column buffers are views into the mapped file
+        return ipc.open_file(pa.memory_map(data_path, 'r')).read_all().to_pandas()
+
+    @staticmethod
+    def _build(csv_path: str, data_path: str, clean: Optional[Callable]):
+        df = pd.read_csv(csv_path)
+        if clean is not None:
+            df = clean(df)
+        write_arrow(df, data_path)
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass  # still mapped by a reader (Windows); the orphaned file is harmless
+
+    @staticmethod
+    def _read_meta(meta_path: str) -> Optional[Dict]:
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _write_meta(meta_path: str, meta: Dict):
+        tmp_path = meta_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, meta_path)
@@ -0,0 +1,106 @@
+import time
+from typing import Dict, Tuple
+
+import pandas as pd
+
+from bulk_loader import DIALECTS
+
+# Covering indexes: each dashboard aggregate scans one of these instead of the SALES rows
+DASHBOARD_INDEXES = {
+    'SALES': {
+        'ix_sales_date_amount': ('sale_date', 'total_amount'),
+        'ix_sales_customer_amount': ('customer_id', 'total_amount'),
+        'ix_sales_product_amount': ('product_id', 'total_amount'),
+    },
+    'INVENTORY': {'ix_inventory_stock': ('quantity_in_stock',)},
+}
+
+# First day of the sale's month, per dialect (SQLite keeps dates as ISO text, so a prefix is enough)
+MONTH_EXPR = {
+    'mysql': "DATE_FORMAT(sale_date, '%Y-%m-01')",
+    'sqlite': "substr(sale_date, 1, 7) || '-01'",
+}
+
+TOP_SQL = """SELECT t.{key}, d.{label}, t.total_amount
+FROM (SELECT {key}, SUM(total_amount) AS total_amount FROM SALES
+      GROUP BY {key} ORDER BY total_amount DESC LIMIT {limit}) t
+LEFT JOIN {dimension} d ON d.{key} = t.{key}
+ORDER BY t.total_amount DESC"""
+
+
+def dashboard_queries(dialect: str = 'mysql', low_stock_units: int = 100, top_n: int = 10) -> Dict[str, Tuple[str, tuple]]:
+    """The BI dashboard's aggregates as SQL over the migrated tables: {section: (sql, params)}"""
+    param = DIALECTS[dialect]['param']
+    return {
+        'totals': ("SELECT (SELECT COUNT(*) FROM CUSTOMERS) AS customers, (SELECT COUNT(*) FROM INVENTORY) AS products, "
+                   "COUNT(*) AS transactions, COALESCE(SUM(total_amount), 0) AS total_amount FROM SALES", ()),
+        # Days first, in (sale_date, total_amount) index order; the month expression then runs once per day
+        'monthly': (f"SELECT {MONTH_EXPR[dialect]} AS month, SUM(day_total) AS total_amount FROM "
+                    "(SELECT sale_date, SUM(total_amount) AS day_total FROM SALES "
+                    "WHERE sale_date IS NOT NULL GROUP BY sale_date) days GROUP BY month ORDER BY month", ()),
+        'top_customers': (TOP_SQL.format(key='customer_id', label='customer_name', dimension='CUSTOMERS', limit=int(top_n)), ()),
+        'top_products': (TOP_SQL.format(key='product_id', label='product_name', dimension='INVENTORY', limit=int(top_n)), ()),
+        'low_stock': (f"SELECT * FROM INVENTORY WHERE quantity_in_stock < {param} ORDER BY quantity_in_stock",
+                      (low_stock_units,)),
+    }
+
+
+def fetch_dashboard(conn, dialect: str = 'mysql', low_stock_units: int = 100,
+                    top_n: int = 10) -> Tuple[Dict[str, pd.DataFrame], Dict[str, Dict]]:
+    """Run every dashboard query; returns ({section: result rows}, {section: {'ms', 'rows'}})"""
+    frames, timings = {}, {}
+    cur = conn.cursor()
+    try:
+        for name, (sql, params) in dashboard_queries(dialect, low_stock_units, top_n).items():
+            start = time.perf_counter()
+            # No params, no placeholder pass: the month format's '%' must reach the server as-is
+            if params:
+                cur.execute(sql, params)
+            else:
+                cur.execute(sql)
+            rows = cur.fetchall()
+            frames[name] = pd.DataFrame.from_records(rows, columns=[d[0] for d in cur.description])
+            timings[name] = {'ms': (time.perf_counter() - start) * 1000, 'rows': len(rows)}
+    finally:
+        cur.close()
+    # DECIMAL columns arrive as Decimal objects
+    for frame in frames.values():
+        for col in ('total_amount', 'price_per_unit'):
+            if col in frame.columns:
+                frame[col] = frame[col].astype(float)
+    frames['monthly']['month'] = pd.to_datetime(frames['monthly']['month'], errors='coerce')
+    frames['monthly'] = frames['monthly'].dropna(subset=['month'])
+    return frames, timings
+
+
+def index_names(cur, dialect: str, table: str) -> set:
+    if dialect == 'sqlite':
+        cur.execute(f"PRAGMA index_list({table})")
+        return {row[1] for row in cur.fetchall()}
+    cur.execute("SELECT DISTINCT INDEX_NAME FROM information_schema.STATISTICS "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s", (table,))
+    return {row[0] for row in cur.fetchall()}
+
+
+def ensure_indexes(conn, dialect: str = 'mysql') -> Dict[str, str]:
+    """Create any missing DASHBOARD_INDEXES; returns {index: 'exists' | 'created in …' | 'not created: …'}"""
+    status = {}
+    cur = conn.cursor()
+    try:
+        for table, indexes in DASHBOARD_INDEXES.items():
+            existing = index_names(cur, dialect, table)
+            for name, columns in indexes.items():
+                if name in existing:
+                    status[name] = 'exists'
+                    continue
+                start = time.perf_counter()
+                try:
+                    cur.execute(f"CREATE INDEX {name} ON {table} ({', '.join(columns)})")
+                    status[name] = f"created in {time.perf_counter() - start:.2f}s"
+                except Exception as e:
+                    # e.g. a TEXT column the generated DDL chose, which MySQL cannot index whole
+                    status[name] = f"not created: {e}"
+        conn.commit()
+    finally:
+        cur.close()
+    return status
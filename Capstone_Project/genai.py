@@ -1,24 +1,81 @@
-import os, json
+import os, sys, json, shutil, tempfile, time
 from datetime import datetime
 import pandas as pd
 import mysql.connector
 import streamlit as st
 import plotly.express as px
-from groq import Groq
+
+# The LLM backends live with the SQL generation pipeline at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from llm_backend import create_backend
+from bulk_loader import LOAD_MODES
+from parallel_loader import ConnectionPool, ParallelLoader, table_dependencies
+from csv_profiler import profile_csv
+from dashboard_cache import DashboardCache
+from kpi_aggregates import LOW_STOCK_UNITS, KPIStore
+from dashboard_queries import ensure_indexes, fetch_dashboard
 
 DATA_DIR = r"C:\Users\PC\OneDrive\Desktop\sqlprojectwithGENAI\data"
+DASHBOARD_CACHE_DIR = os.path.join(".cache", "dashboard")  # typed Arrow copies of the CSVs, local to the app
+KPI_STORE_DIR = os.path.join(".cache", "kpis")  # materialized dashboard aggregates
+RESOURCE_TTL = 3600  # seconds a cached connection pool / LLM client is kept
+DATA_TTL = 600       # seconds cached dashboard data is kept, even if its CSVs look unchanged
+DASHBOARD_POOL_SIZE = 2
+DASHBOARD_MODES = ("CSV files", "MySQL (migrated tables)")
+
+# ---------------- CACHED RESOURCES ----------------
+# Shared by every rerun and session with the same settings, instead of being rebuilt per button press
+@st.cache_resource(ttl=RESOURCE_TTL, show_spinner=False)
+def get_llm_client(groq_key, base_url):
+    # A base URL without a Groq key means an OpenAI-compatible endpoint such as mock_llm_server.py
+    if groq_key:
+        return create_backend('groq', api_key=groq_key, base_url=base_url or None)
+    if base_url:
+        return create_backend('http', base_url=base_url)
+    return None
+
+def refresh_connection(conn):
+    # The dashboard's pooled connections outlive a run: reconnect one the server timed out, and end any
+    # transaction left open so the next run does not read an old snapshot
+    conn.ping(reconnect=True, attempts=2, delay=1)
+    conn.rollback()
+
+def open_mysql_pool(host, user, password, database, allow_local_infile, size):
+    setup = mysql.connector.connect(host=host, user=user, password=password)
+    try:
+        setup.cursor().execute(f"CREATE DATABASE IF NOT EXISTS {database}")
+    finally:
+        setup.close()
+    def connect():
+        return mysql.connector.connect(host=host, user=user, password=password, database=database,
+                                       allow_local_infile=allow_local_infile)
+    return ConnectionPool(connect, size, check=refresh_connection)
+
+@st.cache_resource(ttl=RESOURCE_TTL, show_spinner="Connecting to MySQL…")
+def get_mysql_pool(host, user, password, database):
+    # The dashboard's pool, shared by every session: its queries are short, so sessions take turns.
+    # Migrations open their own pool, sized for their loaders, so two runs never wait on each other
+    return open_mysql_pool(host, user, password, database, False, DASHBOARD_POOL_SIZE)
 
 class GenAIMigrationPipeline:
-    def __init__(self, mysql_config, groq_key, groq_model):
-        self.groq_client = Groq(api_key=groq_key) if groq_key else None
+    def __init__(self, mysql_config, groq_key, groq_model, base_url=None):
+        self.llm_client = get_llm_client(groq_key, base_url)
         self.config = {
             'model': groq_model or 'llama-3.3-70b-versatile',
             'temperature': 0.1,
-            'max_tokens': 2000
+            'max_tokens': 2000,
+            'load_mode': 'executemany',  # 'infile' (LOAD DATA LOCAL INFILE), 'executemany' or 'values'
+            'load_chunk_rows': 5000,     # rows per batch/commit — bounds memory, whatever the file size
+            'load_workers': 3,           # tables loaded at once, each on its own pooled connection
+            'defer_fk_checks': False,    # True: load every table at once with FOREIGN_KEY_CHECKS=0
+            'spool_chunks': False        # True: keep design_schema's parsed chunks for import_data (slow network shares)
         }
         self.mysql_config = mysql_config
+        self.pool = None        # this run's ConnectionPool: its own connection plus one per table load
         self.mysql_conn = None
         self.results = {}
+        self.profiles = {}      # table -> CSVProfile from design_schema's single pass over each CSV
+        self.spool_dir = None   # parsed chunks kept by that pass for import_data, when spool_chunks is set
         self.data_dir = DATA_DIR
 
     def check_csv_files(self):
@@ -29,34 +86,44 @@ class GenAIMigrationPipeline:
             st.stop()
 
     def connect_mysql(self):
+        settings = (self.mysql_config["host"], self.mysql_config["user"], self.mysql_config["password"],
+                    self.mysql_config["database"], self.config['load_mode'] == 'infile')
         try:
-            self.mysql_conn = mysql.connector.connect(
-                host=self.mysql_config["host"],
-                user=self.mysql_config["user"],
-                password=self.mysql_config["password"]
-            )
-            cur = self.mysql_conn.cursor()
-            cur.execute(f"CREATE DATABASE IF NOT EXISTS {self.mysql_config['database']}")
-            cur.execute(f"USE {self.mysql_config['database']}")
+            try:
+                self.pool = open_mysql_pool(*settings, self.config['load_workers'] + 1)
+            except mysql.connector.Error as e:
+                if self.config['load_workers'] == 1:
+                    raise
+                st.warning(f"Could not open {self.config['load_workers'] + 1} connections ({e}); "
+                           "loading one table at a time")
+                self.config['load_workers'] = 1
+                self.pool = open_mysql_pool(*settings, 2)
+            self.mysql_conn = self.pool.acquire()
             st.success(f"✓ Connected to MySQL `{self.mysql_config['database']}`")
         except mysql.connector.Error as e:
             st.error(f"MySQL connection failed: {e}")
             st.stop()
 
+    def close(self):
+        if self.pool is not None:
+            self.pool.close()
+            self.pool = None
+            self.mysql_conn = None
+
     def prompt_llm(self, system_prompt, user_prompt):
-        if not self.groq_client:
+        if not self.llm_client:
             return ""
         try:
-            resp = self.groq_client.chat.completions.create(
-                model=self.config['model'],
-                messages=[{"role": "system", "content": system_prompt},
-                          {"role": "user", "content": user_prompt}],
+            resp = self.llm_client.complete(
+                [{"role": "system", "content": system_prompt},
+                 {"role": "user", "content": user_prompt}],
+                self.config['model'],
                 temperature=self.config['temperature'],
                 max_tokens=self.config['max_tokens']
             )
-            return resp.choices[0].message.content.strip()
+            return resp['text'].strip()
         except Exception as e:
-            st.error(f"Groq API error: {e}")
+            st.error(f"LLM API error: {e}")
             return ""
 
     def drop_tables_if_exist(self):
@@ -67,14 +134,21 @@ class GenAIMigrationPipeline:
         st.info("Dropped existing tables (if any)")
 
     def design_schema(self):
+        # One chunked pass per CSV: full-file column statistics for the prompt. import_data streams the
+        # CSV again unless spool_chunks keeps the parsed chunks in local temp storage, a second and larger
+        # copy of the data that is only worth writing when the CSVs sit on a slow share
+        if self.config['spool_chunks'] and self.config['load_mode'] != 'infile':
+            self.spool_dir = tempfile.mkdtemp(prefix="genai_load_")
         schema_text = ""
         for csvfile in ["CUSTOMERS.csv","INVENTORY.csv","SALES.csv"]:
             path = os.path.join(self.data_dir, csvfile)
-            df = pd.read_csv(path, nrows=5)
-            schema_text += f"\nCSV: {csvfile}\n"
-            schema_text += "\n".join([f"- {c}: {str(df[c].dtype)}" for c in df.columns])+"\n"
+            profile = profile_csv(path, self.config['load_chunk_rows'], self.spool_dir)
+            self.profiles[csvfile.split(".")[0]] = profile
+            schema_text += "\n" + profile.describe()
+        self.results['csv_profiles'] = {table: p.summary() for table, p in self.profiles.items()}
 
-        sys_prompt = "Generate MySQL CREATE TABLE scripts with PK/FK. Return only SQL."
+        sys_prompt = ("Generate MySQL CREATE TABLE scripts with PK/FK. The column statistics come from a full "
+                      "scan of each CSV: use the suggested types and lengths. Return only SQL.")
         sql = self.prompt_llm(sys_prompt, schema_text)
         self.results['schema_sql'] = sql
 
@@ -90,22 +164,42 @@ class GenAIMigrationPipeline:
         st.success("Schema created")
 
     def import_data(self):
-        cur = self.mysql_conn.cursor()
-        for fname in ["CUSTOMERS.csv","INVENTORY.csv","SALES.csv"]:
-            path = os.path.join(self.data_dir, fname)
-            table = fname.split(".")[0]
-            df = pd.read_csv(path)
-            if table=="CUSTOMERS" and "phone_number" in df.columns:
-                df["phone_number"] = df["phone_number"].astype(str)
-            cols = ",".join(df.columns)
-            vals = ",".join(["%s"]*len(df.columns))
-            data = [tuple(r) for r in df.to_numpy()]
-            try:
-                cur.executemany(f"INSERT IGNORE INTO {table} ({cols}) VALUES ({vals})", data)
-                self.mysql_conn.commit()
-                st.success(f"Loaded {len(data)} rows into {table}")
-            except Exception as e:
-                st.error(f"Failed to load {table}: {e}")
+        # Streams each CSV in fixed-size chunks (values stay strings, so phone numbers keep their digits).
+        # Tables the generated DDL does not link load side by side; SALES waits for its parents.
+        files = {fname.split(".")[0]: os.path.join(self.data_dir, fname)
+                 for fname in ["CUSTOMERS.csv","INVENTORY.csv","SALES.csv"]}
+        dependencies = table_dependencies(self.results.get('schema_sql') or "")
+        # The pool holds one connection per worker besides the one this run already holds
+        loader = ParallelLoader(self.pool, mode=self.config['load_mode'], chunk_rows=self.config['load_chunk_rows'],
+                                defer_fk_checks=self.config['defer_fk_checks'],
+                                workers=min(self.config['load_workers'], len(files)))
+        try:
+            outcome = loader.load(files, dependencies, self.profiles)
+        finally:
+            if self.spool_dir:
+                shutil.rmtree(self.spool_dir, ignore_errors=True)
+                self.spool_dir = None
+
+        # Streamlit calls stay on this thread; the workers only return their stats
+        for stats in outcome['tables']:
+            if 'error' in stats:
+                st.error(f"Failed to load {stats['table']}: {stats['error']}")
+                continue
+            if 'fallback' in stats:
+                st.warning(f"{stats['table']}: {stats['fallback']} — used chunked executemany")
+            st.success(f"Loaded {stats['rows']:,} rows into {stats['table']} "
+                       f"({stats['mode']}, {stats['batches']} batches, {stats['rows_per_sec']:,} rows/s, "
+                       f"{stats['started']:.2f}–{stats['finished']:.2f}s, FK checks {stats['fk_checks']})")
+        table_time = sum(t['finished'] - t['started'] for t in outcome['tables'])
+        st.info(f"Load order: {' → '.join(', '.join(wave) for wave in outcome['waves'])} — "
+                f"{outcome['seconds']:.2f}s wall clock for {table_time:.2f}s of table loads "
+                f"({table_time / outcome['seconds'] if outcome['seconds'] else 1:.1f}× overlap)")
+        self.results['load_stats'] = outcome
+
+        # Built after the load, not maintained row by row during it; the dashboard's MySQL mode reads them
+        indexes = ensure_indexes(self.mysql_conn)
+        st.info("Dashboard indexes: " + ", ".join(f"{name} {state}" for name, state in indexes.items()))
+        self.results['dashboard_indexes'] = indexes
 
     def validate_data(self):
         sys_prompt = """Write SQL to:
@@ -161,6 +255,90 @@ class GenAIMigrationPipeline:
         with open(outpath,"w") as f: f.write(md)
         st.success(f"Report saved: {outpath}")
 
+# Dashboard type coercions — applied once per CSV version, then persisted in the Arrow cache
+def clean_customers(customers):
+    if "join_date" in customers.columns:
+        customers["join_date"] = pd.to_datetime(customers["join_date"], errors="coerce")
+    return customers
+
+def clean_inventory(inventory):
+    for col in ["price_per_unit","quantity_in_stock"]:
+        if col in inventory.columns:
+            inventory[col] = pd.to_numeric(inventory[col], errors="coerce").fillna(0)
+    return inventory
+
+def clean_sales(sales):
+    if "sale_date" in sales.columns:
+        sales["sale_date"] = pd.to_datetime(sales["sale_date"], errors="coerce")
+    for col in ["total_amount","quantity"]:
+        if col in sales.columns:
+            sales[col] = pd.to_numeric(sales[col], errors="coerce").fillna(0)
+    return sales
+
+def file_stamp(path):
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+@st.cache_data(ttl=DATA_TTL, max_entries=4, show_spinner="Loading dashboard data…")
+def load_dashboard_data(customers_path, inventory_path, sales_path, stamps):
+    # `stamps` (size, mtime of each CSV) only keys the cache: an edited CSV misses it, and the
+    # Arrow cache and KPI store below then re-check the content hash before re-parsing anything
+    cache = DashboardCache(DASHBOARD_CACHE_DIR)
+    customers = cache.load("CUSTOMERS", customers_path, clean_customers)
+    inventory = cache.load("INVENTORY", inventory_path, clean_inventory)
+    # SALES is never loaded whole: only rows appended since the last render are folded into the summaries
+    kpis = KPIStore(KPI_STORE_DIR).refresh_sales(sales_path, clean_sales).refresh_stock(inventory_path, inventory)
+    sources = [f"{name} {s['source']} in {s['ms']:.0f} ms" for name, s in cache.stats.items()]
+    sources += [f"{name} aggregates {s['source']} (+{s['rows']:,} rows) in {s['ms']:.0f} ms"
+                for name, s in kpis.stats.items()]
+    return {"customers": customers, "inventory": inventory, "totals": dict(kpis.totals),
+            "monthly": kpis.summary("monthly"), "by_customer": kpis.summary("by_customer"),
+            "by_product": kpis.summary("by_product"), "low_stock": kpis.summary("low_stock"),
+            "stock_history": list(kpis.stock_history), "sources": sources,
+            "loaded_at": datetime.now().strftime("%H:%M:%S")}
+
+def csv_dashboard(paths):
+    # Dashboard sections from the CSVs (session cache → Arrow cache / KPI store); returns (view, timings)
+    start = time.perf_counter()
+    data = load_dashboard_data(*paths, tuple(file_stamp(p) for p in paths))
+    loaded = time.perf_counter()
+    customers, inventory = data["customers"], data["inventory"]
+    top_customers = data["by_customer"].nlargest(10, "total_amount")[["customer_id", "total_amount"]]
+    top_customers = top_customers.merge(customers, on="customer_id", how="left")
+    top_products = data["by_product"].nlargest(10, "total_amount")[["product_id", "total_amount"]]
+    top_products = top_products.merge(inventory, on="product_id", how="left")
+    view = {"total_amount": data["totals"]["total_amount"], "transactions": data["totals"]["rows"],
+            "customers": customers.shape[0], "products": inventory.shape[0], "monthly": data["monthly"],
+            "top_customers": top_customers, "top_products": top_products, "low_stock": data["low_stock"],
+            "stock_snapshot": data["stock_history"][-1],
+            "note": f"Data loaded {data['loaded_at']}: " + " · ".join(data["sources"])}
+    held = sum(len(data[k]) for k in ["customers", "inventory", "monthly", "by_customer", "by_product", "low_stock"])
+    timings = {"cached tables + KPI summaries": {"ms": (loaded - start) * 1000, "rows": held},
+               "top-10 merges (pandas)": {"ms": (time.perf_counter() - loaded) * 1000,
+                                          "rows": len(top_customers) + len(top_products)}}
+    return view, timings
+
+def db_dashboard(pool, database):
+    # Dashboard sections as aggregate queries over the migrated tables; only result rows come back
+    with pool.connection() as conn:
+        frames, timings = fetch_dashboard(conn, "mysql", LOW_STOCK_UNITS)
+    totals = frames["totals"].iloc[0]
+    view = {"total_amount": float(totals["total_amount"]), "transactions": int(totals["transactions"]),
+            "customers": int(totals["customers"]), "products": int(totals["products"]),
+            "monthly": frames["monthly"], "top_customers": frames["top_customers"],
+            "top_products": frames["top_products"], "low_stock": frames["low_stock"], "stock_snapshot": None,
+            "note": f"Queried `{database}` at {datetime.now().strftime('%H:%M:%S')}: "
+                    + " · ".join(f"{name} {t['ms']:.0f} ms" for name, t in timings.items())}
+    return view, timings
+
+def timing_table(timings):
+    rows = []
+    for mode, steps in timings.items():
+        rows += [{"source": mode, "step": step, "ms": round(t["ms"], 1), "rows": t["rows"]} for step, t in steps.items()]
+        rows.append({"source": mode, "step": "total", "ms": round(sum(t["ms"] for t in steps.values()), 1),
+                     "rows": sum(t["rows"] for t in steps.values())})
+    return pd.DataFrame(rows)
+
 # ---------------- STREAMLIT APP ----------------
 st.set_page_config(page_title="GenAI Migration Dashboard", layout="wide")
 st.title("🧠 GenAI-Assisted Migration Dashboard")
@@ -178,21 +356,45 @@ with tab1:
     st.sidebar.header("Groq Settings")
     groq_key=st.sidebar.text_input("Groq API Key", type="password")
     groq_model=st.sidebar.text_input("Groq Model","llama-3.3-70b-versatile")
+    llm_base_url=st.sidebar.text_input("API Base URL (optional)", help="e.g. http://127.0.0.1:8080 for mock_llm_server.py")
+
+    st.sidebar.header("Load Settings")
+    load_mode=st.sidebar.selectbox("Load Mode", LOAD_MODES, index=LOAD_MODES.index("executemany"),
+                                   help="infile = LOAD DATA LOCAL INFILE (needs local_infile=ON on the server)")
+    load_chunk_rows=st.sidebar.number_input("Rows per Batch", min_value=100, max_value=100000, value=5000, step=500)
+    load_workers=st.sidebar.number_input("Parallel Table Loads", min_value=1, max_value=3, value=3,
+                                         help="Each table on its own connection; children wait for their FK parents")
+    defer_fk_checks=st.sidebar.checkbox("Defer FK checks", help="Load all tables at once with FOREIGN_KEY_CHECKS=0; "
+                                        "the validation step still checks for orphan rows")
+    spool_chunks=st.sidebar.checkbox("Spool parsed CSV chunks", help="Keep the profiling pass's parsed rows in local "
+                                     "temp storage for the load; only faster when the CSVs are on a slow network share")
+
+    if st.sidebar.button("🔄 Clear Cached Connections & Data",
+                         help=f"Connections and LLM clients are reused for {RESOURCE_TTL // 60} min, "
+                              f"dashboard data for {DATA_TTL // 60} min or until a CSV changes"):
+        st.cache_resource.clear()
+        st.cache_data.clear()
 
     if st.button("🚀 Run Full Migration"):
         pipe=GenAIMigrationPipeline(
             {"host":host,"user":user,"password":password,"database":database},
-            groq_key, groq_model
+            groq_key, groq_model, llm_base_url.strip() or None
         )
+        pipe.config.update(load_mode=load_mode, load_chunk_rows=int(load_chunk_rows),
+                           load_workers=int(load_workers), defer_fk_checks=defer_fk_checks,
+                           spool_chunks=spool_chunks)
         pipe.check_csv_files()
         pipe.connect_mysql()
-        pipe.drop_tables_if_exist()
-        pipe.design_schema()
-        pipe.import_data()
-        pipe.validate_data()
-        pipe.translate_plsql()
-        pipe.generate_bi()
-        pipe.export_report()
+        try:
+            pipe.drop_tables_if_exist()
+            pipe.design_schema()
+            pipe.import_data()
+            pipe.validate_data()
+            pipe.translate_plsql()
+            pipe.generate_bi()
+            pipe.export_report()
+        finally:
+            pipe.close()
 
 # ----- TAB 2: Dashboard -----
 with tab2:
@@ -200,39 +402,42 @@ with tab2:
     customers_path = os.path.join(DATA_DIR,"CUSTOMERS.csv")
     inventory_path = os.path.join(DATA_DIR,"INVENTORY.csv")
     sales_path = os.path.join(DATA_DIR,"SALES.csv")
+    csv_paths = [customers_path, inventory_path, sales_path]
 
-    if all(os.path.exists(p) for p in [customers_path, inventory_path, sales_path]):
-        customers = pd.read_csv(customers_path)
-        inventory = pd.read_csv(inventory_path)
-        sales = pd.read_csv(sales_path)
-
-        # Clean & convert types
-        if "sale_date" in sales.columns:
-            sales["sale_date"] = pd.to_datetime(sales["sale_date"], errors="coerce")
-        if "join_date" in customers.columns:
-            customers["join_date"] = pd.to_datetime(customers["join_date"], errors="coerce")
-        for col in ["total_amount","quantity"]:
-            if col in sales.columns:
-                sales[col] = pd.to_numeric(sales[col], errors="coerce").fillna(0)
-        for col in ["price_per_unit","quantity_in_stock"]:
-            if col in inventory.columns:
-                inventory[col] = pd.to_numeric(inventory[col], errors="coerce").fillna(0)
+    def run_dashboard(mode):
+        if mode == DASHBOARD_MODES[0]:
+            if not all(os.path.exists(p) for p in csv_paths):
+                st.warning("⚠️ CSV files not found in data folder.")
+                return None
+            return csv_dashboard(csv_paths)
+        try:
+            return db_dashboard(get_mysql_pool(host, user, password, database), database)
+        except (mysql.connector.Error, TimeoutError) as e:
+            st.error(f"MySQL dashboard query failed: {e}")
+            return None
+
+    mode = st.radio("Data Source", DASHBOARD_MODES, horizontal=True,
+                    help="MySQL runs each chart as an aggregate query over the migrated tables and fetches only the result rows")
+    timings = st.session_state.setdefault("dashboard_timings", {})
+    outcome = run_dashboard(mode)
+
+    if outcome:
+        view, timings[mode] = outcome
+        st.caption(view["note"])
 
         # --- KPIs ---
         c1, c2, c3, c4 = st.columns(4)
-        c1.metric("💰 Total Sales", f"{sales['total_amount'].sum():,.2f}")
-        c2.metric("👥 Customers", str(customers.shape[0]))
-        c3.metric("📦 Products", str(inventory.shape[0]))
-        c4.metric("🛒 Transactions", str(sales.shape[0]))
+        c1.metric("💰 Total Sales", f"{view['total_amount']:,.2f}")
+        c2.metric("👥 Customers", str(view["customers"]))
+        c3.metric("📦 Products", str(view["products"]))
+        c4.metric("🛒 Transactions", str(view["transactions"]))
 
         st.markdown("---")
 
         # --- Monthly Sales Trend ---
         st.subheader("📈 Monthly Sales Trend")
-        df_month = sales.dropna(subset=["sale_date"]).copy()
-        if not df_month.empty:
-            df_month["month"] = df_month["sale_date"].dt.to_period("M").dt.to_timestamp()
-            monthly_sales = df_month.groupby("month")["total_amount"].sum().reset_index()
+        monthly_sales = view["monthly"]
+        if not monthly_sales.empty:
             fig_sales = px.line(
                 monthly_sales, x="month", y="total_amount",
                 title="Monthly Sales Trend",
@@ -244,11 +449,8 @@ with tab2:
 
         # --- Top Customers ---
         st.subheader("👑 Top 10 Customers")
-        top_customers = sales.groupby("customer_id")["total_amount"].sum().reset_index()
-        top_customers = top_customers.merge(customers, on="customer_id", how="left")
-        top_customers = top_customers.sort_values("total_amount", ascending=False).head(10)
         fig_customers = px.bar(
-            top_customers, x="customer_name", y="total_amount",
+            view["top_customers"], x="customer_name", y="total_amount",
             title="Top 10 Customers by Sales",
             labels={"customer_name":"Customer","total_amount":"Sales Amount"},
             text="total_amount"
@@ -258,11 +460,8 @@ with tab2:
 
         # --- Top Products ---
         st.subheader("🏆 Top 10 Products")
-        top_products = sales.groupby("product_id")["total_amount"].sum().reset_index()
-        top_products = top_products.merge(inventory, on="product_id", how="left")
-        top_products = top_products.sort_values("total_amount", ascending=False).head(10)
         fig_products = px.bar(
-            top_products, x="product_name", y="total_amount",
+            view["top_products"], x="product_name", y="total_amount",
             title="Top 10 Products by Sales",
             labels={"product_name":"Product","total_amount":"Sales Amount"},
             text="total_amount"
@@ -271,8 +470,12 @@ with tab2:
         st.plotly_chart(fig_products, use_container_width=True)
 
         # --- Low Stock Table ---
-        st.subheader("⚠️ Low Stock Products (<100 units)")
-        low_stock = inventory[inventory["quantity_in_stock"] < 100]
+        st.subheader(f"⚠️ Low Stock Products (<{LOW_STOCK_UNITS} units)")
+        low_stock = view["low_stock"]
+        if view["stock_snapshot"]:
+            snapshot = view["stock_snapshot"]
+            st.caption(f"Stock snapshot {snapshot['taken_at']}: {snapshot['units']:,} units, "
+                       f"value {snapshot['stock_value']:,.2f}, {snapshot['low_stock']} low-stock products")
         st.dataframe(low_stock, use_container_width=True)
         st.download_button(
             "Download Low Stock CSV",
@@ -280,5 +483,20 @@ with tab2:
             file_name="low_stock.csv"
         )
 
-    else:
-        st.warning("⚠️ CSV files not found in data folder.")
+    # --- CSV vs MySQL timings ---
+    with st.expander("⏱️ Data Source Timings"):
+        if st.button("Measure Both Sources"):
+            for other in DASHBOARD_MODES:
+                result = run_dashboard(other)
+                if result:
+                    timings[other] = result[1]
+        if timings:
+            st.caption("Latest render of each source in this session: time to get each section's data, "
+                       "and the rows handed to the dashboard")
+            st.dataframe(timing_table(timings), use_container_width=True)
+        if mode == DASHBOARD_MODES[1] and st.button("Create Missing Dashboard Indexes"):
+            try:
+                with get_mysql_pool(host, user, password, database).connection() as conn:
+                    st.json(ensure_indexes(conn))
+            except (mysql.connector.Error, TimeoutError) as e:
+                st.error(f"Could not create indexes: {e}")
@@ -0,0 +1,219 @@
+import hashlib
+import json
+import os
+import time
+from typing import Callable, Dict, List, Optional
+
+import pandas as pd
+
+from bulk_loader import read_header
+from dashboard_cache import DashboardCache, file_sha256, write_arrow
+
+AGGREGATE_VERSION = 1  # bump when a summary's definition changes
+FINGERPRINT_BYTES = 1 << 16
+LOW_STOCK_UNITS = 100
+HISTORY_LIMIT = 500  # stock snapshots kept
+# Sales summary -> its group key
+SUMMARY_KEYS = {'monthly': 'month', 'by_customer': 'customer_id', 'by_product': 'product_id'}
+MEASURES = ['total_amount', 'quantity', 'transactions']
+
+
+def span_sha256(path: str, start: int, end: int) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        f.seek(start)
+        digest.update(f.read(end - start))
+    return digest.hexdigest()
+
+
+def summarize(sales: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    """The dashboard's sales groupbys over one chunk of cleaned rows"""
+    measures = dict(total_amount=('total_amount', 'sum'), quantity=('quantity', 'sum'),
+                    transactions=('total_amount', 'size'))
+    dated = sales.dropna(subset=['sale_date'])
+    month = dated['sale_date'].dt.to_period('M').dt.to_timestamp().rename('month')
+    return {
+        'monthly': dated.groupby(month).agg(**measures).reset_index(),
+        'by_customer': sales.groupby('customer_id').agg(**measures).reset_index(),
+        'by_product': sales.groupby('product_id').agg(**measures).reset_index(),
+    }
+
+
+def combine(current: Optional[pd.DataFrame], part: pd.DataFrame, key: str) -> pd.DataFrame:
+    """Merge two partial summaries; every measure is a sum, so folding is order-independent"""
+    if current is None or current.empty:
+        return part
+    if part.empty:
+        return current
+    return pd.concat([current, part], ignore_index=True).groupby(key, as_index=False)[MEASURES].sum()
+
+
+class KPIStore:
+    """Materialized dashboard aggregates: sales totals, monthly / per-customer / per-product sums and stock snapshots.
+
+    SALES is treated as append-only. The bytes already folded in are fingerprinted (the first and last
+    64 KB before the fold offset); when the CSV has grown and both still match, only the rows past the
+    offset are parsed and merged into the stored summaries. Any other change rebuilds them in one
+    chunked pass. INVENTORY is small and rewritten in place, so each new version is snapshotted whole.
+    """
+
+    def __init__(self, store_dir: str, chunk_rows: int = 200000):
+        self.store_dir = store_dir
+        self.chunk_rows = chunk_rows
+        os.makedirs(store_dir, exist_ok=True)
+        self.meta_path = os.path.join(store_dir, 'kpis.json')
+        self.meta = self._read_meta()
+        self.stats = {}   # 'SALES' / 'INVENTORY' -> {'source', 'rows', 'ms'}
+        self._frames = {}  # data file -> DataFrame already read this session
+
+    # ----- SALES -----
+    def refresh_sales(self, csv_path: str, clean: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None) -> 'KPIStore':
+        start = time.perf_counter()
+        stat = os.stat(csv_path)
+        sales = self.meta.get('sales')
+        usable = sales is not None and sales['source'] == os.path.abspath(csv_path) and self._has_files(SUMMARY_KEYS)
+        source, rows = 'cache', 0
+        if not (usable and sales['size'] == stat.st_size and sales['mtime_ns'] == stat.st_mtime_ns):
+            if (usable and stat.st_size >= sales['offset']
+                    and self._fingerprint(csv_path, sales['offset']) == sales['fingerprint']):
+                if stat.st_size == sales['offset']:
+                    source = 'revalidated'
+                    sales = dict(sales)
+                else:
+                    source = 'appended'
+                    sales = self._fold(csv_path, clean, sales)
+                    rows = sales['totals']['rows'] - self.meta['sales']['totals']['rows']
+            else:
+                source = 'rebuilt'
+                sales = self._fold(csv_path, clean, None)
+                rows = sales['totals']['rows']
+            sales.update(size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+            self._commit('sales', sales)
+        self.stats['SALES'] = {'source': source, 'rows': rows, 'ms': (time.perf_counter() - start) * 1000}
+        return self
+
+    def _fold(self, csv_path: str, clean: Optional[Callable], previous: Optional[Dict]) -> Dict:
+        """Fold the rows past `previous['offset']` (all rows, without `previous`) into the summaries"""
+        summaries = {name: self.summary(name) if previous else None for name in SUMMARY_KEYS}
+        totals = dict(previous['totals']) if previous else {'rows': 0, 'total_amount': 0.0, 'quantity': 0.0}
+        columns = previous['columns'] if previous else read_header(csv_path)
+        with open(csv_path, 'rb') as f:
+            if previous:
+                f.seek(previous['offset'])
+            reader = pd.read_csv(f, header=None if previous else 0, names=columns, chunksize=self.chunk_rows)
+            for chunk in reader:
+                if clean is not None:
+                    chunk = clean(chunk)
+                totals['rows'] += len(chunk)
+                totals['total_amount'] += float(chunk['total_amount'].sum())
+                totals['quantity'] += float(chunk['quantity'].sum())
+                for name, part in summarize(chunk).items():
+                    summaries[name] = combine(summaries[name], part, SUMMARY_KEYS[name])
+            offset = f.tell()
+        generation = self.meta.get('generation', 0) + 1
+        files = {}
+        for name, key in SUMMARY_KEYS.items():
+            files[name] = f"{name}.{generation}.arrow"
+            frame = summaries[name] if summaries[name] is not None else pd.DataFrame(columns=[key] + MEASURES)
+            write_arrow(frame, self._path(files[name]))
+        return {'source': os.path.abspath(csv_path), 'columns': columns, 'offset': offset,
+                'fingerprint': self._fingerprint(csv_path, offset), 'totals': totals,
+                'generation': generation, 'files': files}
+
+    @staticmethod
+    def _fingerprint(path: str, offset: int) -> List[str]:
+        return [span_sha256(path, 0, min(FINGERPRINT_BYTES, offset)),
+                span_sha256(path, max(0, offset - FINGERPRINT_BYTES), offset)]
+
+    # ----- INVENTORY -----
+    def refresh_stock(self, csv_path: str, inventory: pd.DataFrame) -> 'KPIStore':
+        """Snapshot `inventory` (the cleaned INVENTORY table) whenever its CSV's content changes"""
+        start = time.perf_counter()
+        stat = os.stat(csv_path)
+        stock = self.meta.get('stock')
+        same_source = stock is not None and stock['source'] == os.path.abspath(csv_path)
+        usable = same_source and self._has_files(['low_stock'])
+        source = 'cache'
+        if not (usable and stock['size'] == stat.st_size and stock['mtime_ns'] == stat.st_mtime_ns):
+            digest = file_sha256(csv_path)
+            if usable and stock['sha256'] == digest:
+                source = 'revalidated'
+                stock = dict(stock)
+            else:
+                source = 'snapshot'
+                generation = self.meta.get('generation', 0) + 1
+                low_stock = inventory[inventory['quantity_in_stock'] < LOW_STOCK_UNITS]
+                data_file = f"low_stock.{generation}.arrow"
+                write_arrow(low_stock, self._path(data_file))
+                history = stock['history'] if same_source else []
+                history = (history + [{
+                    'taken_at': time.strftime('%Y-%m-%d %H:%M:%S'), 'sha256': digest[:16],
+                    'products': int(inventory.shape[0]), 'units': int(inventory['quantity_in_stock'].sum()),
+                    'stock_value': round(float((inventory['quantity_in_stock'] * inventory['price_per_unit']).sum()), 2),
+                    'low_stock': int(low_stock.shape[0]),
+                }])[-HISTORY_LIMIT:]
+                stock = {'source': os.path.abspath(csv_path), 'sha256': digest, 'history': history,
+                         'generation': generation, 'files': {'low_stock': data_file}}
+            stock.update(size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+            self._commit('stock', stock)
+        self.stats['INVENTORY'] = {'source': source, 'rows': 0 if source != 'snapshot' else int(inventory.shape[0]),
+                                   'ms': (time.perf_counter() - start) * 1000}
+        return self
+
+    # ----- Reading -----
+    @property
+    def totals(self) -> Dict:
+        return self.meta['sales']['totals']
+
+    @property
+    def stock_history(self) -> List[Dict]:
+        return self.meta['stock']['history']
+
+    def summary(self, name: str) -> pd.DataFrame:
+        """'monthly', 'by_customer', 'by_product' or 'low_stock'"""
+        data_file = self.meta['files'][name]
+        if data_file not in self._frames:
+            self._frames[data_file] = DashboardCache.read(self._path(data_file))
+        return self._frames[data_file]
+
+    # ----- Storage -----
+    def _commit(self, section: str, entry: Dict):
+        """Point the metadata at the new summary files, then drop the ones they replace"""
+        previous = dict(self.meta.get('files', {}))
+        self.meta[section] = entry
+        self.meta['generation'] = max(self.meta.get('generation', 0), entry['generation'])
+        self.meta['files'] = dict(previous, **entry['files'])
+        self._write_meta()
+        for name, data_file in previous.items():
+            if self.meta['files'][name] != data_file:
+                self._frames.pop(data_file, None)
+                self._remove(self._path(data_file))
+
+    def _has_files(self, names) -> bool:
+        files = self.meta.get('files', {})
+        return all(name in files and os.path.exists(self._path(files[name])) for name in names)
+
+    def _path(self, data_file: str) -> str:
+        return os.path.join(self.store_dir, data_file)
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass  # still mapped by a reader (Windows); the orphaned file is harmless
+
+    def _read_meta(self) -> Dict:
+        try:
+            with open(self.meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return meta if meta.get('version') == AGGREGATE_VERSION else {}
+
+    def _write_meta(self):
+        self.meta['version'] = AGGREGATE_VERSION
+        tmp_path = self.meta_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.meta, f)
+        os.replace(tmp_path, self.meta_path)
@@ -0,0 +1,156 @@
+import queue
+import re
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional, Set
+
+from bulk_loader import BulkLoader
+
+IDENT = r"[`\"\[]?(\w+)[`\"\]]?"
+CREATE_TABLE_RE = re.compile(rf"\bCREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?(?:{IDENT}\.)?{IDENT}", re.I)
+REFERENCES_RE = re.compile(rf"\bREFERENCES\s+(?:{IDENT}\.)?{IDENT}", re.I)
+
+# Session switch for foreign-key enforcement, per dialect
+FK_CHECKS = {
+    'mysql': ("SET FOREIGN_KEY_CHECKS = 0", "SET FOREIGN_KEY_CHECKS = 1"),
+    'sqlite': ("PRAGMA foreign_keys = OFF", "PRAGMA foreign_keys = ON"),
+}
+
+
+def table_dependencies(ddl: str) -> Dict[str, Set[str]]:
+    """Parents each CREATE TABLE references through a foreign key, by upper-cased table name"""
+    dependencies = {}
+    for statement in ddl.split(';'):
+        create = CREATE_TABLE_RE.search(statement)
+        if not create:
+            continue
+        table = create.group(2).upper()
+        parents = {match[1].upper() for match in REFERENCES_RE.findall(statement, create.end())}
+        dependencies[table] = parents - {table}
+    return dependencies
+
+
+class ConnectionPool:
+    """A fixed set of connections, each lent to one thread at a time.
+
+    `check`, if given, runs on a connection each time it is lent out — e.g. to reconnect one
+    the server dropped while the pool sat idle. `acquire` gives up with TimeoutError after
+    `timeout` seconds rather than waiting forever on connections that are never released.
+    """
+
+    def __init__(self, connect: Callable, size: int, check: Optional[Callable] = None, timeout: float = 30.0):
+        self._idle = queue.Queue()
+        self._check = check
+        self.timeout = timeout
+        self._all = [connect() for _ in range(max(1, size))]
+        for conn in self._all:
+            self._idle.put(conn)
+
+    @property
+    def size(self) -> int:
+        return len(self._all)
+
+    def acquire(self, timeout: Optional[float] = None):
+        """Borrow a connection until `release`; waits up to `timeout` (default: the pool's) while all are lent out"""
+        timeout = self.timeout if timeout is None else timeout
+        try:
+            conn = self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError(f"No pooled connection was released within {timeout:g}s "
+                               f"(all {self.size} are in use)") from None
+        if self._check is not None:
+            try:
+                self._check(conn)
+            except Exception:
+                self._idle.put(conn)
+                raise
+        return conn
+
+    def release(self, conn):
+        self._idle.put(conn)
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close(self):
+        for conn in self._all:
+            conn.close()
+
+
+class ParallelLoader:
+    """Loads several CSVs at once on a connection pool, parents before the children that reference them.
+
+    A table starts as soon as every table it references has finished, so independent tables
+    (CUSTOMERS and INVENTORY) load side by side and SALES follows. With `defer_fk_checks`
+    every table starts at once on connections with foreign-key checks off; tables caught
+    in a reference cycle are loaded that way too.
+    """
+
+    def __init__(self, pool: ConnectionPool, dialect: str = 'mysql', mode: str = 'executemany',
+                 chunk_rows: int = 5000, defer_fk_checks: bool = False, workers: Optional[int] = None):
+        self.pool = pool
+        self.dialect = dialect
+        self.mode = mode
+        self.chunk_rows = chunk_rows
+        self.defer_fk_checks = defer_fk_checks
+        self.workers = workers or pool.size  # fewer than pool.size when the caller holds connections itself
+
+    def load(self, files: Dict[str, str], dependencies: Dict[str, Set[str]],
+             profiles: Optional[Dict[str, object]] = None) -> Dict:
+        """Load {table: csv path}; returns {'tables': [per-table stats in finishing order], 'seconds', 'waves'}.
+
+        `profiles` maps tables to CSVProfiles whose spooled chunks are loaded instead of the CSV.
+        """
+        profiles = profiles or {}
+        by_name = {table.upper(): table for table in files}
+        parents = {table: set() if self.defer_fk_checks else
+                   {by_name[p] for p in dependencies.get(table.upper(), ()) if p in by_name}
+                   for table in files}
+        deferred = set(files) if self.defer_fk_checks else set()
+        done, results, waves = set(), [], []
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            running = {}
+            while len(done) < len(files):
+                ready = [t for t in files if t not in done and t not in running.values() and parents[t] <= done]
+                if not ready and not running:
+                    # Every remaining table waits on another: a cycle, loaded with checks off
+                    ready = [t for t in files if t not in done]
+                    deferred.update(ready)
+                if ready:
+                    waves.append(ready)
+                for table in ready:
+                    running[executor.submit(self._load_one, table, files[table], table in deferred, start,
+                                            profiles.get(table))] = table
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    done.add(running.pop(future))
+                    results.append(future.result())
+        return {'tables': results, 'seconds': round(time.perf_counter() - start, 3), 'waves': waves}
+
+    def _load_one(self, table: str, path: str, defer: bool, t0: float, profile=None) -> Dict:
+        with self.pool.connection() as conn:
+            started = time.perf_counter() - t0
+            off, on = FK_CHECKS[self.dialect]
+            cur = conn.cursor()
+            try:
+                if defer:
+                    cur.execute(off)
+                stats = BulkLoader(conn, self.dialect, self.chunk_rows).load(table, path, self.mode, profile)
+            except Exception as e:
+                conn.rollback()
+                stats = {'table': table, 'error': str(e)}
+            finally:
+                if defer:
+                    cur.execute(on)
+                cur.close()
+        stats.update(started=round(started, 3), finished=round(time.perf_counter() - t0, 3),
+                     fk_checks='deferred' if defer else 'on')
+        return stats
+
@@ -2,35 +2,181 @@ import json
 import csv
 import os
 import sys
+import argparse
 from typing import Dict, List, Any, Optional
-import pandas as pd
-from groq import Groq
 import getpass
 from datetime import datetime
 import re
 import time
+import hashlib
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from tqdm import tqdm
 import colorama
 from colorama import Fore, Style
+from response_cache import ResponseCache
+from semantic_cache import SemanticQuestionCache
+from schema_index import SchemaIndex
+from query_router import GENERIC_TERMS, QueryRouter
+from checkpoint import CheckpointWriter, iter_checkpoint, load_completed_ids
+from rate_limiter import RateLimitScheduler, is_rate_limited, parse_retry_after
+from llm_backend import BACKENDS, GroqBackend, create_backend
+from json_extract import JSONObjectScanner, extract_json_object, extract_json_objects
+from sql_dialect import DIALECTS, normalize_sql
+from sql_validator import INVALID, ShadowValidator
 
 # Initialize colorama for colored output
 colorama.init()
 
+# ⭐ ENHANCEMENT: Removed prescriptive confidence scale — AI decides freely
+# Static system prompt — identical for every call so it forms a shared prompt prefix
+SYSTEM_PROMPT = """You are an expert SQL architect. Generate ANSI SQL ONLY IF all required data exists within ONE schema.
+
+🧠 YOU MUST THINK STEP-BY-STEP AND SELF-ASSESS:
+
+1. PARSE: What tables and columns does this question need?
+2. VALIDATE PER SCHEMA:
+   - Check sales_dw: Do ALL required tables/columns exist here?
+   - Check marketing_dw: Do ALL required tables/columns exist here?
+   → If split across schemas → explain why you cannot generate.
+3. JOIN LOGIC: Use only documented relationships (foreign keys).
+4. CONFIDENCE: Assign a decimal score from 0.0 to 1.0 based on your OWN judgment of certainty.
+   → 1.0 = fully certain, 0.0 = impossible or missing data
+   → No predefined thresholds — be honest and nuanced.
+5. ASSUMPTIONS: Explain what you checked, why you chose target_source, and justification for confidence.
+
+📤 OUTPUT FORMAT (STRICT JSON — NO EXTRA TEXT):
+{
+  "question_id": <Question ID from the user message>,
+  "question": "<Question text from the user message>",
+  "target_source": "sales_dw | marketing_dw | N/A",
+  "sql": "SELECT ... ; OR '-- Cannot generate: [reason]'",
+  "assumptions": "Your detailed reasoning — what you validated, what you assumed",
+  "confidence": 0.0 to 1.0 (your own judgment)
+}
+
+⚠️ NEVER BLUFF. If unsure → confidence low. You are graded on honesty and reasoning depth.
+"""
+
+USER_PROMPT_TASK = """
+✅ YOUR TASK:
+- Decide which schema contains ALL required data.
+- Write SQL ONLY if data exists in ONE schema.
+- If joining tables, confirm they share a relationship.
+- BE TRANSPARENT in assumptions — explain your validation steps.
+- SCORE CONFIDENCE HONESTLY — no overconfidence, no predefined buckets.
+"""
+
+BATCH_PROMPT_SUFFIX = """
+📦 BATCH MODE: The user message contains SEVERAL questions. Answer each one independently.
+Return a JSON ARRAY with exactly one object per question, in the same order, each object in the
+output format above with its own "question_id". No text before or after the array.
+"""
+
+# Repair follow-ups carry the error and the previous output, not the full schema prompt
+REPAIR_SYSTEM_PROMPT = """You correct your own previous answer to a text-to-SQL task.
+Reply with the corrected JSON object only, with the keys "question_id", "target_source", "sql",
+"assumptions" and "confidence". No text before or after it."""
+
+REPAIR_PROMPT = """Question ID: {question_id}
+Question: "{question}"
+
+Your previous output:
+{previous}
+
+Problem: {error}
+{hint}Return the corrected JSON object only."""
+REPAIR_CONTEXT_CHARS = 2000  # previous output beyond this is cut — its tail is what broke anyway
+SQL_WORD_RE = re.compile(r"[a-z_][a-z0-9_]*")
+
 class SQLGenerationPipeline:
     def __init__(self):
-        self.groq_client = None
+        self.llm_client = None  # LLMBackend — Groq SDK or any OpenAI-compatible HTTP endpoint
         self.sales_schema = None
         self.marketing_schema = None
         self.questions = []
-        self.results = []
+        self.results = []  # Only used when checkpointing is off; otherwise results stream to disk
+        self.checkpoint = None
+        self.rate_limiter = None
         self.token_usage = []  # ⭐ ENHANCEMENT: Track token usage per call
         self.latency_log = []  # ⭐ ENHANCEMENT: Track latency per question
+        self._metrics_lock = threading.Lock()  # Guards token_usage/latency_log under concurrency
+        # ⭐ ENHANCEMENT: Per-stage wall times in seconds, for the summary and benchmarks/pipeline.py
+        self.stage_timings = {'prompt_build': [], 'json_parse': [], 'sql_validate': [], 'question': []}
+        self._schema_hashes = None  # Content hashes of the schema files the prompt text was built from
+        self._schema_texts = {}
+        self._table_texts = {}  # database -> table -> rendered table block
+        self._schema_indexes = {}
+        self._user_prompt_prefix = None
+        self.router = None
+        self.routing_log = []  # ⭐ ENHANCEMENT: Pre-router decisions per question
+        self.response_cache = None
+        self.cache_stats = {'hits': 0, 'misses': 0}  # ⭐ ENHANCEMENT: Response cache hits skip the API
+        self.semantic_cache = None
+        self.semantic_stats = {'hits': 0, 'lookups': 0}
+        self.sql_validator = None
+        # ⭐ ENHANCEMENT: Local shadow-schema validation outcomes and the re-prompts they triggered
+        self.validation_stats = {'valid': 0, 'invalid': 0, 'unverified': 0}
+        # ⭐ ENHANCEMENT: Repair loop — follow-ups sent per failure stage, and answers they rescued
+        self.repair_stats = {'transport': 0, 'json': 0, 'sql': 0, 'repaired': 0}
+        # ⭐ ENHANCEMENT: Model cascade — per model: questions tried, answers kept, seconds, escalations
+        self.cascade_stats = {}
         self.config = {
             'model': 'llama-3.1-70b-versatile',
+            'llm_backend': 'groq',     # 'groq' or 'http' (e.g. mock_llm_server.py for offline load tests)
+            'llm_base_url': None,      # None = Groq's default endpoint
             'temperature': 0.1,
             'max_tokens': 2000,
             'retry_attempts': 3,
-            'retry_delay': 2
+            'retry_delay': 2,
+            'concurrency': 1,
+            'response_cache': True,
+            'cache_path': '.cache/llm_responses.sqlite',
+            'cache_max_entries': 10000,
+            'cache_max_age_days': 30,
+            'semantic_cache': False,  # opt-in: a reused answer skips the LLM entirely
+            'semantic_cache_threshold': 0.85,
+            'semantic_cache_path': '.cache/semantic_answers.jsonl',
+            'semantic_cache_max_entries': 5000,
+            'semantic_cache_min_confidence': 0.5,  # answers below this are never reused for paraphrases
+            'schema_pruning': False,
+            'schema_prune_max_tables': 8,
+            'pre_routing': True,
+            'routing_min_score': 2.0,
+            'batch_size': 1,
+            'batch_max_tokens': 8000,
+            'streaming': False,        # consume tokens as they arrive and hang up once the JSON closes
+            'sql_dialect': 'postgres',  # target for validate_and_fix_sql: 'ansi', 'mysql' or 'postgres'
+            'sql_validation': True,    # EXPLAIN every answer against an in-memory SQLite copy of the schemas
+            'validation_rows': 0,      # synthetic rows per shadow table; > 0 also executes each query
+            # ⭐ ENHANCEMENT: Per-stage budgets of the repair loop (retry_attempts covers API errors)
+            'json_repair_attempts': 2,  # follow-ups after an unparseable answer
+            'sql_repair_attempts': 1,   # follow-ups after an answer fails local SQL validation
+            'repair_max_tokens': 600,   # a corrected answer is one small JSON object
+            # ⭐ ENHANCEMENT: Model cascade — the first model answers; the next only gets what it could not
+            'cascade': False,
+            'cascade_models': ['llama-3.1-8b-instant', 'llama-3.1-70b-versatile'],  # cheapest first
+            'cascade_min_confidence': 0.7,  # answers below this go to the next model
+            'model_prices': {               # USD per million (prompt, completion) tokens, for cost estimates
+                'llama-3.1-8b-instant': (0.05, 0.08),
+                'llama-3.1-70b-versatile': (0.59, 0.79),
+            },
+            'checkpoint_path': None,  # None = <output_dir>/checkpoint.jsonl; '' disables checkpointing
+            'resume': False,
+            # Free-tier sized budgets, applied per model; override per model via 'rate_limits'
+            'rate_limiting': True,
+            'rpm_limit': 30,
+            'tpm_limit': 12000,
+            'rate_limits': {},
+            'rate_limit_retries': 5,
+            # ⭐ ENHANCEMENT: Settings that replace the interactive prompts in headless runs
+            'data_dir': 'data',
+            'output_dir': 'output',
+            'questions': None,        # e.g. '1-6,9'; None = ask (interactive) / all (headless)
+            'shard': None,            # (index, count) — this process handles every count-th question
+            'export_format': None,    # '1'-'5' as in the export menu; None = ask
+            'api_key_env': 'GROQ_API_KEY',
+            'validate_api_key': True
         }
 
     def print_banner(self):
@@ -105,17 +251,62 @@ class SQLGenerationPipeline:
                 except ValueError:
                     print(f"{Fore.RED}Invalid retry count, using default{Style.RESET_ALL}")
 
+            concurrency_input = input(f"{Fore.CYAN}Concurrent requests (1-32, default 1): {Style.RESET_ALL}").strip()
+            if concurrency_input:
+                try:
+                    concurrency = int(concurrency_input)
+                    if 1 <= concurrency <= 32:
+                        self.config['concurrency'] = concurrency
+                except ValueError:
+                    print(f"{Fore.RED}Invalid concurrency, using default{Style.RESET_ALL}")
+
+            batch_input = input(f"{Fore.CYAN}Questions per LLM request (1-20, default 1): {Style.RESET_ALL}").strip()
+            if batch_input:
+                try:
+                    batch_size = int(batch_input)
+                    if 1 <= batch_size <= 20:
+                        self.config['batch_size'] = batch_size
+                except ValueError:
+                    print(f"{Fore.RED}Invalid batch size, using default{Style.RESET_ALL}")
+
+            pruning_input = input(f"{Fore.CYAN}Send only question-relevant tables to the LLM? (y/N): {Style.RESET_ALL}").strip().lower()
+            if pruning_input == 'y':
+                self.config['schema_pruning'] = True
+
+            streaming_input = input(f"{Fore.CYAN}Stream responses and stop once the JSON is complete? (y/N): {Style.RESET_ALL}").strip().lower()
+            if streaming_input == 'y':
+                self.config['streaming'] = True
+
+            small = self.config['cascade_models'][0]
+            if self.config['model'] != small:
+                cascade_input = input(f"{Fore.CYAN}Try {small} first and escalate to {self.config['model']} "
+                                      f"only when unsure? (y/N): {Style.RESET_ALL}").strip().lower()
+                if cascade_input == 'y':
+                    self.config['cascade'] = True
+                    self.config['cascade_models'] = [small, self.config['model']]
+
         print(f"\n{Fore.GREEN}Configuration Summary:{Style.RESET_ALL}")
-        print(f"  Model: {self.config['model']}")
+        print(f"  Model: {self._model_label()}")
         print(f"  Temperature: {self.config['temperature']}")
         print(f"  Max Tokens: {self.config['max_tokens']}")
         print(f"  Retry Attempts: {self.config['retry_attempts']}")
+        print(f"  Concurrency: {self.config['concurrency']}")
+        print(f"  Batch Size: {self.config['batch_size']}")
+        print(f"  Schema Pruning: {'On' if self.config['schema_pruning'] else 'Off'}")
+        print(f"  Streaming: {'On' if self.config['streaming'] else 'Off'}")
+        print(f"  Local SQL Validation: {'On' if self.config['sql_validation'] else 'Off'}")
+
+    def _model_label(self) -> str:
+        return ' → '.join(self.config['cascade_models']) if self.config['cascade'] else self.config['model']
 
     # ⭐ ENHANCEMENT: Parse flexible question selection (ranges, commas, mixed)
     def parse_question_selection(self, total_questions: int) -> List[int]:
         """Parse user input like '1-6', '1,5,7', '15-20' into list of question IDs"""
         selection = input(f"\n{Fore.CYAN}Enter question IDs to process (e.g., 1-6, 1,5,7, 15-20 or press Enter for all): {Style.RESET_ALL}").strip()
-        
+        return self.parse_selection_string(selection, total_questions)
+
+    def parse_selection_string(self, selection: str, total_questions: int) -> List[int]:
+        selection = selection.strip()
         if not selection:
             return list(range(1, total_questions + 1))
         
@@ -154,21 +345,31 @@ class SQLGenerationPipeline:
 
     def load_schemas(self):
         try:
-            with open('data/sales_dw.json', 'r') as f:
-                self.sales_schema = json.load(f)
+            self.sales_schema, sales_hash = self._read_schema_file(os.path.join(self.config['data_dir'], 'sales_dw.json'))
             print(f"{Fore.GREEN}✓{Style.RESET_ALL} Loaded sales_dw schema")
             
-            with open('data/marketing_dw.json', 'r') as f:
-                self.marketing_schema = json.load(f)
+            self.marketing_schema, marketing_hash = self._read_schema_file(os.path.join(self.config['data_dir'], 'marketing_dw.json'))
             print(f"{Fore.GREEN}✓{Style.RESET_ALL} Loaded marketing_dw schema")
         except Exception as e:
             print(f"{Fore.RED}Error loading schemas: {e}{Style.RESET_ALL}")
             sys.exit(1)
 
+        # ⭐ ENHANCEMENT: Compile schema prompt text once; rebuild only if a schema file's content changed
+        schema_hashes = (sales_hash, marketing_hash)
+        if schema_hashes != self._schema_hashes or self._user_prompt_prefix is None:
+            self._compile_schema_prompts()
+            self._schema_hashes = schema_hashes
+
+    def _read_schema_file(self, path: str):
+        """Return (parsed schema, sha256 of the raw file content)"""
+        with open(path, 'rb') as f:
+            raw = f.read()
+        return json.loads(raw.decode('utf-8')), hashlib.sha256(raw).hexdigest()
+
     def load_questions(self):
         try:
             self.questions = []
-            with open('data/questions.csv', 'r', encoding='utf-8') as f:
+            with open(os.path.join(self.config['data_dir'], 'questions.csv'), 'r', encoding='utf-8') as f:
                 reader = csv.DictReader(f)
                 for row in reader:
                     self.questions.append({
@@ -180,9 +381,22 @@ class SQLGenerationPipeline:
             print(f"{Fore.RED}Error loading questions: {e}{Style.RESET_ALL}")
             sys.exit(1)
 
-    def initialize_groq(self):
+    def initialize_groq(self, interactive: bool = True):
         print(f"\n{Fore.YELLOW}Groq API Configuration{Style.RESET_ALL}")
         print("="*50)
+
+        # ⭐ ENHANCEMENT: Take the key from the environment when it is set — required for headless runs
+        api_key = os.environ.get(self.config['api_key_env'], '').strip()
+        if api_key or not interactive:
+            if not api_key:
+                print(f"{Fore.RED}✗ No API key: set ${self.config['api_key_env']} for headless runs{Style.RESET_ALL}")
+                sys.exit(1)
+            try:
+                self._connect_groq(api_key)
+                return
+            except Exception as e:
+                print(f"{Fore.RED}✗ API key from ${self.config['api_key_env']} rejected or network error: {e}{Style.RESET_ALL}")
+                sys.exit(1)
         
         max_retries = 3
         for attempt in range(1, max_retries + 1):
@@ -193,14 +407,7 @@ class SQLGenerationPipeline:
                 continue
 
             try:
-                self.groq_client = Groq(api_key=api_key)
-                # Test the connection with a minimal call
-                test_response = self.groq_client.chat.completions.create(
-                    model=self.config['model'],
-                    messages=[{"role": "user", "content": "Hello"}],
-                    max_tokens=5
-                )
-                print(f"\n{Fore.GREEN}✅ Success! Groq API key validated and connection established.{Style.RESET_ALL}")
+                self._connect_groq(api_key)
                 return  # Exit successfully
             
             except Exception as e:
@@ -212,232 +419,863 @@ class SQLGenerationPipeline:
                     print(f"{Fore.MAGENTA}💡 Tip: Ensure you're using a valid Groq API key from https://console.groq.com/keys{Style.RESET_ALL}")
                     sys.exit(1)
 
-    def format_schema_for_prompt(self, schema: Dict) -> str:
-        schema_text = f"Database: {schema['database']}\n\n"
-        for table_name, table_info in schema['tables'].items():
-            schema_text += f"📊 Table: {table_name}\nColumns:\n"
-            for col_name, col_info in table_info['columns'].items():
-                schema_text += f"  - {col_name}: {col_info['type']} — {col_info['description']}\n"
-            if 'relationships' in table_info:
-                schema_text += "🔗 Relationships:\n"
-                for rel in table_info['relationships']:
-                    schema_text += f"  - {rel}\n"
-            schema_text += "\n"
-        return schema_text
+    def _connect_groq(self, api_key: str):
+        # 429s are retried by our own scheduler, not the SDK's fixed backoff
+        self.llm_client = GroqBackend(api_key, base_url=self.config['llm_base_url'],
+                                      max_retries=0 if self.config['rate_limiting'] else 2)
+        if not self.config['validate_api_key']:
+            print(f"{Fore.GREEN}✓ Groq client created (validation call skipped){Style.RESET_ALL}")
+            return
+        # Test the connection with a minimal call
+        self.llm_client.complete([{"role": "user", "content": "Hello"}], self.config['model'], max_tokens=5)
+        print(f"\n{Fore.GREEN}✅ Success! Groq API key validated and connection established.{Style.RESET_ALL}")
 
-    def validate_and_fix_sql(self, sql: str, target_source: str) -> str:
-        sql = sql.rstrip(';')
-        if 'TOP ' in sql.upper():
-            match = re.search(r'TOP\s+(\d+)', sql, re.IGNORECASE)
-            if match:
-                limit_num = match.group(1)
-                sql = re.sub(r'SELECT\s+TOP\s+\d+', 'SELECT', sql, flags=re.IGNORECASE)
-                if 'LIMIT' not in sql.upper():
-                    sql += f' LIMIT {limit_num}'
-        sql = re.sub(r'DATE_SUBKATEX_INLINE_OPENCURRENT_DATE,\s*INTERVAL\s+(\d+)\s+(\w+)KATEX_INLINE_CLOSE',
-                     r"CURRENT_DATE - INTERVAL '\1 \2'", sql, flags=re.IGNORECASE)
-        sql = re.sub(r"INTERVAL\s+'(\d+)'\s+DAY", r"INTERVAL '\1 day'", sql, flags=re.IGNORECASE)
-        sql = re.sub(r"INTERVAL\s+'(\d+)'\s+MONTH", r"INTERVAL '\1 month'", sql, flags=re.IGNORECASE)
-        sql = re.sub(r"INTERVAL\s+'(\d+)'\s+YEAR", r"INTERVAL '\1 year'", sql, flags=re.IGNORECASE)
-        return sql
+    def initialize_llm_backend(self, interactive: bool = True):
+        """Groq goes through the key prompt/validation; other backends need only a base URL"""
+        if self.config['llm_backend'] == 'groq':
+            self.initialize_groq(interactive)
+            return
+        try:
+            self.llm_client = create_backend(self.config['llm_backend'],
+                                             api_key=os.environ.get(self.config['api_key_env']),
+                                             base_url=self.config['llm_base_url'])
+        except ValueError as e:
+            print(f"{Fore.RED}✗ {e}{Style.RESET_ALL}")
+            sys.exit(1)
+        print(f"\n{Fore.GREEN}✓ LLM backend: {self.llm_client.describe()}{Style.RESET_ALL}")
 
-    def extract_json_from_response(self, text: str) -> Optional[Dict]:
-        text = text.replace('```json', '').replace('```', '')
-        start_idx = text.find('{')
-        end_idx = text.rfind('}')
-        if start_idx == -1 or end_idx == -1:
-            return None
-        json_str = text[start_idx:end_idx + 1]
-        lines = json_str.split('\n')
-        cleaned_lines = []
-        in_string = False
-        for line in lines:
-            quote_count = line.count('"') - line.count('\\"')
-            if quote_count % 2 == 1:
-                in_string = not in_string
-            if in_string and cleaned_lines:
-                cleaned_lines[-1] += ' ' + line.strip()
-            else:
-                cleaned_lines.append(line.strip())
-        json_str = '\n'.join(cleaned_lines)
+    def initialize_rate_limiter(self):
+        if not self.config['rate_limiting']:
+            return
+        self.rate_limiter = RateLimitScheduler(
+            rpm=self.config['rpm_limit'],
+            tpm=self.config['tpm_limit'],
+            max_concurrency=self.config['concurrency'],
+            per_model=self.config['rate_limits'],
+            backoff_base=self.config['retry_delay']
+        )
+
+    def initialize_response_cache(self):
+        if not self.config['response_cache']:
+            return
         try:
-            return json.loads(json_str)
-        except json.JSONDecodeError:
-            json_str = re.sub(r',\s*}', '}', json_str)
-            json_str = re.sub(r',\s*]', ']', json_str)
-            try:
-                return json.loads(json_str)
-            except:
-                return None
+            self.response_cache = ResponseCache(
+                path=self.config['cache_path'],
+                max_entries=self.config['cache_max_entries'],
+                max_age_days=self.config['cache_max_age_days']
+            )
+            print(f"{Fore.GREEN}✓{Style.RESET_ALL} Response cache ready ({len(self.response_cache)} entries)")
+        except Exception as e:
+            self.response_cache = None
+            print(f"{Fore.YELLOW}⚠ Response cache disabled: {e}{Style.RESET_ALL}")
 
-    def generate_sql_for_question(self, question_data: Dict, attempt: int = 1) -> Dict:
-        question = question_data['question']
-        question_id = question_data['question_id']
+    def initialize_semantic_cache(self):
+        if not self.config['semantic_cache']:
+            return
+        try:
+            self.semantic_cache = SemanticQuestionCache(
+                threshold=self.config['semantic_cache_threshold'],
+                path=self.config['semantic_cache_path'],
+                namespace=self._semantic_namespace(),
+                max_entries=self.config['semantic_cache_max_entries'],
+                entity_terms=self._semantic_entity_terms()
+            )
+            print(f"{Fore.GREEN}✓{Style.RESET_ALL} Semantic question cache ready ({len(self.semantic_cache)} answered questions)")
+        except Exception as e:
+            self.semantic_cache = None
+            print(f"{Fore.YELLOW}⚠ Semantic question cache disabled: {e}{Style.RESET_ALL}")
 
-        sales_schema_text = self.format_schema_for_prompt(self.sales_schema)
-        marketing_schema_text = self.format_schema_for_prompt(self.marketing_schema)
+    def _semantic_namespace(self) -> str:
+        """Reused answers are only valid for the same schema content, model(s), dialect and temperature"""
+        key = [list(self._schema_hashes or ()), self._model_label(), self.config['sql_dialect'],
+               self.config['temperature']]
+        return hashlib.sha256(json.dumps(key).encode('utf-8')).hexdigest()[:16]
 
-        # ⭐ ENHANCEMENT: Removed prescriptive confidence scale — AI decides freely
-        system_prompt = f"""You are an expert SQL architect. Generate ANSI SQL ONLY IF all required data exists within ONE schema.
+    def _semantic_entity_terms(self) -> set:
+        """Table names and one-word column names (region, channel, brand…): questions must name the same ones to share an answer"""
+        terms = set()
+        for schema in (self.sales_schema, self.marketing_schema):
+            for table_name, table_info in schema['tables'].items():
+                terms.add(table_name.lower())
+                terms.update(col.lower() for col in table_info['columns'] if '_' not in col)
+        return terms - GENERIC_TERMS
 
-🧠 YOU MUST THINK STEP-BY-STEP AND SELF-ASSESS:
+    def format_schema_for_prompt(self, schema: Dict) -> str:
+        parts = [f"Database: {schema['database']}\n\n"]
+        for table_name, table_info in schema['tables'].items():
+            parts.append(self._format_table(table_name, table_info))
+        return ''.join(parts)
 
-1. PARSE: What tables and columns does this question need?
-2. VALIDATE PER SCHEMA:
-   - Check sales_dw: Do ALL required tables/columns exist here?
-   - Check marketing_dw: Do ALL required tables/columns exist here?
-   → If split across schemas → explain why you cannot generate.
-3. JOIN LOGIC: Use only documented relationships (foreign keys).
-4. CONFIDENCE: Assign a decimal score from 0.0 to 1.0 based on your OWN judgment of certainty.
-   → 1.0 = fully certain, 0.0 = impossible or missing data
-   → No predefined thresholds — be honest and nuanced.
-5. ASSUMPTIONS: Explain what you checked, why you chose target_source, and justification for confidence.
+    def _format_table(self, table_name: str, table_info: Dict) -> str:
+        parts = [f"📊 Table: {table_name}\nColumns:\n"]
+        for col_name, col_info in table_info['columns'].items():
+            parts.append(f"  - {col_name}: {col_info['type']} — {col_info['description']}\n")
+        if 'relationships' in table_info:
+            parts.append("🔗 Relationships:\n")
+            for rel in table_info['relationships']:
+                parts.append(f"  - {rel}\n")
+        parts.append("\n")
+        return ''.join(parts)
 
-📤 OUTPUT FORMAT (STRICT JSON — NO EXTRA TEXT):
-{{
-  "question_id": {question_id},
-  "question": "{question}",
-  "target_source": "sales_dw | marketing_dw | N/A",
-  "sql": "SELECT ... ; OR '-- Cannot generate: [reason]'",
-  "assumptions": "Your detailed reasoning — what you validated, what you assumed",
-  "confidence": 0.0 to 1.0 (your own judgment)
-}}
+    def _compile_schema_prompts(self):
+        """Render both schemas and the static head of the user prompt once per schema version"""
+        schemas = {'sales_dw': self.sales_schema, 'marketing_dw': self.marketing_schema}
+        self._schema_texts = {name: self.format_schema_for_prompt(s) for name, s in schemas.items()}
+        self._table_texts = {
+            name: {t: self._format_table(t, info) for t, info in s['tables'].items()}
+            for name, s in schemas.items()
+        }
+        self._schema_indexes = {name: SchemaIndex(s) for name, s in schemas.items()}
+        self.router = QueryRouter(self._schema_indexes, min_score=self.config['routing_min_score'])
+        if self.config['sql_validation']:
+            self.sql_validator = ShadowValidator(schemas, self.config['validation_rows'])
+        self._user_prompt_prefix = (
+            "🔍 AVAILABLE SCHEMAS — YOU MUST VALIDATE TABLE EXISTENCE:\n\n"
+            f"🔷 SALES DATA WAREHOUSE:\n{self._schema_texts['sales_dw']}\n\n"
+            f"🔷 MARKETING DATA WAREHOUSE:\n{self._schema_texts['marketing_dw']}\n\n"
+            "❓ QUESTION TO ANSWER:\n"
+        )
 
-⚠️ NEVER BLUFF. If unsure → confidence low. You are graded on honesty and reasoning depth.
-"""
+    # ⭐ ENHANCEMENT: Schema pruning — only candidate tables (plus FK neighbours) go into the prompt
+    def _build_schema_prefix(self, question: str, sources: Optional[List[str]] = None) -> str:
+        """Per-question schema section: drops schemas the router ruled out and, if enabled, prunes tables"""
+        sections = []
+        for name in ('sales_dw', 'marketing_dw'):
+            if sources is not None and name not in sources:
+                sections.append(f"Database: {name}\n\n(Omitted — the question references no {name} tables or columns)\n")
+                continue
+            if not self.config['schema_pruning']:
+                sections.append(self._schema_texts[name])
+                continue
+            selected = self._schema_indexes[name].select_tables(
+                question, max_tables=self.config['schema_prune_max_tables'])
+            omitted = [t for t in self._table_texts[name] if t not in selected]
+            text = f"Database: {name}\n\n" + ''.join(self._table_texts[name][t] for t in selected)
+            if omitted:
+                text += f"(Other tables not relevant to this question: {', '.join(omitted)})\n"
+            sections.append(text)
+        return (
+            "🔍 AVAILABLE SCHEMAS — YOU MUST VALIDATE TABLE EXISTENCE:\n\n"
+            f"🔷 SALES DATA WAREHOUSE:\n{sections[0]}\n\n"
+            f"🔷 MARKETING DATA WAREHOUSE:\n{sections[1]}\n\n"
+            "❓ QUESTION TO ANSWER:\n"
+        )
 
-        user_prompt = f"""🔍 AVAILABLE SCHEMAS — YOU MUST VALIDATE TABLE EXISTENCE:
+    def build_prompt_messages(self, question_data: Dict, sources: Optional[List[str]] = None) -> List[Dict]:
+        """Assemble chat messages from the cached prefix — only the question part is built per call"""
+        if self._user_prompt_prefix is None:
+            self._compile_schema_prompts()
+        if self.config['schema_pruning'] or sources is not None:
+            prefix = self._build_schema_prefix(question_data['question'], sources)
+        else:
+            prefix = self._user_prompt_prefix
+        user_prompt = (
+            prefix
+            + f"Question ID: {question_data['question_id']}\n"
+            + f"Question: \"{question_data['question']}\"\n"
+            + USER_PROMPT_TASK
+        )
+        return [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": user_prompt}
+        ]
 
-🔷 SALES DATA WAREHOUSE:
-{sales_schema_text}
+    # ⭐ ENHANCEMENT: Lexer-based dialect normalizer — one pass, precompiled rules, pluggable targets
+    def validate_and_fix_sql(self, sql: str, target_source: str) -> str:
+        return normalize_sql(sql, self.config['sql_dialect'])
 
-🔷 MARKETING DATA WAREHOUSE:
-{marketing_schema_text}
+    # ⭐ ENHANCEMENT: Single-pass balanced-brace scanner — string/escape aware, tolerates trailing commas
+    def extract_json_from_response(self, text: str) -> Optional[Dict]:
+        return extract_json_object(text)
 
-❓ QUESTION TO ANSWER:
-Question ID: {question_id}
-Question: "{question}"
+    # ⭐ ENHANCEMENT: Single call site for the LLM — cache lookup, API call, token/latency tracking
+    def _call_llm(self, messages: List[Dict], question_id: int, max_tokens: Optional[int] = None,
+                  log_extra: Optional[Dict] = None, expected_objects: int = 1, model: Optional[str] = None) -> Dict:
+        """Return {'text', 'cached', 'cache_key', 'usage'} for one chat completion"""
+        model = model or self.config['model']
+        max_tokens = max_tokens or self.config['max_tokens']
+        cache_key = None
+        if self.response_cache is not None:
+            cache_key = ResponseCache.make_key(
+                model,
+                {'temperature': self.config['temperature'], 'max_tokens': max_tokens},
+                messages
+            )
 
-✅ YOUR TASK:
-- Decide which schema contains ALL required data.
-- Write SQL ONLY if data exists in ONE schema.
-- If joining tables, confirm they share a relationship.
-- BE TRANSPARENT in assumptions — explain your validation steps.
-- SCORE CONFIDENCE HONESTLY — no overconfidence, no predefined buckets.
-"""
+        # ⭐ ENHANCEMENT: Serve repeated prompts from the on-disk cache without a network call
+        cached = self.response_cache.get(cache_key) if cache_key else None
+        if cached is not None:
+            with self._metrics_lock:
+                self.cache_stats['hits'] += 1
+            return {'text': cached['response'], 'cached': True, 'cache_key': cache_key,
+                    'usage': {'prompt_tokens': cached['prompt_tokens'], 'completion_tokens': cached['completion_tokens']}}
 
-        try:
+        # ⭐ ENHANCEMENT: Shared RPM/TPM scheduler — waits for budget, backs off on 429 with jitter
+        limiter = self.rate_limiter.for_model(model) if self.rate_limiter else None
+        est_tokens = sum(len(m['content']) for m in messages) // 4 + self._expected_completion_tokens(max_tokens)
+        rate_limit_attempt = 0
+        while True:
+            if limiter:
+                limiter.acquire(est_tokens)
             start_time = time.time()
-            response = self.groq_client.chat.completions.create(
-                model=self.config['model'],
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=self.config['temperature'],
-                max_tokens=self.config['max_tokens']
-            )
+            try:
+                if self.config['streaming']:
+                    response = self._stream_completion(messages, model, max_tokens, expected_objects, start_time)
+                else:
+                    response = self.llm_client.complete(messages, model,
+                                                        temperature=self.config['temperature'],
+                                                        max_tokens=max_tokens)
+            except Exception as e:
+                if limiter is None:
+                    raise
+                limited = is_rate_limited(e)
+                retry_after = parse_retry_after(e) if limited else None
+                limiter.release(est_tokens, rate_limited=limited, retry_after=retry_after)
+                if not limited or rate_limit_attempt >= self.config['rate_limit_retries']:
+                    raise
+                time.sleep(self.rate_limiter.backoff_delay(rate_limit_attempt, retry_after))
+                rate_limit_attempt += 1
+                continue
             end_time = time.time()
+            if limiter:
+                limiter.release(est_tokens, actual_tokens=response['usage']['total_tokens'])
+            break
 
-            # ⭐ ENHANCEMENT: Track tokens and latency
-            usage = response.usage
+        # ⭐ ENHANCEMENT: Track tokens and latency
+        usage = response['usage']
+        with self._metrics_lock:
             self.token_usage.append({
                 'question_id': question_id,
-                'prompt_tokens': usage.prompt_tokens,
-                'completion_tokens': usage.completion_tokens,
-                'total_tokens': usage.total_tokens
+                'model': model,
+                'prompt_tokens': usage['prompt_tokens'],
+                'completion_tokens': usage['completion_tokens'],
+                'total_tokens': usage['total_tokens'],
+                **(log_extra or {})
             })
-            self.latency_log.append({
+            latency = {
                 'question_id': question_id,
+                'model': model,
                 'latency_sec': round(end_time - start_time, 2)
-            })
+            }
+            if 'ttft_sec' in response:
+                latency.update({key: response[key] for key in ('ttft_sec', 'json_complete_sec', 'closed_early')})
+            self.latency_log.append(latency)
+            if cache_key:
+                self.cache_stats['misses'] += 1
+
+        return {'text': response['text'].strip(), 'cached': False, 'cache_key': cache_key,
+                'usage': {'prompt_tokens': usage['prompt_tokens'], 'completion_tokens': usage['completion_tokens']}}
+
+    # ⭐ ENHANCEMENT: Streaming — parse deltas as they arrive, hang up once the answer's JSON has closed
+    def _stream_completion(self, messages: List[Dict], model: str, max_tokens: int, expected_objects: int,
+                           start_time: float) -> Dict:
+        """Same shape as LLMBackend.complete(), plus time-to-first-token and time-to-JSON-complete"""
+        stream = self.llm_client.stream(messages, model,
+                                        temperature=self.config['temperature'], max_tokens=max_tokens)
+        scanner = JSONObjectScanner()
+        pieces = []
+        ttft = json_complete = None
+        completed = 0
+        try:
+            for delta in stream:
+                if ttft is None:
+                    ttft = time.time() - start_time
+                pieces.append(delta)
+                completed += len(scanner.feed(delta))
+                if completed >= expected_objects:
+                    json_complete = time.time() - start_time
+                    break
+        finally:
+            stream.close()
+
+        text = ''.join(pieces)
+        usage = stream.usage
+        if usage is None:
+            # Hung up before the provider's usage chunk — estimate at ~4 characters per token
+            prompt_tokens = sum(len(m['content']) for m in messages) // 4
+            usage = {'prompt_tokens': prompt_tokens, 'completion_tokens': len(text) // 4,
+                     'total_tokens': prompt_tokens + len(text) // 4}
+        return {
+            'text': text,
+            'usage': usage,
+            'ttft_sec': round(ttft, 3) if ttft is not None else None,
+            'json_complete_sec': round(json_complete, 3) if json_complete is not None else None,
+            'closed_early': not stream.finished
+        }
+
+    def _expected_completion_tokens(self, max_tokens: int) -> int:
+        """Completion size to reserve against the TPM budget — the running average once we have one"""
+        with self._metrics_lock:
+            if self.token_usage:
+                return min(max_tokens, sum(t['completion_tokens'] for t in self.token_usage) // len(self.token_usage))
+        return min(max_tokens, 500)
+
+    def _remember_response(self, call: Dict):
+        """Store a response in the cache once it has parsed successfully"""
+        if call['cache_key'] and not call['cached']:
+            self.response_cache.put(call['cache_key'], call['text'],
+                                    call['usage']['prompt_tokens'], call['usage']['completion_tokens'])
+
+    def _finalize_result(self, result: Dict, question_data: Dict) -> Optional[Dict]:
+        """Fill in defaults and validate the SQL; None when the JSON is not a usable answer (no string "sql")"""
+        if not isinstance(result.get('sql'), str):
+            return None
+        result.setdefault('question_id', question_data['question_id'])
+        result.setdefault('question', question_data['question'])
+        result['target_source'] = str(result.get('target_source') or 'N/A')
+        result['assumptions'] = str(result.get('assumptions') or 'AI did not provide reasoning')
+        result['confidence'] = coerce_confidence(result.get('confidence'))
+
+        if result['confidence'] > 0 and not result['sql'].startswith('--'):
+            result['sql'] = self.validate_and_fix_sql(result['sql'], result.get('target_source', ''))
+            if self.sql_validator is not None:
+                self._validate_result(result)
+
+        return result
+
+    # ⭐ ENHANCEMENT: Prepare the SQL against the shadow schemas — catches unknown tables/columns in µs
+    def _validate_result(self, result: Dict):
+        stage_start = time.perf_counter()
+        check = self.sql_validator.validate(result['sql'], result.get('target_source'))
+        self._time_stage('sql_validate', stage_start)
+        result['validation'] = check['status']
+        if check['error']:
+            result['validation_error'] = check['error']
+        else:
+            result.pop('validation_error', None)
+        with self._metrics_lock:
+            self.validation_stats[check['status']] += 1
 
-            response_text = response.choices[0].message.content.strip()
-            result = self.extract_json_from_response(response_text)
+    def generate_sql_for_question(self, question_data: Dict, sources: Optional[List[str]] = None,
+                                  model: Optional[str] = None, repair: bool = True) -> Dict:
+        stage_start = time.perf_counter()
+        messages = self.build_prompt_messages(question_data, sources)
+        self._time_stage('prompt_build', stage_start)
+        return self._answer_with_repairs(question_data, messages, sources, model=model, repair=repair)
+
+    # ⭐ ENHANCEMENT: Iterative repair loop — each failure stage has its own budget, and a JSON or SQL
+    # failure gets a short follow-up (error + previous output) instead of a blind full resend
+    def _answer_with_repairs(self, question_data: Dict, messages: List[Dict],
+                             sources: Optional[List[str]] = None, first: Optional[tuple] = None,
+                             model: Optional[str] = None, repair: bool = True) -> Dict:
+        """Call, parse, validate, repair until valid or a stage's budget is spent.
+
+        `first` is an already finalized (text, result) pair to start from, e.g. a batch item.
+        With repair=False only API errors are retried — a cascade tier escalates instead.
+        """
+        question_id = question_data['question_id']
+        budgets = {'transport': max(1, self.config['retry_attempts']) - 1,
+                   'json': self.config['json_repair_attempts'] if repair else 0,
+                   'sql': self.config['sql_repair_attempts'] if repair else 0}
+        used = dict.fromkeys(budgets, 0)
+        full_prompt_tokens = sum(len(m['content']) for m in messages) // 4
+        request, max_tokens, log_extra = messages, None, None
+
+        while True:
+            call = None
+            if first is not None:
+                text, result = first
+                first = None
+            else:
+                try:
+                    call = self._call_llm(request, question_id, max_tokens=max_tokens, log_extra=log_extra, model=model)
+                except Exception as e:
+                    if used['transport'] >= budgets['transport']:
+                        return self._failed_result(question_data, f"System error after {used['transport'] + 1} attempts: {e}")
+                    used['transport'] += 1
+                    with self._metrics_lock:
+                        self.repair_stats['transport'] += 1
+                    print(f"{Fore.YELLOW}  Retry {used['transport']}/{budgets['transport']} for Q{question_id}{Style.RESET_ALL}")
+                    if self.rate_limiter:
+                        time.sleep(self.rate_limiter.backoff_delay(used['transport']))
+                    else:
+                        time.sleep(self.config['retry_delay'])
+                    continue
+                text = call['text']
+                stage_start = time.perf_counter()
+                result = self.extract_json_from_response(text)
+                self._time_stage('json_parse', stage_start)
+                if result is not None:
+                    result = self._finalize_result(result, question_data)
 
             if result is None:
-                raise ValueError("Failed to parse LLM response as JSON")
+                stage, error = 'json', 'the output was not a single valid JSON object with a string "sql" field'
+            elif result.get('validation') == INVALID:
+                stage, error = 'sql', f"the SQL failed validation against the warehouse schema: {result['validation_error']}"
+            else:
+                if call is not None:
+                    self._remember_response(call)
+                if used['json'] or used['sql']:
+                    with self._metrics_lock:
+                        self.repair_stats['repaired'] += 1
+                return result
 
-            result.setdefault('question_id', question_id)
-            result.setdefault('question', question)
-            result.setdefault('target_source', 'N/A')
-            result.setdefault('sql', '-- Error parsing response')
-            result.setdefault('assumptions', 'AI did not provide reasoning')
-            result.setdefault('confidence', 0.0)
+            if used[stage] >= budgets[stage]:
+                if stage == 'json':
+                    return self._failed_result(question_data, f"No parseable JSON answer after {used['json']} repair attempts")
+                # Keep the SQL for inspection but make sure nothing downstream trusts it
+                result['assumptions'] = f"[Failed local validation: {result['validation_error']}] {result['assumptions']}"
+                result['confidence'] = 0.0
+                return result
+            used[stage] += 1
+            with self._metrics_lock:
+                self.repair_stats[stage] += 1
+            request = self._repair_messages(question_data, text, error, result if stage == 'sql' else None, sources)
+            max_tokens = self.config['repair_max_tokens']
+            log_extra = {'repair': stage, 'full_prompt_tokens': full_prompt_tokens}
 
-            if result.get('confidence', 0) > 0 and 'sql' in result and not result['sql'].startswith('--'):
-                result['sql'] = self.validate_and_fix_sql(result['sql'], result.get('target_source', ''))
+    def _repair_messages(self, question_data: Dict, previous: str, error: str, result: Optional[Dict],
+                         sources: Optional[List[str]]) -> List[Dict]:
+        if len(previous) > REPAIR_CONTEXT_CHARS:
+            previous = previous[:REPAIR_CONTEXT_CHARS] + ' …'
+        hint = ''
+        if result is not None:
+            hint = "Tables you may use:\n" + self._repair_schema_hint(question_data['question'], result['sql'], sources) + "\n"
+        return [
+            {"role": "system", "content": REPAIR_SYSTEM_PROMPT},
+            {"role": "user", "content": REPAIR_PROMPT.format(
+                question_id=question_data['question_id'], question=question_data['question'],
+                previous=previous, error=error, hint=hint)}
+        ]
 
-            return result
+    def _repair_schema_hint(self, question: str, sql: str, sources: Optional[List[str]]) -> str:
+        """One line per table the SQL names or the question matches: enough to fix a name, far less than the schema"""
+        words = set(SQL_WORD_RE.findall(sql.lower()))
+        schemas = {'sales_dw': self.sales_schema, 'marketing_dw': self.marketing_schema}
+        lines = []
+        for name, schema in schemas.items():
+            if sources is not None and name not in sources:
+                continue
+            relevant = set(self._schema_indexes[name].select_tables(
+                question, max_tables=self.config['schema_prune_max_tables']))
+            for table, info in schema['tables'].items():
+                if table.lower() in words or table in relevant:
+                    lines.append(f"  {name}.{table}({', '.join(info['columns'])})")
+        return '\n'.join(lines) or "  (no table matches — say so with confidence 0 if the data does not exist)"
+
+    def _failed_result(self, question_data: Dict, reason: str) -> Dict:
+        return {
+            "question_id": question_data['question_id'],
+            "question": question_data['question'],
+            "target_source": "Unknown",
+            "sql": "-- Error during generation",
+            "assumptions": reason,
+            "confidence": 0.0
+        }
 
+    # ⭐ ENHANCEMENT: Batch mode — N questions share one system prompt and one schema block
+    def build_batch_messages(self, batch: List[Dict], sources: Optional[List[str]] = None) -> List[Dict]:
+        if self._user_prompt_prefix is None:
+            self._compile_schema_prompts()
+        if self.config['schema_pruning'] or sources is not None:
+            prefix = self._build_schema_prefix(' '.join(q['question'] for q in batch), sources)
+        else:
+            prefix = self._user_prompt_prefix
+        question_lines = ''.join(self._batch_question_block(q) for q in batch)
+        return [
+            {"role": "system", "content": SYSTEM_PROMPT + BATCH_PROMPT_SUFFIX},
+            {"role": "user", "content": prefix + question_lines + USER_PROMPT_TASK}
+        ]
+
+    def _batch_question_block(self, question_data: Dict) -> str:
+        return f"Question ID: {question_data['question_id']}\nQuestion: \"{question_data['question']}\"\n\n"
+
+    def generate_sql_for_batch(self, batch: List[Dict], sources: Optional[List[str]] = None,
+                               model: Optional[str] = None, repair: bool = True) -> Dict[int, Dict]:
+        """Answer several questions in one request; returns only the items that parsed cleanly"""
+        stage_start = time.perf_counter()
+        messages = self.build_batch_messages(batch, sources)
+        self._time_stage('prompt_build', stage_start)
+        ids = [q['question_id'] for q in batch]
+
+        # Estimate what the same questions would have cost one-by-one: each would repeat the shared part
+        question_chars = sum(len(self._batch_question_block(q)) for q in batch)
+        batch_chars = len(messages[0]['content']) + len(messages[1]['content'])
+        shared_chars = batch_chars - question_chars
+
+        try:
+            call = self._call_llm(
+                messages, ids[0],
+                max_tokens=min(self.config['max_tokens'] * len(batch), self.config['batch_max_tokens']),
+                expected_objects=len(batch),
+                model=model,
+                log_extra={'batch_ids': ids, 'batch_size': len(batch),
+                           'unbatched_prompt_factor': round((len(batch) * shared_chars + question_chars) / batch_chars, 3)}
+            )
         except Exception as e:
-            if attempt < self.config['retry_attempts']:
-                print(f"{Fore.YELLOW}  Retry {attempt}/{self.config['retry_attempts']} for Q{question_id}{Style.RESET_ALL}")
-                time.sleep(self.config['retry_delay'])
-                return self.generate_sql_for_question(question_data, attempt + 1)
+            print(f"{Fore.YELLOW}  Batch {ids[0]}–{ids[-1]} failed ({e}); falling back to single questions{Style.RESET_ALL}")
+            return {}
 
+        stage_start = time.perf_counter()
+        items = self._split_batch_response(call['text'])
+        self._time_stage('json_parse', stage_start)
+        by_id = {q['question_id']: q for q in batch}
+        answered = {}
+        for position, item in enumerate(items):
+            qid = item.get('question_id')
+            try:
+                qid = int(qid)
+            except (TypeError, ValueError):
+                qid = ids[position] if position < len(ids) and len(items) == len(ids) else None
+            if qid in by_id and qid not in answered:
+                item['question_id'] = qid
+                result = self._finalize_result(item, by_id[qid])
+                if result is not None:  # malformed items are re-asked on their own, like missing ones
+                    answered[qid] = result
+
+        invalid = [qid for qid, result in answered.items() if result.get('validation') == INVALID]
+        if len(answered) == len(batch) and not invalid:
+            self._remember_response(call)
+        for qid in invalid if repair else ():
+            # Only the broken answers go back to the model, each with its own single-question prompt
+            previous = json.dumps({key: answered[qid][key] for key in
+                                   ('question_id', 'target_source', 'sql', 'assumptions', 'confidence')},
+                                  ensure_ascii=False)
+            answered[qid] = self._answer_with_repairs(
+                by_id[qid], self.build_prompt_messages(by_id[qid], sources), sources,
+                first=(previous, answered[qid]), model=model)
+        return answered
+
+    def _split_batch_response(self, text: str) -> List[Dict]:
+        """Split a JSON-array answer into per-question objects, salvaging whatever parses"""
+        return extract_json_objects(text)
+
+    def _answer_locally(self, question_data: Dict):
+        """Return (result, sources): a result when the router or semantic cache can answer without the LLM"""
+        route = self._route_question(question_data)
+        if route is not None and route['decision'] == 'refuse':
             return {
-                "question_id": question_id,
-                "question": question,
-                "target_source": "Unknown",
-                "sql": "-- Error during generation",
-                "assumptions": f"System error after {self.config['retry_attempts']} retries: {str(e)}",
+                "question_id": question_data['question_id'],
+                "question": question_data['question'],
+                "target_source": "N/A",
+                "sql": f"-- Cannot generate: {route['reason']}",
+                "assumptions": f"[Pre-router] Cannot generate: {route['reason']}. No LLM call was made.",
                 "confidence": 0.0
-            }
+            }, None
+        sources = [route['source']] if route is not None and route['decision'] == 'route' else None
+
+        match = self.semantic_cache.lookup(question_data['question']) if self.semantic_cache else None
+        if self.semantic_cache is not None:
+            with self._metrics_lock:
+                self.semantic_stats['lookups'] += 1
+                if match is not None:
+                    self.semantic_stats['hits'] += 1
+
+        if match is not None:
+            cached, similarity = match
+            result = dict(cached)
+            result['reused_from'] = cached['question_id']
+            result['question_id'] = question_data['question_id']
+            result['question'] = question_data['question']
+            # The answer was checked against another question: scale its confidence by how close that was
+            result['confidence'] = round(coerce_confidence(cached.get('confidence')) * similarity, 3)
+            result['assumptions'] = (f"[Reused answer of Q{cached['question_id']} "
+                                     f"(similarity {similarity:.2f})] {cached.get('assumptions', '')}")
+            return result, sources
+
+        return None, sources
+
+    def _remember_answer(self, question_data: Dict, result: Dict):
+        if (self.semantic_cache is not None and result.get('target_source') != 'Unknown'
+                and result.get('validation') != INVALID
+                and coerce_confidence(result.get('confidence')) >= self.config['semantic_cache_min_confidence']):
+            self.semantic_cache.add(question_data['question'], result)
+
+    # ⭐ ENHANCEMENT: Reuse answers of near-duplicate questions before calling the LLM
+    def answer_question(self, question_data: Dict) -> Dict:
+        """Route locally, serve paraphrases of already-answered questions, otherwise generate"""
+        result, sources = self._answer_locally(question_data)
+        if result is not None:
+            return result
+
+        result = self._generate(question_data, sources)
+        self._remember_answer(question_data, result)
+        return result
+
+    def _generate(self, question_data: Dict, sources: Optional[List[str]] = None) -> Dict:
+        if self.config['cascade']:
+            return self._generate_with_cascade(question_data, sources)
+        return self.generate_sql_for_question(question_data, sources=sources)
+
+    # ⭐ ENHANCEMENT: Model cascade — the small model answers first; a broken, invalid or unsure
+    # answer escalates the question to the next model
+    def _generate_with_cascade(self, question_data: Dict, sources: Optional[List[str]] = None,
+                               first: Optional[tuple] = None) -> Dict:
+        """`first` is a (result, seconds) answer the first model already gave, e.g. in a batch"""
+        models = self.config['cascade_models']
+        for tier, model in enumerate(models):
+            last = tier == len(models) - 1
+            if first is not None:
+                (result, seconds), first = first, None
+            else:
+                start = time.perf_counter()
+                # Repair follow-ups are spent on the last model only; earlier ones escalate instead
+                result = self.generate_sql_for_question(question_data, sources, model=model, repair=last)
+                seconds = time.perf_counter() - start
+            reason = None if last else self._escalation_reason(result)
+            self._record_tier(model, seconds, reason)
+            if reason is None:
+                result['answered_by'] = model
+                return result
+
+    def _escalation_reason(self, result: Dict) -> Optional[str]:
+        if result.get('target_source') == 'Unknown':
+            return 'json'  # no parseable answer, or the API kept failing
+        if result.get('validation') == INVALID:
+            return 'sql'
+        if coerce_confidence(result.get('confidence')) < self.config['cascade_min_confidence']:
+            return 'confidence'
+        return None
+
+    def _record_tier(self, model: str, seconds: float, reason: Optional[str]):
+        with self._metrics_lock:
+            stats = self.cascade_stats.setdefault(model, {
+                'attempts': 0, 'accepted': 0, 'seconds': 0.0,
+                'escalated': {'json': 0, 'sql': 0, 'confidence': 0}})
+            stats['attempts'] += 1
+            stats['seconds'] += seconds
+            if reason is None:
+                stats['accepted'] += 1
+            else:
+                stats['escalated'][reason] += 1
+
+    def answer_batch(self, batch: List[Dict]) -> List[Dict]:
+        """Batch counterpart of answer_question; failed items fall back to single-question calls"""
+        results = {}
+        pending = []
+        pending_sources = {}
+        for question_data in batch:
+            result, sources = self._answer_locally(question_data)
+            if result is not None:
+                results[question_data['question_id']] = result
+            else:
+                pending.append(question_data)
+                pending_sources[question_data['question_id']] = sources
+
+        if len(pending) > 1:
+            # Share a single-schema prompt only when the router sent every pending question to the same schema
+            distinct = {tuple(s) if s else None for s in pending_sources.values()}
+            shared_sources = list(distinct.pop()) if len(distinct) == 1 and None not in distinct else None
+            if self.config['cascade']:
+                # The batch goes to the first model; each item it got wrong escalates on its own
+                start = time.perf_counter()
+                answered = self.generate_sql_for_batch(pending, shared_sources,
+                                                       model=self.config['cascade_models'][0], repair=False)
+                # One request answered every pending question: each is charged its share of the wait
+                seconds = (time.perf_counter() - start) / len(pending)
+                for qid, result in answered.items():
+                    answered[qid] = self._generate_with_cascade(
+                        next(q for q in pending if q['question_id'] == qid), pending_sources[qid],
+                        first=(result, seconds))
+            else:
+                answered = self.generate_sql_for_batch(pending, shared_sources)
+            for question_data in pending:
+                if question_data['question_id'] in answered:
+                    results[question_data['question_id']] = answered[question_data['question_id']]
+                    self._remember_answer(question_data, answered[question_data['question_id']])
+
+        for question_data in pending:
+            if question_data['question_id'] not in results:
+                result = self._generate(question_data, pending_sources[question_data['question_id']])
+                self._remember_answer(question_data, result)
+                results[question_data['question_id']] = result
+
+        return [results[q['question_id']] for q in batch]
+
+    # ⭐ ENHANCEMENT: Deterministic pre-router — decide target_source from schema vocabulary
+    def _route_question(self, question_data: Dict) -> Optional[Dict]:
+        if not self.config['pre_routing']:
+            return None
+        if self.router is None:
+            self._compile_schema_prompts()
+        start_time = time.perf_counter()
+        route = self.router.route(question_data['question'])
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
+        with self._metrics_lock:
+            self.routing_log.append({
+                'question_id': question_data['question_id'],
+                'decision': route['decision'],
+                'source': route['source'],
+                'reason': route['reason'],
+                'route_ms': round(elapsed_ms, 3)
+            })
+        return route
 
     def process_all_questions(self):
         print(f"\n{Fore.YELLOW}Generating SQL Queries — AI thinks, validates & scores freely{Style.RESET_ALL}")
         print("="*70)
 
         # ⭐ ENHANCEMENT: Let user pick questions
-        selected_ids = self.parse_question_selection(len(self.questions))
-        selected_questions = [q for q in self.questions if q['question_id'] in selected_ids]
+        if self.config['questions'] is not None:
+            selected_ids = self.parse_selection_string(self.config['questions'], len(self.questions))
+        else:
+            selected_ids = self.parse_question_selection(len(self.questions))
+        wanted = set(selected_ids)
+        selected_questions = [q for q in self.questions if q['question_id'] in wanted]
+        if self.config['shard']:
+            index, count = self.config['shard']
+            selected_questions = selected_questions[index - 1::count]
+            selected_ids = [q['question_id'] for q in selected_questions]
 
-        print(f"{Fore.CYAN}Processing {len(selected_questions)} selected questions: {selected_ids}{Style.RESET_ALL}")
+        shown = selected_ids if len(selected_ids) <= 50 else f"{selected_ids[:50]} … (+{len(selected_ids) - 50} more)"
+        print(f"{Fore.CYAN}Processing {len(selected_questions)} selected questions: {shown}{Style.RESET_ALL}")
 
-        with tqdm(total=len(selected_questions), desc="Processing", 
-                  bar_format="{l_bar}{bar}| {n_fmt}/{total_fmt} [{elapsed}<{remaining}]") as pbar:
-            
-            for question_data in selected_questions:
-                result = self.generate_sql_for_question(question_data)
-                self.results.append(result)
+        # ⭐ ENHANCEMENT: Crash-safe checkpoint — every result is appended the moment it completes
+        if self.config['checkpoint_path'] != '':
+            selected_questions = self._open_checkpoint(selected_questions)
+
+        batch_size = max(1, self.config['batch_size'])
+        units = [selected_questions[i:i + batch_size] for i in range(0, len(selected_questions), batch_size)]
+
+        try:
+            with tqdm(total=len(selected_questions), desc="Processing", 
+                      bar_format="{l_bar}{bar}| {n_fmt}/{total_fmt} [{elapsed}<{remaining}]") as pbar:
                 
-                conf = result.get('confidence', 0)
-                if conf >= 0.8:
-                    pbar.set_postfix_str(f"{Fore.GREEN}✓ Confident{Style.RESET_ALL}")
-                elif conf >= 0.5:
-                    pbar.set_postfix_str(f"{Fore.YELLOW}⚠ Unsure{Style.RESET_ALL}")
+                if self.config['concurrency'] > 1:
+                    self._process_concurrently(units, pbar)
                 else:
-                    pbar.set_postfix_str(f"{Fore.RED}✗ Can't generate{Style.RESET_ALL}")
-                
-                pbar.update(1)
+                    for unit in units:
+                        for result in self._answer_unit(unit):
+                            self._record_result(pbar, result)
+        finally:
+            if self.checkpoint is not None:
+                self.checkpoint.close()
+
+        # Keep metric logs in question order regardless of completion order
+        order = {q['question_id']: i for i, q in enumerate(selected_questions)}
+        self.token_usage.sort(key=lambda t: order.get(t['question_id'], len(order)))
+        self.latency_log.sort(key=lambda l: order.get(l['question_id'], len(order)))
+
+    def _answer_unit(self, unit: List[Dict]) -> List[Dict]:
+        start = time.perf_counter()
+        results = self.answer_batch(unit) if len(unit) > 1 else [self.answer_question(unit[0])]
+        # Every question in a batch waited for the whole batch
+        elapsed = time.perf_counter() - start
+        with self._metrics_lock:
+            self.stage_timings['question'].extend([elapsed] * len(results))
+        return results
+
+    def _time_stage(self, stage: str, start: float):
+        elapsed = time.perf_counter() - start
+        with self._metrics_lock:
+            self.stage_timings[stage].append(elapsed)
+
+    # ⭐ ENHANCEMENT: Bounded thread pool — results come back in question order
+    def _process_concurrently(self, units: List[List[Dict]], pbar):
+        """Run questions (or batches) on a bounded thread pool, preserving input order.
+
+        At most 2 x concurrency units are submitted at a time. On Ctrl+C the units that already
+        finished are still recorded, and the ones not yet started are cancelled.
+        """
+        unit_results: List[Optional[List[Dict]]] = [None] * len(units)
+        window = 2 * self.config['concurrency']
+        executor = ThreadPoolExecutor(max_workers=self.config['concurrency'])
+        pending = {}  # future -> unit index
+        next_unit = 0
+
+        def collect(done):
+            for future in done:
+                results = future.result()
+                if self.checkpoint is None:
+                    unit_results[pending[future]] = results
+                del pending[future]
+                for result in results:
+                    self._record_result(pbar, result, keep=False)
+
+        try:
+            while next_unit < len(units) or pending:
+                while next_unit < len(units) and len(pending) < window:
+                    pending[executor.submit(self._answer_unit, units[next_unit])] = next_unit
+                    next_unit += 1
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+        except KeyboardInterrupt:
+            collect([f for f in pending if f.done() and not f.cancelled() and f.exception() is None])
+            raise
+        finally:
+            # Don't wait for in-flight LLM calls when unwinding; nothing is left to wait for otherwise
+            executor.shutdown(wait=False, cancel_futures=True)
+        # The checkpoint is already ordered on export; in-memory results are ordered here
+        if self.checkpoint is None:
+            self.results.extend(result for results in unit_results for result in results)
+
+    def _open_checkpoint(self, selected_questions: List[Dict]) -> List[Dict]:
+        """Open the JSONL checkpoint; with resume, drop questions that already have a result"""
+        path = self.config['checkpoint_path'] or os.path.join(self.config['output_dir'], 'checkpoint.jsonl')
+        if self.config['resume']:
+            done = load_completed_ids(path)
+            remaining = [q for q in selected_questions if q['question_id'] not in done]
+            print(f"{Fore.CYAN}Resuming from {path}: {len(selected_questions) - len(remaining)} "
+                  f"already done, {len(remaining)} to go{Style.RESET_ALL}")
+            selected_questions = remaining
+        elif os.path.exists(path) and os.path.getsize(path) > 0:
+            archived = f"{os.path.splitext(path)[0]}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
+            os.replace(path, archived)
+            print(f"{Fore.YELLOW}Previous checkpoint moved to {archived}{Style.RESET_ALL}")
+        self.checkpoint = CheckpointWriter(path)
+        return selected_questions
+
+    def _record_result(self, pbar, result: Dict, keep: bool = True):
+        if self.checkpoint is not None:
+            self.checkpoint.write(result)
+        elif keep:
+            self.results.append(result)
+        self._update_progress(pbar, result)
+
+    def _iter_results(self):
+        """Stream results from the checkpoint when there is one, otherwise from memory"""
+        if self.checkpoint is not None:
+            return iter_checkpoint(self.checkpoint.path)
+        return iter(self.results)
+
+    def _update_progress(self, pbar, result: Dict):
+        conf = result.get('confidence', 0)
+        if conf >= 0.8:
+            pbar.set_postfix_str(f"{Fore.GREEN}✓ Confident{Style.RESET_ALL}")
+        elif conf >= 0.5:
+            pbar.set_postfix_str(f"{Fore.YELLOW}⚠ Unsure{Style.RESET_ALL}")
+        else:
+            pbar.set_postfix_str(f"{Fore.RED}✗ Can't generate{Style.RESET_ALL}")
+        pbar.update(1)
 
     def save_results(self):
-        output_dir = 'output'
+        output_dir = self.config['output_dir']
         os.makedirs(output_dir, exist_ok=True)
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
 
-        print(f"\n{Fore.YELLOW}Export Options{Style.RESET_ALL}")
-        print("="*50)
-        print("1. CSV only")
-        print("2. JSON only")
-        print("3. Both")
-        print("4. CSV + Markdown report")
-        print("5. All formats")
-        
-        export_choice = input(f"\n{Fore.CYAN}Select format (1-5, default 1): {Style.RESET_ALL}").strip() or '1'
+        if self.config['export_format']:
+            export_choice = self.config['export_format']
+        else:
+            print(f"\n{Fore.YELLOW}Export Options{Style.RESET_ALL}")
+            print("="*50)
+            print("1. CSV only")
+            print("2. JSON only")
+            print("3. Both")
+            print("4. CSV + Markdown report")
+            print("5. All formats")
+            
+            export_choice = input(f"\n{Fore.CYAN}Select format (1-5, default 1): {Style.RESET_ALL}").strip() or '1'
         files_created = []
 
+        # ⭐ ENHANCEMENT: Exports stream from the checkpoint one result at a time
         if export_choice in ['1', '3', '4', '5']:
             csv_file = f"{output_dir}/queries_{timestamp}.csv"
-            df = pd.DataFrame(self.results)[['question_id', 'question', 'target_source', 'sql', 'assumptions', 'confidence']]
-            df.to_csv(csv_file, index=False, encoding='utf-8')
+            with open(csv_file, 'w', encoding='utf-8', newline='') as f:
+                writer = csv.DictWriter(f, fieldnames=['question_id', 'question', 'target_source', 'sql', 'assumptions', 'confidence', 'validation'],
+                                        extrasaction='ignore')
+                writer.writeheader()
+                for r in self._iter_results():
+                    writer.writerow(r)
             files_created.append(csv_file)
 
         if export_choice in ['2', '3', '5']:
             json_file = f"{output_dir}/queries_{timestamp}.json"
             with open(json_file, 'w', encoding='utf-8') as f:
-                json.dump(self.results, f, indent=2, ensure_ascii=False)
+                f.write('[')
+                for i, r in enumerate(self._iter_results()):
+                    item = json.dumps(r, indent=2, ensure_ascii=False).replace('\n', '\n  ')
+                    f.write((',\n  ' if i else '\n  ') + item)
+                f.write('\n]')
             files_created.append(json_file)
 
         if export_choice in ['4', '5']:
@@ -445,6 +1283,12 @@ Question: "{question}"
             self.generate_markdown_report(md_file)
             files_created.append(md_file)
 
+        if self.routing_log:
+            routing_file = f"{output_dir}/routing_{timestamp}.json"
+            with open(routing_file, 'w', encoding='utf-8') as f:
+                json.dump(self.routing_log, f, indent=2, ensure_ascii=False)
+            files_created.append(routing_file)
+
         print(f"\n{Fore.GREEN}Files created:{Style.RESET_ALL}")
         for file in files_created:
             print(f"  ✓ {file}")
@@ -456,32 +1300,42 @@ Question: "{question}"
             f.write("# 🧠 AI-Powered SQL Generation Report\n\n")
             f.write(f"**Generated on**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}  \n")
             f.write(f"**Engineer**: Anand Jha  \n")
-            f.write(f"**Model**: {self.config['model']}  \n")
+            f.write(f"**Model**: {self._model_label()}  \n")
             f.write(f"**Temperature**: {self.config['temperature']}  \n\n")
 
-            total = len(self.results)
-            success = sum(1 for r in self.results if r['confidence'] > 0)
-            high = sum(1 for r in self.results if r['confidence'] >= 0.8)
+            # First pass: counts and the low-confidence samples
+            total = success = high = 0
+            low_conf = []
+            for r in self._iter_results():
+                total += 1
+                success += r['confidence'] > 0
+                high += r['confidence'] >= 0.8
+                if r['confidence'] < 0.5 and len(low_conf) < 3:
+                    low_conf.append(r)
 
             f.write("## 📊 Executive Summary\n")
             f.write(f"- Total Questions: **{total}**  \n")
             f.write(f"- Successfully Generated: **{success}**  \n")
             f.write(f"- High Confidence (≥0.8): **{high}**  \n")
-            f.write(f"- Success Rate: **{success/total*100:.1f}%**  \n\n")
+            f.write(f"- Success Rate: **{success/total*100 if total else 0:.1f}%**  \n\n")
 
             f.write("## 🤖 Sample AI Reasoning (Low Confidence Cases)\n")
-            low_conf = [r for r in self.results if r['confidence'] < 0.5][:3]
             for r in low_conf:
                 f.write(f"\n### ❓ Question {r['question_id']}: {r['question']}\n")
                 f.write(f"- **Confidence**: `{r['confidence']}`  \n")
                 f.write(f"- **Assumptions**: {r['assumptions']}  \n")
                 f.write(f"- **SQL**: `{r['sql']}`  \n")
 
+            # Second pass: every result
             f.write("\n## 📝 Full Query Results\n")
-            for r in self.results:
+            for r in self._iter_results():
                 f.write(f"\n### 🔍 Question {r['question_id']}: {r['question']}\n")
                 f.write(f"- **Target Source**: `{r['target_source']}`  \n")
                 f.write(f"- **Confidence**: `{r['confidence']}`  \n")
+                if 'answered_by' in r:
+                    f.write(f"- **Answered By**: `{r['answered_by']}`  \n")
+                if 'validation' in r:
+                    f.write(f"- **Local Validation**: `{r['validation']}`  \n")
                 f.write(f"- **Assumptions**: {r['assumptions']}  \n")
                 f.write("**SQL**:\n```sql\n" + r['sql'] + "\n```\n---")
 
@@ -489,12 +1343,18 @@ Question: "{question}"
         print(f"\n{Fore.YELLOW}📊 FINAL REPORT — Engineered by Anand Jha{Style.RESET_ALL}")
         print("="*70)
 
-        total = len(self.results)
-        success = sum(1 for r in self.results if r['confidence'] > 0)
-        avg_conf = sum(r['confidence'] for r in self.results) / total if total > 0 else 0
+        total = success = 0
+        conf_sum = 0.0
+        sources = {}
+        for r in self._iter_results():
+            total += 1
+            success += r['confidence'] > 0
+            conf_sum += r['confidence']
+            sources[r['target_source']] = sources.get(r['target_source'], 0) + 1
+        avg_conf = conf_sum / total if total > 0 else 0
 
         print(f"✅ Total Processed: {total}")
-        print(f"🎯 AI Success Rate: {Fore.GREEN}{success}/{total} ({success/total*100:.1f}%){Style.RESET_ALL}")
+        print(f"🎯 AI Success Rate: {Fore.GREEN}{success}/{total} ({success/total*100 if total else 0:.1f}%){Style.RESET_ALL}")
         print(f"📈 Average Confidence: {Fore.CYAN}{avg_conf:.3f}{Style.RESET_ALL}")
 
         # ⭐ ENHANCEMENT: Show performance metrics
@@ -505,28 +1365,182 @@ Question: "{question}"
             avg_latency = sum(l['latency_sec'] for l in self.latency_log) / len(self.latency_log) if self.latency_log else 0
 
             print(f"\n{Fore.BLUE}⚡ Performance Metrics:{Style.RESET_ALL}")
-            print(f"  Model Used: {self.config['model']}")
+            print(f"  Model Used: {self._model_label()}")
             print(f"  Total Prompt Tokens: {total_prompt_tokens:,}")
             print(f"  Total Completion Tokens: {total_completion_tokens:,}")
             print(f"  Total Tokens Consumed: {total_tokens:,}")
             print(f"  Avg Latency per Query: {avg_latency:.2f}s")
 
+        question_times = self.stage_timings['question']
+        if question_times:
+            prompt_times = self.stage_timings['prompt_build']
+            parse_times = self.stage_timings['json_parse']
+            print(f"\n{Fore.BLUE}⏱️ Stage Timings:{Style.RESET_ALL}")
+            print(f"  Question Latency p50/p95/p99: {percentile(question_times, 50):.2f}s / "
+                  f"{percentile(question_times, 95):.2f}s / {percentile(question_times, 99):.2f}s")
+            if prompt_times:
+                print(f"  Avg Prompt Build: {sum(prompt_times) / len(prompt_times) * 1000:.2f} ms")
+            if parse_times:
+                print(f"  Avg JSON Parse: {sum(parse_times) / len(parse_times) * 1000:.2f} ms")
+            validate_times = self.stage_timings['sql_validate']
+            if validate_times:
+                print(f"  Avg SQL Validation: {sum(validate_times) / len(validate_times) * 1000:.3f} ms")
+
+        streamed = [l for l in self.latency_log if 'ttft_sec' in l]
+        if streamed:
+            ttfts = [l['ttft_sec'] for l in streamed if l['ttft_sec'] is not None]
+            json_times = [l['json_complete_sec'] for l in streamed if l['json_complete_sec'] is not None]
+            print(f"\n{Fore.BLUE}📡 Streaming:{Style.RESET_ALL}")
+            if ttfts:
+                print(f"  Avg Time to First Token: {sum(ttfts) / len(ttfts):.2f}s")
+            if json_times:
+                print(f"  Avg Time to JSON Complete: {sum(json_times) / len(json_times):.2f}s")
+            print(f"  Streams Closed Before End: {sum(1 for l in streamed if l['closed_early'])}/{len(streamed)}")
+
+        if self.rate_limiter is not None:
+            for model, stats in self.rate_limiter.stats().items():
+                print(f"\n{Fore.BLUE}🚦 Rate Limiter ({model}):{Style.RESET_ALL}")
+                print(f"  Requests Sent: {stats['requests']}")
+                print(f"  429 Responses: {stats['rate_limited']}")
+                print(f"  Time Waiting for Budget: {stats['wait_sec']:.1f}s")
+                print(f"  Concurrency Window: {stats['window']} (lowest {stats['min_window']:.2f})")
+
+        if self.response_cache is not None:
+            hits = self.cache_stats['hits']
+            lookups = hits + self.cache_stats['misses']
+            print(f"\n{Fore.BLUE}💾 Response Cache:{Style.RESET_ALL}")
+            print(f"  Cache Hits (no API call): {hits}")
+            print(f"  Cache Misses: {self.cache_stats['misses']}")
+            print(f"  Hit Rate: {hits/lookups*100 if lookups else 0:.1f}%")
+
+        batch_calls = [t for t in self.token_usage if 'batch_size' in t]
+        if batch_calls:
+            single_calls = [t for t in self.token_usage if 'batch_size' not in t]
+            batched_questions = sum(t['batch_size'] for t in batch_calls)
+            batched_tokens = sum(t['total_tokens'] for t in batch_calls)
+            # Unbatched estimate: every question would repeat the shared system prompt and schema block
+            est_unbatched = sum(t['prompt_tokens'] * t['unbatched_prompt_factor'] + t['completion_tokens'] for t in batch_calls)
+            print(f"\n{Fore.BLUE}📦 Batch Mode (batch size {self.config['batch_size']}):{Style.RESET_ALL}")
+            print(f"  Batched Requests: {len(batch_calls)} covering {batched_questions} questions")
+            print(f"  Tokens per Question (batched): {batched_tokens / batched_questions:,.0f}")
+            print(f"  Tokens per Question (est. unbatched): {est_unbatched / batched_questions:,.0f}")
+            if single_calls:
+                print(f"  Tokens per Question (measured single calls): "
+                      f"{sum(t['total_tokens'] for t in single_calls) / len(single_calls):,.0f} over {len(single_calls)} calls")
+            print(f"  Est. Token Savings: {(1 - batched_tokens / est_unbatched) * 100 if est_unbatched else 0:.1f}%")
+
+        if self.routing_log:
+            decisions = {}
+            for entry in self.routing_log:
+                key = entry['source'] if entry['decision'] == 'route' else entry['decision']
+                decisions[key] = decisions.get(key, 0) + 1
+            refused = decisions.get('refuse', 0)
+            avg_route_ms = sum(e['route_ms'] for e in self.routing_log) / len(self.routing_log)
+            avg_latency = sum(l['latency_sec'] for l in self.latency_log) / len(self.latency_log) if self.latency_log else 0
+            avg_tokens = sum(t['total_tokens'] for t in self.token_usage) / len(self.token_usage) if self.token_usage else 0
+            # A single-schema prompt leaves out the other schema's text (~4 chars per token)
+            omitted_tokens = sum(len(self._schema_texts[other]) // 4
+                                 for e in self.routing_log if e['decision'] == 'route'
+                                 for other in self._schema_texts if other != e['source'])
+
+            print(f"\n{Fore.BLUE}🧭 Pre-Router:{Style.RESET_ALL}")
+            for key, count in sorted(decisions.items()):
+                label = {'refuse': 'Refused instantly (spans schemas)', 'undecided': 'Undecided (both schemas sent)'}.get(key, f"Routed to {key}")
+                print(f"  {label}: {count}")
+            print(f"  Avg Routing Time: {avg_route_ms:.3f} ms")
+            print(f"  Est. Prompt Tokens Saved (single-schema prompts): ~{omitted_tokens:,}")
+            print(f"  Est. Time Saved (instant refusals): ~{refused * avg_latency:.1f}s, ~{refused * avg_tokens:,.0f} tokens")
+
+        if self.sql_validator is not None:
+            checks = self.validation_stats
+            checked = checks['valid'] + checks['invalid'] + checks['unverified']
+            print(f"\n{Fore.BLUE}🧪 Local SQL Validation (SQLite shadow schemas):{Style.RESET_ALL}")
+            print(f"  Checks Run: {checked}")
+            print(f"  Valid: {checks['valid']}")
+            print(f"  Invalid (unknown table/column, not read-only, ...): {checks['invalid']}")
+            print(f"  Unverified (syntax SQLite lacks): {checks['unverified']}")
+            flagged = sum(1 for r in self._iter_results() if r.get('validation') == INVALID)
+            print(f"  Still Invalid (confidence set to 0, kept from downstream): {flagged}")
+
+        repairs = self.repair_stats
+        if repairs['transport'] or repairs['json'] or repairs['sql']:
+            repair_calls = [t for t in self.token_usage if 'repair' in t]
+            sent = sum(t['prompt_tokens'] for t in repair_calls)
+            # A blind resend would have repeated the question's full schema prompt each time
+            full = sum(t['full_prompt_tokens'] for t in repair_calls)
+            print(f"\n{Fore.BLUE}🔧 Repair Loop:{Style.RESET_ALL}")
+            print(f"  API Error Retries: {repairs['transport']} (budget {max(1, self.config['retry_attempts']) - 1} per question)")
+            print(f"  JSON Repair Follow-ups: {repairs['json']} (budget {self.config['json_repair_attempts']} per question)")
+            print(f"  SQL Repair Follow-ups: {repairs['sql']} (budget {self.config['sql_repair_attempts']} per question)")
+            print(f"  Answers Rescued: {repairs['repaired']}")
+            if repair_calls:
+                print(f"  Follow-up Prompt Tokens: {sent:,} vs ~{full:,} for full resends "
+                      f"(saved ~{full - sent:,}, {(1 - sent / full) * 100 if full else 0:.0f}%)")
+
+        if self.cascade_stats:
+            models = self.config['cascade_models']
+            print(f"\n{Fore.BLUE}🪜 Model Cascade (escalate below confidence {self.config['cascade_min_confidence']}):{Style.RESET_ALL}")
+            actual_cost = 0.0
+            for model in models:
+                stats = self.cascade_stats.get(model)
+                if not stats:
+                    continue
+                calls = [t for t in self.token_usage if t.get('model') == model]
+                cost = self._token_cost(calls, model)
+                actual_cost = actual_cost + cost if cost is not None and actual_cost is not None else None
+                print(f"  {model}: kept {stats['accepted']}/{stats['attempts']} answers "
+                      f"({stats['accepted'] / stats['attempts'] * 100:.1f}%), "
+                      f"avg {stats['seconds'] / stats['attempts']:.2f}s per question, "
+                      f"{sum(t['total_tokens'] for t in calls):,} tokens"
+                      + (f", ${cost:.4f}" if cost is not None else ""))
+                escalated = stats['escalated']
+                if sum(escalated.values()):
+                    print(f"    Escalated: {escalated['json']} unparseable/API failure, "
+                          f"{escalated['sql']} failed SQL validation, {escalated['confidence']} low confidence")
+            # Without the cascade every first-model prompt would have gone to the last model instead
+            first_calls = [t for t in self.token_usage if t.get('model') == models[0] and 'repair' not in t]
+            single_cost = self._token_cost(first_calls, models[-1])
+            if actual_cost is not None and single_cost:
+                print(f"  Est. Cost: ${actual_cost:.4f} vs ~${single_cost:.4f} with {models[-1]} alone "
+                      f"({(1 - actual_cost / single_cost) * 100:.0f}% saved)")
+
+        if self.semantic_cache is not None:
+            hits = self.semantic_stats['hits']
+            lookups = self.semantic_stats['lookups']
+            print(f"\n{Fore.BLUE}🧩 Semantic Question Cache (threshold {self.config['semantic_cache_threshold']}):{Style.RESET_ALL}")
+            print(f"  Near-Duplicate Hits: {hits}/{lookups}")
+            print(f"  Hit Rate: {hits/lookups*100 if lookups else 0:.1f}%")
+
         print(f"\n{Fore.CYAN}Target Sources Chosen by AI:{Style.RESET_ALL}")
-        sources = {}
-        for r in self.results:
-            src = r['target_source']
-            sources[src] = sources.get(src, 0) + 1
         for src, count in sorted(sources.items()):
             print(f"  {src}: {count}")
 
-    def run(self):
-        self.print_banner()
+    def _token_cost(self, calls: List[Dict], model: str) -> Optional[float]:
+        """USD for these calls' tokens at `model`'s prices; None when its prices are not configured"""
+        prices = self.config['model_prices'].get(model)
+        if prices is None:
+            return None
+        return sum(t['prompt_tokens'] * prices[0] + t['completion_tokens'] * prices[1] for t in calls) / 1e6
+
+    def run(self, interactive: bool = True):
+        """Full pipeline; with interactive=False every prompt is replaced by self.config"""
+        if interactive:
+            self.print_banner()
+        else:
+            # Headless: no question picker or export menu — fall back to all questions / CSV
+            if self.config['questions'] is None:
+                self.config['questions'] = ''
+            self.config['export_format'] = self.config['export_format'] or '1'
         print(f"\n{Fore.YELLOW}Loading Data{Style.RESET_ALL}")
         print("="*50)
         self.load_schemas()
         self.load_questions()
-        self.configure_pipeline()
-        self.initialize_groq()
+        if interactive:
+            self.configure_pipeline()
+        self.initialize_llm_backend(interactive)
+        self.initialize_rate_limiter()
+        self.initialize_response_cache()
+        self.initialize_semantic_cache()
 
         start_time = time.time()
         self.process_all_questions()
@@ -536,12 +1550,134 @@ Question: "{question}"
         self.save_results()
         print(f"\n{Fore.GREEN}✅ SQL Generation Complete — Precision Engineered by Anand Jha{Style.RESET_ALL}")
 
+def coerce_confidence(value) -> float:
+    """The model's confidence as a float in [0, 1]; 0.0 for anything that is not a number"""
+    try:
+        confidence = float(value)
+    except (TypeError, ValueError):
+        return 0.0
+    if confidence != confidence:  # NaN
+        return 0.0
+    return min(1.0, max(0.0, confidence))
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile; 0.0 for an empty list"""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+EXPORT_FORMATS = {'csv': '1', 'json': '2', 'both': '3', 'md': '4', 'all': '5'}
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="LLM-powered SQL generation pipeline",
+        epilog="Headless example: GROQ_API_KEY=... python app.py --headless --questions 1-10 --export all --shard 1/4"
+    )
+    parser.add_argument('--resume', action='store_true',
+                        help="Skip questions that already have a result in the checkpoint")
+    parser.add_argument('--headless', action='store_true',
+                        help="Never prompt: settings come from flags/--config, the API key from the environment")
+    parser.add_argument('--config', help="JSON file of pipeline settings (same keys as SQLGenerationPipeline.config)")
+    parser.add_argument('--backend', choices=sorted(BACKENDS), help="LLM backend (default: groq)")
+    parser.add_argument('--base-url', help="Chat-completions base URL, e.g. a local mock_llm_server.py")
+    parser.add_argument('--model')
+    parser.add_argument('--temperature', type=float)
+    parser.add_argument('--max-tokens', type=int)
+    parser.add_argument('--retry-attempts', type=int, help="Attempts per request when the API call itself fails")
+    parser.add_argument('--json-repairs', type=int, help="Follow-ups per question after an unparseable answer (default: 2)")
+    parser.add_argument('--sql-repairs', type=int, help="Follow-ups per question after failed SQL validation (default: 1)")
+    parser.add_argument('--cascade', action='store_true', default=None,
+                        help="Answer with the first --cascade-models model; escalate broken, invalid or unsure answers")
+    parser.add_argument('--cascade-models',
+                        help="Comma-separated models, cheapest first (default: llama-3.1-8b-instant,llama-3.1-70b-versatile)")
+    parser.add_argument('--cascade-threshold', type=float,
+                        help="Confidence below which an answer escalates to the next model (default: 0.7)")
+    parser.add_argument('--concurrency', type=int)
+    parser.add_argument('--batch-size', type=int)
+    parser.add_argument('--schema-pruning', action='store_true', default=None)
+    parser.add_argument('--stream', action='store_true', default=None,
+                        help="Stream responses and close each one as soon as its JSON answer is complete")
+    parser.add_argument('--dialect', choices=sorted(DIALECTS), help="SQL dialect to normalize answers to (default: postgres)")
+    parser.add_argument('--no-sql-validation', action='store_true',
+                        help="Do not prepare answers against the in-memory SQLite copy of the schemas")
+    parser.add_argument('--validation-rows', type=int,
+                        help="Synthetic rows per shadow table; > 0 also executes each query (default: 0)")
+    parser.add_argument('--questions', help="Question IDs, e.g. '1-6,9' (default: all)")
+    parser.add_argument('--shard', help="'i/n': process every n-th selected question starting at the i-th")
+    parser.add_argument('--export', choices=sorted(EXPORT_FORMATS), help="Export format (default: csv)")
+    parser.add_argument('--data-dir')
+    parser.add_argument('--output-dir', help="Give each parallel worker its own directory")
+    parser.add_argument('--checkpoint', help="Checkpoint JSONL path (default: <output-dir>/checkpoint.jsonl)")
+    parser.add_argument('--api-key-env', help="Environment variable holding the Groq API key (default: GROQ_API_KEY)")
+    parser.add_argument('--skip-validation', action='store_true',
+                        help="Do not spend a 'Hello' round-trip validating the API key at startup")
+    return parser.parse_args(argv)
+
+
+def build_config(args: argparse.Namespace, config: Dict) -> Dict:
+    """Layer --config file settings, then explicit flags, over the pipeline defaults"""
+    if args.config:
+        with open(args.config, 'r', encoding='utf-8') as f:
+            overrides = json.load(f)
+        unknown = sorted(set(overrides) - set(config))
+        if unknown:
+            raise ValueError(f"Unknown settings in {args.config}: {', '.join(unknown)}")
+        config.update(overrides)
+
+    flags = {
+        'llm_backend': args.backend,
+        'llm_base_url': args.base_url,
+        'model': args.model,
+        'temperature': args.temperature,
+        'max_tokens': args.max_tokens,
+        'retry_attempts': args.retry_attempts,
+        'json_repair_attempts': args.json_repairs,
+        'sql_repair_attempts': args.sql_repairs,
+        'cascade': args.cascade,
+        'cascade_models': args.cascade_models.split(',') if args.cascade_models else None,
+        'cascade_min_confidence': args.cascade_threshold,
+        'concurrency': args.concurrency,
+        'batch_size': args.batch_size,
+        'schema_pruning': args.schema_pruning,
+        'streaming': args.stream,
+        'sql_dialect': args.dialect,
+        'validation_rows': args.validation_rows,
+        'questions': args.questions,
+        'export_format': EXPORT_FORMATS.get(args.export),
+        'data_dir': args.data_dir,
+        'output_dir': args.output_dir,
+        'checkpoint_path': args.checkpoint,
+        'api_key_env': args.api_key_env
+    }
+    config.update({key: value for key, value in flags.items() if value is not None})
+    if args.resume:
+        config['resume'] = True
+    if args.skip_validation:
+        config['validate_api_key'] = False
+    if args.no_sql_validation:
+        config['sql_validation'] = False
+    if args.shard:
+        index, count = (int(part) for part in args.shard.split('/'))
+        if not 1 <= index <= count:
+            raise ValueError(f"Invalid --shard {args.shard}: expected i/n with 1 <= i <= n")
+        config['shard'] = (index, count)
+    if isinstance(config['shard'], list):
+        config['shard'] = tuple(config['shard'])
+    return config
+
+
 def main():
+    args = parse_args()
+
     try:
         pipeline = SQLGenerationPipeline()
-        pipeline.run()
+        build_config(args, pipeline.config)
+        pipeline.run(interactive=not args.headless)
     except KeyboardInterrupt:
-        print(f"\n\n{Fore.YELLOW}Interrupted by user{Style.RESET_ALL}")
+        print(f"\n\n{Fore.YELLOW}Interrupted by user — finished questions are in the checkpoint; rerun with --resume{Style.RESET_ALL}")
         sys.exit(0)
     except Exception as e:
         print(f"\n{Fore.RED}Fatal error: {e}{Style.RESET_ALL}")
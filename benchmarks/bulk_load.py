@@ -0,0 +1,111 @@
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Capstone_Project'))
+
+from bulk_loader import DIALECTS, BulkLoader  # noqa: E402
+
+SALES_DDL = ("CREATE TABLE SALES (sale_id INTEGER PRIMARY KEY, customer_id INTEGER, product_id INTEGER, "
+             "quantity INTEGER, sale_date DATE, total_amount DECIMAL(10,2))")
+
+
+def legacy_import(conn, table: str, path: str) -> int:
+    """import_data as it was before bulk_loader.py (baseline): whole file into pandas, one executemany"""
+    import pandas as pd
+
+    df = pd.read_csv(path)
+    cols = ",".join(df.columns)
+    vals = ",".join([DIALECTS['sqlite']['param']] * len(df.columns))
+    data = [tuple(r) for r in df.to_numpy()]
+    cur = conn.cursor()
+    cur.executemany(f"INSERT OR IGNORE INTO {table} ({cols}) VALUES ({vals})", data)
+    conn.commit()
+    return len(data)
+
+
+def write_sales_csv(path: str, rows: int, seed: int):
+    rng = random.Random(seed)
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        f.write("sale_id,customer_id,product_id,quantity,sale_date,total_amount\n")
+        for i in range(1, rows + 1):
+            quantity = rng.randint(1, 10)
+            f.write(f"{i},{rng.randint(1, 100)},{rng.randint(1, 50)},{quantity},"
+                    f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d},{quantity * rng.uniform(5, 200):.2f}\n")
+
+
+def fresh_db(path: str) -> sqlite3.Connection:
+    if os.path.exists(path):
+        os.remove(path)
+    conn = sqlite3.connect(path)
+    # The MySQL server commits without a local fsync per batch; keep SQLite's fsyncs from dominating
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.execute(SALES_DDL)
+    return conn
+
+
+def measure(name: str, load: Callable, db_path: str, csv_path: str, repeat: int) -> Dict:
+    times = []
+    for _ in range(repeat):
+        conn = fresh_db(db_path)
+        start = time.perf_counter()
+        load(conn, csv_path)
+        times.append(time.perf_counter() - start)
+        count = conn.execute("SELECT COUNT(*) FROM SALES").fetchone()[0]
+        conn.close()
+    # A separate run for memory: tracemalloc slows allocation-heavy code down
+    conn = fresh_db(db_path)
+    tracemalloc.start()
+    load(conn, csv_path)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    conn.close()
+    best = min(times)
+    return {'name': name, 'rows': count, 'best_sec': round(best, 3), 'rows_per_sec': round(count / best),
+            'peak_mb': round(peak / 2 ** 20, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chunked bulk loader vs. import_data's whole-file executemany")
+    parser.add_argument('--rows', default='50000,200000', help="Comma-separated SALES.csv sizes")
+    parser.add_argument('--chunk-rows', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    candidates = {
+        'legacy_pandas_executemany': lambda conn, path: legacy_import(conn, 'SALES', path),
+        'chunked_executemany': lambda conn, path: BulkLoader(conn, 'sqlite', args.chunk_rows).load('SALES', path, 'executemany'),
+        'multi_row_values': lambda conn, path: BulkLoader(conn, 'sqlite', args.chunk_rows).load('SALES', path, 'values'),
+    }
+    report = {'settings': vars(args), 'results': []}
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'retail_dw.sqlite')
+        for rows in (int(r) for r in args.rows.split(',')):
+            csv_path = os.path.join(tmp, f"SALES_{rows}.csv")
+            write_sales_csv(csv_path, rows, args.seed)
+            size_mb = os.path.getsize(csv_path) / 2 ** 20
+            print(f"SALES.csv with {rows:,} rows ({size_mb:.1f} MB):")
+            for name, load in candidates.items():
+                outcome = measure(name, load, db_path, csv_path, args.repeat)
+                outcome['file_rows'] = rows
+                report['results'].append(outcome)
+                print(f"  {name:>26}: {outcome['rows_per_sec']:>9,} rows/s, peak {outcome['peak_mb']:>6} MB")
+
+    # LOAD DATA LOCAL INFILE needs a MySQL server; it is not measured by this SQLite stand-in
+    os.makedirs('output/benchmarks', exist_ok=True)
+    out = f"output/benchmarks/bulk_load_{time.strftime('%Y%m%d_%H%M%S')}.json"
+    with open(out, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results saved to {out}")
+
+
+if __name__ == "__main__":
+    main()
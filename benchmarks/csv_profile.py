@@ -0,0 +1,109 @@
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Capstone_Project'))
+
+from bulk_loader import iter_csv_chunks  # noqa: E402
+from csv_profiler import profile_csv  # noqa: E402
+
+import pandas as pd  # noqa: E402
+
+
+def write_extract(path: str, rows: int, seed: int):
+    """A SALES-like extract whose first rows are unrepresentative, as real extracts often are"""
+    rng = random.Random(seed)
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        f.write("sale_id,customer_id,store_code,quantity,discount,total_amount,sale_date,note\n")
+        for i in range(1, rows + 1):
+            early = i <= 100
+            quantity = rng.randint(1, 10)
+            # Whole amounts at first, cents later; discounts and long notes only appear later
+            amount = f"{quantity * rng.randint(5, 200)}" if early else f"{quantity * rng.uniform(5, 200):.2f}"
+            discount = '' if early or rng.random() < 0.7 else f"{rng.uniform(0, 30):.1f}"
+            store = f"{rng.randint(1, 99)}" if early else f"{rng.randint(0, 99):03d}"
+            note = 'ok' if early else rng.choice(['', 'ok', 'gift wrap requested by the customer at checkout'])
+            f.write(f"{i},{rng.randint(1, 5000)},{store},{quantity},{discount},{amount},"
+                    f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d},{note}\n")
+
+
+def legacy_read(path: str):
+    """design_schema's 5-row dtype sniff, then import_data's full read (baseline)"""
+    pd.read_csv(path, nrows=5)
+    df = pd.read_csv(path)
+    for _ in df.itertuples(index=False):
+        pass
+
+
+def profiled_read(path: str):
+    """The default: profile in one pass, then stream the CSV again for the load"""
+    profile_csv(path, 5000)
+    for _ in iter_csv_chunks(path, 5000):
+        pass
+
+
+def spooled_read(path: str, spool_dir: str):
+    """The opt-in spool: the loader replays the profiling pass's parsed chunks"""
+    profile = profile_csv(path, 5000, spool_dir)
+    for _ in profile.replay():
+        pass
+
+
+def measure(load: Callable, repeat: int) -> Dict:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        load()
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    load()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {'best_sec': round(min(times), 3), 'peak_mb': round(peak / 2 ** 20, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming CSV profiler vs. 5-row dtype sniffing + full pandas read")
+    parser.add_argument('--rows', default='100000,400000', help="Comma-separated extract sizes")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    report = {'settings': vars(args), 'types': {}, 'results': []}
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in (int(r) for r in args.rows.split(',')):
+            path = os.path.join(tmp, f"SALES_{rows}.csv")
+            write_extract(path, rows, args.seed)
+            if not report['types']:
+                sniffed = pd.read_csv(path, nrows=5).dtypes
+                profile = profile_csv(path)
+                print("Column types — 5-row sniff vs. full-scan profile:")
+                for column in profile.column_profiles:
+                    report['types'][column.name] = {'nrows_5': str(sniffed[column.name]), 'profile': column.details()}
+                    print(f"  {column.name:>14}: {str(sniffed[column.name]):>8} | {column.details()}")
+            size_mb = os.path.getsize(path) / 2 ** 20
+            print(f"{rows:,} rows ({size_mb:.1f} MB):")
+            spool_dir = os.path.join(tmp, f"spool_{rows}")
+            os.makedirs(spool_dir)
+            for name, load in (('legacy_sniff_plus_full_read', lambda: legacy_read(path)),
+                               ('profile_then_stream', lambda: profiled_read(path)),
+                               ('profile_spool_replay', lambda: spooled_read(path, spool_dir))):
+                outcome = dict(measure(load, args.repeat), name=name, rows=rows)
+                report['results'].append(outcome)
+                print(f"  {name:>28}: {outcome['best_sec']:.2f}s, peak {outcome['peak_mb']} MB")
+
+    os.makedirs('output/benchmarks', exist_ok=True)
+    out = f"output/benchmarks/csv_profile_{time.strftime('%Y%m%d_%H%M%S')}.json"
+    with open(out, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results saved to {out}")
+
+
+if __name__ == "__main__":
+    main()
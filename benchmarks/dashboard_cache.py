@@ -0,0 +1,97 @@
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from typing import Callable, Dict
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Capstone_Project'))
+
+import pandas as pd  # noqa: E402
+from dashboard_cache import DashboardCache  # noqa: E402
+from parallel_load import write_csvs  # noqa: E402
+
+
+def clean(name: str, df: pd.DataFrame) -> pd.DataFrame:
+    """The BI dashboard's type coercions, as in genai.py"""
+    if name == 'SALES':
+        df["sale_date"] = pd.to_datetime(df["sale_date"], errors="coerce")
+        for col in ["total_amount", "quantity"]:
+            df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0)
+    elif name == 'CUSTOMERS':
+        df["join_date"] = pd.to_datetime(df["join_date"], errors="coerce")
+    else:
+        for col in ["price_per_unit", "quantity_in_stock"]:
+            df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0)
+    return df
+
+
+def csv_load(paths: Dict[str, str]) -> Dict[str, pd.DataFrame]:
+    """What every dashboard rerun did before the cache (baseline)"""
+    return {name: clean(name, pd.read_csv(path)) for name, path in paths.items()}
+
+
+def cached_load(cache_dir: str, paths: Dict[str, str]) -> Dict[str, pd.DataFrame]:
+    cache = DashboardCache(cache_dir)
+    return {name: cache.load(name, path, lambda df, n=name: clean(n, df)) for name, path in paths.items()}
+
+
+def best_ms(load: Callable, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        load()
+        times.append(time.perf_counter() - start)
+    return round(min(times) * 1000, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Arrow dashboard cache vs. re-parsing the CSVs on every rerun")
+    parser.add_argument('--customers', type=int, default=50000)
+    parser.add_argument('--products', type=int, default=5000)
+    parser.add_argument('--sales', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    report = {'settings': vars(args), 'results': {}}
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = write_csvs(tmp, args.customers, args.products, args.sales, args.seed)
+        cache_dir = os.path.join(tmp, 'cache')
+        expected = csv_load(paths)
+
+        def cold():
+            shutil.rmtree(cache_dir, ignore_errors=True)
+            cached_load(cache_dir, paths)
+
+        def touched():
+            for path in paths.values():
+                os.utime(path)
+            cached_load(cache_dir, paths)
+
+        results = report['results']
+        results['csv_parse_and_clean_ms'] = best_ms(lambda: csv_load(paths), args.repeat)
+        results['cache_build_ms'] = best_ms(cold, args.repeat)
+        results['cache_revalidate_ms'] = best_ms(touched, args.repeat)
+        results['cache_hit_ms'] = best_ms(lambda: cached_load(cache_dir, paths), args.repeat)
+        got = cached_load(cache_dir, paths)
+        results['identical'] = all(expected[name].equals(got[name]) for name in paths)
+        results['dtypes'] = {name: {c: str(t) for c, t in got[name].dtypes.items()} for name in paths}
+
+    print(f"CSV parse + clean (every rerun before): {results['csv_parse_and_clean_ms']:>8} ms")
+    print(f"Cache build (first open / changed CSV): {results['cache_build_ms']:>8} ms")
+    print(f"Cache revalidate (touched, same hash):  {results['cache_revalidate_ms']:>8} ms")
+    print(f"Cache hit (memory-mapped Arrow):        {results['cache_hit_ms']:>8} ms")
+    print(f"Same DataFrames as the CSV path: {results['identical']}")
+
+    os.makedirs('output/benchmarks', exist_ok=True)
+    out = f"output/benchmarks/dashboard_cache_{time.strftime('%Y%m%d_%H%M%S')}.json"
+    with open(out, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results saved to {out}")
+
+
+if __name__ == "__main__":
+    main()
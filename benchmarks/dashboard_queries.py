@@ -0,0 +1,108 @@
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from typing import Callable, Dict
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Capstone_Project'))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+from bulk_loader import BulkLoader  # noqa: E402
+from dashboard_queries import DASHBOARD_INDEXES, dashboard_queries, ensure_indexes, fetch_dashboard  # noqa: E402
+from parallel_load import RETAIL_DDL, write_csvs  # noqa: E402
+
+
+def pandas_dashboard(paths: Dict[str, str]) -> Dict[str, pd.DataFrame]:
+    """The CSV dashboard without any caching: parse, clean and aggregate every table (baseline)"""
+    customers = pd.read_csv(paths['CUSTOMERS'])
+    inventory = pd.read_csv(paths['INVENTORY'])
+    sales = pd.read_csv(paths['SALES'])
+    sales["sale_date"] = pd.to_datetime(sales["sale_date"], errors="coerce")
+    df_month = sales.dropna(subset=["sale_date"]).copy()
+    df_month["month"] = df_month["sale_date"].dt.to_period("M").dt.to_timestamp()
+    top_customers = sales.groupby("customer_id")["total_amount"].sum().reset_index()
+    top_customers = top_customers.merge(customers, on="customer_id", how="left")
+    top_products = sales.groupby("product_id")["total_amount"].sum().reset_index()
+    top_products = top_products.merge(inventory, on="product_id", how="left")
+    return {
+        'monthly': df_month.groupby("month")["total_amount"].sum().reset_index(),
+        'top_customers': top_customers.sort_values("total_amount", ascending=False).head(10),
+        'top_products': top_products.sort_values("total_amount", ascending=False).head(10),
+        'low_stock': inventory[inventory["quantity_in_stock"] < 100],
+    }
+
+
+def best_ms(run: Callable, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    return round(min(times) * 1000, 1)
+
+
+def same_results(expected: Dict[str, pd.DataFrame], got: Dict[str, pd.DataFrame]) -> bool:
+    """Sums are compared with a relative tolerance: SQL and pandas add the floats in different orders"""
+    def close(section):
+        return (len(expected[section]) == len(got[section])
+                and np.allclose(expected[section]['total_amount'], got[section]['total_amount'], rtol=1e-9))
+    return bool(close('monthly') and close('top_customers') and close('top_products')
+                and set(expected['low_stock']['product_id']) == set(got['low_stock']['product_id']))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dashboard as SQL aggregates over the migrated tables vs. pandas over the CSVs")
+    parser.add_argument('--sales', default='250000,1000000', help="Comma-separated SALES sizes")
+    parser.add_argument('--customers', type=int, default=50000)
+    parser.add_argument('--products', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    report = {'settings': vars(args), 'note': "sqlite3 stands in for MySQL", 'results': []}
+    for sales in (int(s) for s in args.sales.split(',')):
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = write_csvs(tmp, args.customers, args.products, sales, args.seed)
+            conn = sqlite3.connect(os.path.join(tmp, 'retail_dw.sqlite'))
+            conn.executescript(RETAIL_DDL)
+            loader = BulkLoader(conn, 'sqlite', 5000)
+            for table, path in paths.items():
+                loader.load(table, path, 'values')
+
+            outcome = {'sales_rows': sales}
+            outcome['pandas_csv_ms'] = best_ms(lambda: pandas_dashboard(paths), args.repeat)
+            outcome['sql_no_indexes_ms'] = best_ms(lambda: fetch_dashboard(conn, 'sqlite'), args.repeat)
+            start = time.perf_counter()
+            ensure_indexes(conn, 'sqlite')
+            outcome['index_build_ms'] = round((time.perf_counter() - start) * 1000, 1)
+            outcome['sql_indexed_ms'] = best_ms(lambda: fetch_dashboard(conn, 'sqlite'), args.repeat)
+            frames, timings = fetch_dashboard(conn, 'sqlite')
+            outcome['sql_indexed_sections'] = {name: {'ms': round(t['ms'], 1), 'rows': t['rows']}
+                                               for name, t in timings.items()}
+            outcome['rows_fetched'] = sum(t['rows'] for t in timings.values())
+            outcome['same_results'] = same_results(pandas_dashboard(paths), frames)
+            plan = " ".join(str(row) for section, (sql, _) in dashboard_queries('sqlite').items() if section != 'low_stock'
+                            for row in conn.execute("EXPLAIN QUERY PLAN " + sql))
+            outcome['indexes_used'] = {name: name in plan for name in DASHBOARD_INDEXES['SALES']}
+            conn.close()
+            report['results'].append(outcome)
+            print(f"{sales:>10,} sales: pandas over CSVs {outcome['pandas_csv_ms']:>8} ms | SQL "
+                  f"{outcome['sql_no_indexes_ms']:>7} ms unindexed, {outcome['sql_indexed_ms']:>7} ms indexed "
+                  f"(index build {outcome['index_build_ms']} ms) | {outcome['rows_fetched']} rows fetched | "
+                  f"same results: {outcome['same_results']}")
+            print("    " + ", ".join(f"{name} {t['ms']} ms" for name, t in outcome['sql_indexed_sections'].items())
+                  + f" | indexes used: {outcome['indexes_used']}")
+
+    os.makedirs('output/benchmarks', exist_ok=True)
+    out = f"output/benchmarks/dashboard_queries_{time.strftime('%Y%m%d_%H%M%S')}.json"
+    with open(out, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results saved to {out}")
+
+
+if __name__ == "__main__":
+    main()
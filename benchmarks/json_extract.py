@@ -0,0 +1,153 @@
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from json_extract import JSONObjectScanner, extract_json_object  # noqa: E402
+
+CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'malformed_llm_outputs.jsonl')
+
+SQL_SNIPPETS = [
+    "SELECT region, SUM(sales_amount) AS total FROM sales GROUP BY region",
+    "SELECT '{' || product_name || '}' FROM products",
+    'SELECT "order id" FROM orders WHERE note LIKE \'%\\\\%\'',
+    "SELECT c.name\nFROM customers c\nWHERE c.tier = 'gold'\nORDER BY c.name",
+    "SELECT JSON_EXTRACT(payload, '$.items[0]') FROM events",
+]
+PROSE = ["Here is the query:", "Sure! Based on the schema {sales_dw}, the answer is", "Result below.", ""]
+
+
+def legacy_extract(text: str) -> Optional[Dict]:
+    """extract_json_from_response as it was before the single-pass scanner (baseline)"""
+    text = text.replace('```json', '').replace('```', '')
+    start_idx = text.find('{')
+    end_idx = text.rfind('}')
+    if start_idx == -1 or end_idx == -1:
+        return None
+    json_str = text[start_idx:end_idx + 1]
+    lines = json_str.split('\n')
+    cleaned_lines = []
+    in_string = False
+    for line in lines:
+        quote_count = line.count('"') - line.count('\\"')
+        if quote_count % 2 == 1:
+            in_string = not in_string
+        if in_string and cleaned_lines:
+            cleaned_lines[-1] += ' ' + line.strip()
+        else:
+            cleaned_lines.append(line.strip())
+    json_str = '\n'.join(cleaned_lines)
+    try:
+        return json.loads(json_str)
+    except json.JSONDecodeError:
+        json_str = re.sub(r',\s*}', '}', json_str)
+        json_str = re.sub(r',\s*]', ']', json_str)
+        try:
+            return json.loads(json_str)
+        except Exception:
+            return None
+
+
+def load_corpus() -> List[Dict]:
+    with open(CORPUS, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def fuzz_corpus(count: int, seed: int) -> List[Dict]:
+    """Randomly mangled but recoverable answers, each with the object a correct parser should return"""
+    rng = random.Random(seed)
+    cases = []
+    for i in range(count):
+        answer = {
+            'question_id': i, 'question': f"Question {i}", 'target_source': rng.choice(['sales_dw', 'marketing_dw']),
+            'sql': rng.choice(SQL_SNIPPETS),
+            'assumptions': rng.choice(["None", "Uses {curly} notation", "Amounts are \"net\""]),
+            'confidence': round(rng.uniform(0.5, 1.0), 2)
+        }
+        text = json.dumps(answer, indent=rng.choice([None, 2]))
+        if rng.random() < 0.4:
+            # Unescaped newlines inside the SQL string — a common LLM habit
+            text = text.replace('\\n', '\n')
+        if rng.random() < 0.3:
+            text = text[:text.rindex('}')].rstrip() + ',\n}'
+        if rng.random() < 0.5:
+            text = f"```json\n{text}\n```"
+        text = f"{rng.choice(PROSE)}\n{text}\n{rng.choice(PROSE)}".strip()
+        cases.append({'name': f"fuzz_{i}", 'text': text, 'expected': answer})
+    return cases
+
+
+def streamed(text: str) -> Optional[Dict]:
+    """Feed the text in small random chunks, as a streamed response would arrive"""
+    scanner = JSONObjectScanner()
+    rng = random.Random(len(text))
+    pos = 0
+    while pos < len(text):
+        step = rng.randint(1, 16)
+        for obj in scanner.iter_objects(text[pos:pos + step]):
+            return obj
+        pos += step
+    return None
+
+
+def evaluate(name: str, extractor: Callable[[str], Optional[Dict]], cases: List[Dict], repeat: int) -> Dict:
+    correct = 0
+    failures = []
+    for case in cases:
+        try:
+            result = extractor(case['text'])
+        except Exception:
+            result = None
+        if result == case['expected']:
+            correct += 1
+        else:
+            failures.append(case['name'])
+
+    texts = [case['text'] for case in cases]
+    start = time.process_time()
+    for _ in range(repeat):
+        for text in texts:
+            try:
+                extractor(text)
+            except Exception:
+                pass
+    cpu = time.process_time() - start
+    return {'extractor': name, 'correct': correct, 'total': len(cases),
+            'success_rate': round(correct / len(cases), 4) if cases else 0.0,
+            'cpu_us_per_response': round(cpu / (repeat * len(cases)) * 1e6, 2) if cases else 0.0,
+            'failures': failures[:20]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parse success and CPU cost of the JSON extractors on malformed LLM output")
+    parser.add_argument('--fuzz', type=int, default=2000, help="Number of generated fuzz cases")
+    parser.add_argument('--repeat', type=int, default=20, help="Timing repetitions over each corpus")
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    corpora = {'handwritten': load_corpus(), 'fuzz': fuzz_corpus(args.fuzz, args.seed)}
+    extractors = {'legacy': legacy_extract, 'scanner': extract_json_object, 'scanner_streamed': streamed}
+    report = {}
+    for corpus_name, cases in corpora.items():
+        report[corpus_name] = []
+        for name, extractor in extractors.items():
+            outcome = evaluate(name, extractor, cases, args.repeat if name != 'scanner_streamed' else 1)
+            report[corpus_name].append(outcome)
+            print(f"{corpus_name:>12} / {name:<16}: {outcome['correct']}/{outcome['total']} parsed correctly, "
+                  f"{outcome['cpu_us_per_response']} µs CPU per response")
+
+    os.makedirs('output/benchmarks', exist_ok=True)
+    out = f"output/benchmarks/json_extract_{time.strftime('%Y%m%d_%H%M%S')}.json"
+    with open(out, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results saved to {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import Callable, Dict
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Capstone_Project'))
+
+import pandas as pd  # noqa: E402
+from dashboard_cache import DashboardCache  # noqa: E402
+from kpi_aggregates import MEASURES, KPIStore, summarize  # noqa: E402
+from parallel_load import write_csvs  # noqa: E402
+
+
+def clean_sales(df: pd.DataFrame) -> pd.DataFrame:
+    """The BI dashboard's type coercions, as in genai.py"""
+    df["sale_date"] = pd.to_datetime(df["sale_date"], errors="coerce")
+    for col in ["total_amount", "quantity"]:
+        df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0)
+    return df
+
+
+def clean_inventory(df: pd.DataFrame) -> pd.DataFrame:
+    for col in ["price_per_unit", "quantity_in_stock"]:
+        df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0)
+    return df
+
+
+def append_sales(path: str, first_id: int, rows: int, customers: int, products: int, rng: random.Random):
+    with open(path, 'a', encoding='utf-8', newline='') as f:
+        for i in range(first_id, first_id + rows):
+            quantity = rng.randint(1, 10)
+            f.write(f"{i},{rng.randint(1, customers)},{rng.randint(1, products)},{quantity},"
+                    f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d},{quantity * rng.uniform(5, 200):.2f}\n")
+
+
+def legacy_render(cache: DashboardCache, sales_path: str, customers: pd.DataFrame, inventory: pd.DataFrame):
+    """The dashboard's per-render work before the aggregates: full SALES from the Arrow cache, then groupbys (baseline)"""
+    sales = cache.load('SALES', sales_path, clean_sales)
+    sales['total_amount'].sum()
+    df_month = sales.dropna(subset=["sale_date"]).copy()
+    df_month["month"] = df_month["sale_date"].dt.to_period("M").dt.to_timestamp()
+    df_month.groupby("month")["total_amount"].sum().reset_index()
+    top = sales.groupby("customer_id")["total_amount"].sum().reset_index().merge(customers, on="customer_id", how="left")
+    top.sort_values("total_amount", ascending=False).head(10)
+    top = sales.groupby("product_id")["total_amount"].sum().reset_index().merge(inventory, on="product_id", how="left")
+    top.sort_values("total_amount", ascending=False).head(10)
+    inventory[inventory["quantity_in_stock"] < 100]
+
+
+def aggregate_render(store_dir: str, sales_path: str, inventory_path: str, customers: pd.DataFrame,
+                     inventory: pd.DataFrame) -> KPIStore:
+    kpis = KPIStore(store_dir).refresh_sales(sales_path, clean_sales).refresh_stock(inventory_path, inventory)
+    kpis.summary('monthly')
+    kpis.summary('by_customer').nlargest(10, 'total_amount').merge(customers, on='customer_id', how='left')
+    kpis.summary('by_product').nlargest(10, 'total_amount').merge(inventory, on='product_id', how='left')
+    kpis.summary('low_stock')
+    return kpis
+
+
+def best_ms(render: Callable, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        render()
+        times.append(time.perf_counter() - start)
+    return round(min(times) * 1000, 1)
+
+
+def matches_full_recompute(kpis: KPIStore, sales_path: str) -> bool:
+    expected = summarize(clean_sales(pd.read_csv(sales_path)))
+    return all(len(kpis.summary(name)) == len(expected[name]) and
+               ((kpis.summary(name)[MEASURES].to_numpy() - expected[name][MEASURES].to_numpy()) ** 2).max() < 1e-6
+               for name in expected)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incremental KPI aggregates vs. groupbys over the full SALES table per render")
+    parser.add_argument('--sales', default='250000,1000000,4000000', help="Comma-separated SALES sizes")
+    parser.add_argument('--customers', type=int, default=50000)
+    parser.add_argument('--products', type=int, default=5000)
+    parser.add_argument('--append', type=int, default=1000, help="Rows appended before each incremental refresh")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    report = {'settings': vars(args), 'results': []}
+    for sales in (int(s) for s in args.sales.split(',')):
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = write_csvs(tmp, args.customers, args.products, sales, args.seed)
+            cache = DashboardCache(os.path.join(tmp, 'cache'))
+            customers = cache.load('CUSTOMERS', paths['CUSTOMERS'])
+            inventory = cache.load('INVENTORY', paths['INVENTORY'], clean_inventory)
+            store_dir = os.path.join(tmp, 'kpis')
+            rng = random.Random(args.seed)
+            next_id = sales + 1
+
+            def append_then_render():
+                nonlocal next_id
+                append_sales(paths['SALES'], next_id, args.append, args.customers, args.products, rng)
+                next_id += args.append
+                aggregate_render(store_dir, paths['SALES'], paths['INVENTORY'], customers, inventory)
+
+            outcome: Dict = {'sales_rows': sales}
+            start = time.perf_counter()
+            aggregate_render(store_dir, paths['SALES'], paths['INVENTORY'], customers, inventory)
+            outcome['aggregate_build_ms'] = round((time.perf_counter() - start) * 1000, 1)
+            outcome['legacy_render_ms'] = best_ms(lambda: legacy_render(cache, paths['SALES'], customers, inventory),
+                                                  args.repeat)
+            outcome['aggregate_render_ms'] = best_ms(
+                lambda: aggregate_render(store_dir, paths['SALES'], paths['INVENTORY'], customers, inventory), args.repeat)
+            outcome['append_refresh_ms'] = best_ms(append_then_render, args.repeat)
+            outcome['matches_full_recompute'] = matches_full_recompute(
+                aggregate_render(store_dir, paths['SALES'], paths['INVENTORY'], customers, inventory), paths['SALES'])
+            report['results'].append(outcome)
+            print(f"{sales:>10,} sales: legacy render {outcome['legacy_render_ms']:>8} ms | aggregates: render "
+                  f"{outcome['aggregate_render_ms']:>6} ms, +{args.append:,} rows {outcome['append_refresh_ms']:>6} ms, "
+                  f"build {outcome['aggregate_build_ms']:>8} ms | exact: {outcome['matches_full_recompute']}")
+
+    os.makedirs('output/benchmarks', exist_ok=True)
+    out = f"output/benchmarks/kpi_aggregates_{time.strftime('%Y%m%d_%H%M%S')}.json"
+    with open(out, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results saved to {out}")
+
+
+if __name__ == "__main__":
+    main()
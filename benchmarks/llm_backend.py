@@ -0,0 +1,81 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import SQLGenerationPipeline, percentile  # noqa: E402
+from llm_backend import create_backend  # noqa: E402
+from mock_llm_server import LATENCY_DISTRIBUTIONS, MockLLMServer, load_recordings  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run(server_url: str, backend: str, questions, concurrency: int) -> dict:
+    pipeline = SQLGenerationPipeline()
+    for name in ('sales_dw', 'marketing_dw'):
+        with open(os.path.join(ROOT, f'{name}.json'), 'r', encoding='utf-8') as f:
+            setattr(pipeline, f"{name.split('_')[0]}_schema", json.load(f))
+    pipeline.config.update({
+        'concurrency': concurrency, 'rate_limiting': False, 'retry_delay': 0.05,
+        'response_cache': False, 'semantic_cache': False, 'pre_routing': False
+    })
+    pipeline.llm_client = create_backend(backend, api_key='mock', base_url=server_url, max_retries=0)
+
+    start = time.time()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(pipeline.answer_question, questions))
+    elapsed = time.time() - start
+    latencies = [entry['latency_sec'] for entry in pipeline.latency_log]
+    return {
+        'concurrency': concurrency,
+        'elapsed_sec': round(elapsed, 3),
+        'questions_per_sec': round(len(questions) / elapsed, 2),
+        'latency_p50_sec': percentile(latencies, 50),
+        'latency_p95_sec': percentile(latencies, 95),
+        'failed': sum(1 for r in results if r['target_source'] == 'Unknown')
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pipeline throughput at several concurrency levels against the local mock LLM server")
+    parser.add_argument('--questions', type=int, default=128)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 64])
+    parser.add_argument('--backend', choices=['http', 'groq'], default='http',
+                        help="http = plain keep-alive client; groq = the Groq SDK pointed at the mock")
+    parser.add_argument('--latency', type=float, default=0.2, help="Mean server latency in seconds")
+    parser.add_argument('--latency-dist', choices=LATENCY_DISTRIBUTIONS, default='lognormal')
+    parser.add_argument('--error-rate', type=float, default=0.01, help="Share of requests answered with HTTP 500")
+    parser.add_argument('--replay', help="Checkpoint JSONL or queries JSON to replay as the model's answers")
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    questions = [{'question_id': i, 'question': f"Total sales for product {i}"} for i in range(1, args.questions + 1)]
+    recordings = load_recordings(args.replay) if args.replay else None
+    report = {'settings': vars(args), 'runs': []}
+    for concurrency in args.concurrency:
+        server = MockLLMServer(latency=args.latency, latency_dist=args.latency_dist, recordings=recordings,
+                               error_rates={500: args.error_rate} if args.error_rate else None, seed=args.seed).start()
+        try:
+            outcome = run(server.url, args.backend, questions, concurrency)
+        finally:
+            server.stop()
+        outcome.update({'server_requests': server.stats['requests'], 'server_errors': server.stats['errors'],
+                        'replayed': server.stats['replayed']})
+        report['runs'].append(outcome)
+        print(f"{concurrency:>3}-way: {outcome['elapsed_sec']:.2f}s, {outcome['questions_per_sec']} q/s, "
+              f"p50 {outcome['latency_p50_sec']}s, p95 {outcome['latency_p95_sec']}s, "
+              f"{outcome['server_errors']} injected errors, {outcome['failed']}/{len(questions)} questions failed")
+
+    os.makedirs('output/benchmarks', exist_ok=True)
+    out = f"output/benchmarks/llm_backend_{time.strftime('%Y%m%d_%H%M%S')}.json"
+    with open(out, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results saved to {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from typing import Dict
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Capstone_Project'))
+
+from parallel_loader import ConnectionPool, ParallelLoader, table_dependencies  # noqa: E402
+
+# What design_schema typically gets back from the LLM for the three retail CSVs
+RETAIL_DDL = """
+CREATE TABLE CUSTOMERS (customer_id INT PRIMARY KEY, customer_name VARCHAR(100), address VARCHAR(200),
+    phone_number VARCHAR(20), email VARCHAR(100), join_date DATE);
+CREATE TABLE INVENTORY (product_id INT PRIMARY KEY, product_name VARCHAR(100), category VARCHAR(50),
+    quantity_in_stock INT, price_per_unit DECIMAL(10,2));
+CREATE TABLE SALES (sale_id INT PRIMARY KEY, customer_id INT, product_id INT, quantity INT, sale_date DATE,
+    total_amount DECIMAL(10,2),
+    FOREIGN KEY (customer_id) REFERENCES CUSTOMERS(customer_id),
+    FOREIGN KEY (product_id) REFERENCES INVENTORY(product_id));
+"""
+
+
+class LatencyCursor:
+    """Cursor proxy that adds a fixed round-trip per statement, as a networked MySQL server would"""
+
+    def __init__(self, cursor, rtt: float):
+        self._cursor = cursor
+        self._rtt = rtt
+
+    def execute(self, *args):
+        time.sleep(self._rtt)
+        return self._cursor.execute(*args)
+
+    def executemany(self, *args):
+        time.sleep(self._rtt)
+        return self._cursor.executemany(*args)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class LatencyConnection:
+    def __init__(self, conn, rtt: float):
+        self._conn = conn
+        self._rtt = rtt
+
+    def cursor(self):
+        return LatencyCursor(self._conn.cursor(), self._rtt)
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+def write_csvs(directory: str, customers: int, products: int, sales: int, seed: int) -> Dict[str, str]:
+    rng = random.Random(seed)
+    paths = {table: os.path.join(directory, f"{table}.csv") for table in ('CUSTOMERS', 'INVENTORY', 'SALES')}
+    with open(paths['CUSTOMERS'], 'w', encoding='utf-8', newline='') as f:
+        f.write("customer_id,customer_name,address,phone_number,email,join_date\n")
+        for i in range(1, customers + 1):
+            f.write(f"{i},Customer {i},\"{i} Example Street, Chennai, TN\",9{rng.randint(100000000, 999999999)},"
+                    f"customer{i}@example.com,202{rng.randint(0, 4)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}\n")
+    with open(paths['INVENTORY'], 'w', encoding='utf-8', newline='') as f:
+        f.write("product_id,product_name,category,quantity_in_stock,price_per_unit\n")
+        for i in range(1, products + 1):
+            f.write(f"{i},Product_{i},{rng.choice(['Electronics', 'Grocery', 'Clothing'])},"
+                    f"{rng.randint(0, 500)},{rng.uniform(5, 500):.2f}\n")
+    with open(paths['SALES'], 'w', encoding='utf-8', newline='') as f:
+        f.write("sale_id,customer_id,product_id,quantity,sale_date,total_amount\n")
+        for i in range(1, sales + 1):
+            quantity = rng.randint(1, 10)
+            f.write(f"{i},{rng.randint(1, customers)},{rng.randint(1, products)},{quantity},"
+                    f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d},{quantity * rng.uniform(5, 200):.2f}\n")
+    return paths
+
+
+def run(name: str, db_path: str, files: Dict[str, str], workers: int, defer: bool, args) -> Dict:
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    setup = sqlite3.connect(db_path)
+    setup.execute("PRAGMA journal_mode=WAL")
+    setup.executescript(RETAIL_DDL)
+    setup.close()
+
+    def connect():
+        conn = sqlite3.connect(db_path, timeout=60, check_same_thread=False)
+        conn.execute("PRAGMA synchronous=OFF")
+        conn.execute("PRAGMA foreign_keys = ON")
+        return LatencyConnection(conn, args.rtt_ms / 1000) if args.rtt_ms else conn
+
+    pool = ConnectionPool(connect, workers)
+    try:
+        outcome = ParallelLoader(pool, 'sqlite', args.mode, args.chunk_rows, defer).load(files, table_dependencies(RETAIL_DDL))
+    finally:
+        pool.close()
+    check = sqlite3.connect(db_path)
+    orphans = check.execute("SELECT COUNT(*) FROM SALES s LEFT JOIN CUSTOMERS c ON c.customer_id = s.customer_id "
+                            "WHERE c.customer_id IS NULL").fetchone()[0]
+    rows = sum(check.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] for table in files)
+    check.close()
+    return {'name': name, 'seconds': outcome['seconds'], 'rows': rows, 'orphan_sales': orphans,
+            'waves': outcome['waves'],
+            'tables': [{key: t.get(key) for key in ('table', 'started', 'finished', 'rows', 'fk_checks', 'error')}
+                       for t in outcome['tables']]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FK-ordered parallel table loading vs. one table at a time")
+    parser.add_argument('--customers', type=int, default=100000)
+    parser.add_argument('--products', type=int, default=100000)
+    parser.add_argument('--sales', type=int, default=200000)
+    parser.add_argument('--mode', choices=('executemany', 'values'), default='values')
+    parser.add_argument('--chunk-rows', type=int, default=2000)
+    parser.add_argument('--rtt-ms', type=float, default=0.0,
+                        help="Round-trip added per statement, to emulate a networked server (SQLite is in-process)")
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    report = {'settings': vars(args), 'results': []}
+    with tempfile.TemporaryDirectory() as tmp:
+        files = write_csvs(tmp, args.customers, args.products, args.sales, args.seed)
+        db_path = os.path.join(tmp, 'retail_dw.sqlite')
+        print(f"Dependencies: {table_dependencies(RETAIL_DDL)}")
+        baseline = None
+        for name, workers, defer in (('sequential', 1, False), ('parallel_fk_ordered', 3, False),
+                                     ('parallel_fk_deferred', 3, True)):
+            outcome = run(name, db_path, files, workers, defer, args)
+            baseline = baseline or outcome['seconds']
+            outcome['speedup'] = round(baseline / outcome['seconds'], 2)
+            report['results'].append(outcome)
+            timeline = ', '.join(f"{t['table']} {t['started']:.2f}–{t['finished']:.2f}s" for t in outcome['tables'])
+            print(f"{name:>22}: {outcome['seconds']:.2f}s ({outcome['speedup']}x), {outcome['rows']:,} rows, "
+                  f"{outcome['orphan_sales']} orphan sales | {timeline}")
+
+    os.makedirs('output/benchmarks', exist_ok=True)
+    out = f"output/benchmarks/parallel_load_{time.strftime('%Y%m%d_%H%M%S')}.json"
+    with open(out, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results saved to {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import SQLGenerationPipeline, percentile  # noqa: E402
+from llm_backend import HTTPBackend, LLMBackend  # noqa: E402
+from mock_llm_server import QUESTION_ID_RE, MockLLMServer  # noqa: E402
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SUBJECTS = ['order', 'customer', 'product', 'store', 'campaign', 'channel', 'invoice', 'shipment',
+            'supplier', 'region', 'employee', 'lead', 'session', 'coupon', 'return', 'payment']
+MEASURES = ['amount', 'quantity', 'revenue', 'cost', 'discount', 'clicks', 'impressions', 'margin']
+ATTRIBUTES = ['name', 'category', 'status', 'segment', 'country', 'tier', 'source', 'brand']
+# Valid against every synthetic schema (table 0 is always `orders`), so local validation passes
+CANNED_SQL = 'SELECT order_id, COUNT(*) AS total FROM orders GROUP BY order_id'
+QUESTION_TEMPLATES = [
+    "What is the total {measure} by {attribute} for {subject}s in the last 90 days?",
+    "Show the top 10 {subject}s by {measure}.",
+    "How many {subject}s per {attribute} had a {measure} above average?",
+    "Compare monthly {measure} across {attribute} for each {subject}.",
+]
+
+
+def synthetic_schema(database: str, tables: int, rng: random.Random) -> Dict:
+    """A star-ish schema: every table has an id, a few measures/attributes and an FK to an earlier table"""
+    schema = {'database': database, 'tables': {}}
+    names = []
+    for i in range(tables):
+        name = f"{SUBJECTS[i % len(SUBJECTS)]}s" + (f"_{i // len(SUBJECTS)}" if i >= len(SUBJECTS) else '')
+        columns = {f"{name.rstrip('s')}_id": {'type': 'INT', 'description': f"Unique identifier for each {name}"}}
+        if names:
+            parent = rng.choice(names)
+            columns[f"{parent.rstrip('s')}_id"] = {'type': 'INT', 'description': f"Foreign key → {parent}.{parent.rstrip('s')}_id"}
+        for measure in rng.sample(MEASURES, 3):
+            columns[measure] = {'type': 'DECIMAL', 'description': f"{measure.title()} of the {name.rstrip('s')}"}
+        for attribute in rng.sample(ATTRIBUTES, 3):
+            columns[attribute] = {'type': 'VARCHAR', 'description': f"{attribute.title()} of the {name.rstrip('s')}"}
+        columns['created_date'] = {'type': 'DATE', 'description': 'Date the row was created'}
+        schema['tables'][name] = {'columns': columns}
+        names.append(name)
+    return schema
+
+
+def synthetic_questions(count: int, rng: random.Random) -> List[Dict]:
+    return [{
+        'question_id': i,
+        'question': rng.choice(QUESTION_TEMPLATES).format(
+            subject=rng.choice(SUBJECTS), measure=rng.choice(MEASURES), attribute=rng.choice(ATTRIBUTES))
+    } for i in range(1, count + 1)]
+
+
+class InProcessBackend(LLMBackend):
+    """Canned answers without a socket — isolates pipeline overhead from HTTP overhead"""
+
+    name = 'inproc'
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+
+    def complete(self, messages: List[Dict], model: str, temperature: Optional[float] = None,
+                 max_tokens: Optional[int] = None) -> Dict:
+        prompt = ''.join(m['content'] for m in messages)
+        ids = [int(i) for i in QUESTION_ID_RE.findall(prompt)] or [0]
+        answers = [{'question_id': qid, 'target_source': 'sales_dw',
+                    'sql': CANNED_SQL,
+                    'assumptions': 'Synthetic answer', 'confidence': 0.9} for qid in ids]
+        text = json.dumps(answers if len(ids) > 1 else answers[0])
+        if self.latency:
+            time.sleep(self.latency)
+        return {'text': text, 'usage': {'prompt_tokens': len(prompt) // 4, 'completion_tokens': len(text) // 4,
+                                        'total_tokens': (len(prompt) + len(text)) // 4}}
+
+
+def stage_summary(values: List[float]) -> Dict:
+    if not values:
+        return {'count': 0}
+    return {'count': len(values), 'avg_ms': round(sum(values) / len(values) * 1000, 4),
+            'p50_ms': round(percentile(values, 50) * 1000, 4), 'p95_ms': round(percentile(values, 95) * 1000, 4)}
+
+
+def peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def run_scenario(questions: int, tables: int, settings: Dict) -> Dict:
+    """One end-to-end process_all_questions run; executed in a fresh process so peak RSS is per scenario"""
+    rng = random.Random(settings['seed'])
+    pipeline = SQLGenerationPipeline()
+    pipeline.sales_schema = synthetic_schema('sales_dw', max(1, tables // 2), rng)
+    pipeline.marketing_schema = synthetic_schema('marketing_dw', max(1, tables - tables // 2), rng)
+    pipeline.questions = synthetic_questions(questions, rng)
+
+    server = None
+    with tempfile.TemporaryDirectory() as output_dir:
+        pipeline.config.update({
+            'questions': '', 'output_dir': output_dir, 'concurrency': settings['concurrency'],
+            'batch_size': settings['batch_size'], 'schema_pruning': settings['schema_pruning'],
+            'pre_routing': settings['pre_routing'], 'response_cache': False, 'semantic_cache': False,
+            'rate_limiting': False, 'retry_delay': 0.05
+        })
+        if settings['transport'] == 'http':
+            recordings = {q['question_id']: {'question_id': q['question_id'], 'target_source': 'sales_dw',
+                                             'sql': CANNED_SQL, 'assumptions': 'Synthetic answer', 'confidence': 0.9}
+                          for q in pipeline.questions}
+            server = MockLLMServer(latency=settings['latency'], recordings=recordings).start()
+            pipeline.llm_client = HTTPBackend(server.url)
+        else:
+            pipeline.llm_client = InProcessBackend(settings['latency'])
+
+        compile_start = time.perf_counter()
+        pipeline._compile_schema_prompts()
+        compile_sec = time.perf_counter() - compile_start
+
+        start = time.perf_counter()
+        try:
+            with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull), contextlib.redirect_stderr(devnull):
+                pipeline.process_all_questions()
+        finally:
+            if server is not None:
+                server.stop()
+        elapsed = time.perf_counter() - start
+        failed = unanswered = 0
+        for r in pipeline._iter_results():
+            failed += r['target_source'] == 'Unknown'
+            unanswered += r['confidence'] <= 0  # includes router refusals of off-schema questions
+
+    latencies = pipeline.stage_timings['question']
+    return {
+        'scenario': f"{questions}x{tables}",
+        'questions': questions,
+        'tables': tables,
+        'elapsed_sec': round(elapsed, 3),
+        'questions_per_sec': round(questions / elapsed, 2) if elapsed else None,
+        'latency_p50_ms': round(percentile(latencies, 50) * 1000, 3),
+        'latency_p95_ms': round(percentile(latencies, 95) * 1000, 3),
+        'latency_p99_ms': round(percentile(latencies, 99) * 1000, 3),
+        'schema_compile_ms': round(compile_sec * 1000, 3),
+        'prompt_build': stage_summary(pipeline.stage_timings['prompt_build']),
+        'json_parse': stage_summary(pipeline.stage_timings['json_parse']),
+        'sql_validate': stage_summary(pipeline.stage_timings['sql_validate']),
+        'validation': dict(pipeline.validation_stats),
+        'llm_calls': len(pipeline.token_usage),
+        'avg_prompt_tokens': round(sum(t['prompt_tokens'] for t in pipeline.token_usage) / len(pipeline.token_usage))
+                             if pipeline.token_usage else 0,
+        'failed': failed,
+        'unanswered': unanswered,
+        'peak_rss_mb': peak_rss_mb()
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(report: Dict, baseline_path: str):
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = {s['scenario']: s for s in json.load(f)['scenarios']}
+    print(f"\nChange vs. {baseline_path}:")
+    for scenario in report['scenarios']:
+        before = baseline.get(scenario['scenario'])
+        if not before or not before.get('questions_per_sec'):
+            continue
+        qps = (scenario['questions_per_sec'] / before['questions_per_sec'] - 1) * 100
+        p95 = scenario['latency_p95_ms'] - before['latency_p95_ms']
+        print(f"  {scenario['scenario']:>12}: throughput {qps:+.1f}%, p95 {p95:+.2f} ms")
+
+
+def parse_scenario(spec: str):
+    questions, tables = spec.lower().split('x')
+    return int(questions), int(tables)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end pipeline throughput and per-stage latency on synthetic workloads")
+    parser.add_argument('--scenario', action='append', type=parse_scenario, metavar='QUESTIONSxTABLES',
+                        help="Workload size, repeatable (default: 20x2 1000x20 10000x200 200x2000; try 100000x2)")
+    parser.add_argument('--transport', choices=['http', 'inproc'], default='http',
+                        help="http = local mock server over sockets; inproc = canned answers, pipeline cost only")
+    parser.add_argument('--latency', type=float, default=0.0, help="Simulated model latency in seconds")
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--batch-size', type=int, default=1)
+    parser.add_argument('--schema-pruning', action='store_true')
+    parser.add_argument('--no-pre-routing', dest='pre_routing', action='store_false')
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--compare', help="Earlier results JSON to diff against")
+    args = parser.parse_args()
+
+    scenarios = args.scenario or [(20, 2), (1000, 20), (10000, 200), (200, 2000)]
+    settings = {'transport': args.transport, 'latency': args.latency, 'concurrency': args.concurrency,
+                'batch_size': args.batch_size, 'schema_pruning': args.schema_pruning,
+                'pre_routing': args.pre_routing, 'seed': args.seed}
+    report = {'commit': git_commit(), 'created': time.strftime('%Y-%m-%dT%H:%M:%S'), 'settings': settings,
+              'scenarios': []}
+
+    for questions, tables in scenarios:
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as executor:
+            outcome = executor.submit(run_scenario, questions, tables, settings).result()
+        report['scenarios'].append(outcome)
+        print(f"{outcome['scenario']:>12}: {outcome['questions_per_sec']} q/s, "
+              f"p50/p95/p99 {outcome['latency_p50_ms']}/{outcome['latency_p95_ms']}/{outcome['latency_p99_ms']} ms, "
+              f"prompt build {outcome['prompt_build'].get('avg_ms', 0)} ms, "
+              f"JSON parse {outcome['json_parse'].get('avg_ms', 0)} ms, "
+              f"SQL validation {outcome['sql_validate'].get('avg_ms', 0)} ms, "
+              f"peak RSS {outcome['peak_rss_mb']} MB, {outcome['failed']} failed")
+
+    os.makedirs('output/benchmarks', exist_ok=True)
+    out = f"output/benchmarks/pipeline_{time.strftime('%Y%m%d_%H%M%S')}.json"
+    with open(out, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results saved to {out}")
+
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import SQLGenerationPipeline  # noqa: E402
+from llm_backend import GroqBackend  # noqa: E402
+from mock_llm_server import MockLLMServer  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run(server_url: str, questions, concurrency: int, rpm: int, limiter: bool) -> dict:
+    pipeline = SQLGenerationPipeline()
+    for name in ('sales_dw', 'marketing_dw'):
+        with open(os.path.join(ROOT, f'{name}.json'), 'r', encoding='utf-8') as f:
+            setattr(pipeline, f"{name.split('_')[0]}_schema", json.load(f))
+    pipeline.config.update({
+        'concurrency': concurrency, 'rate_limiting': limiter, 'rpm_limit': rpm, 'tpm_limit': None,
+        'retry_delay': 0.5, 'response_cache': False, 'semantic_cache': False, 'pre_routing': False
+    })
+    # Without our scheduler the SDK's own retry/backoff is what handles 429s
+    pipeline.llm_client = GroqBackend('mock', base_url=server_url, max_retries=0 if limiter else 2)
+    pipeline.initialize_rate_limiter()
+
+    start = time.time()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(pipeline.answer_question, questions))
+    elapsed = time.time() - start
+    return {
+        'limiter': limiter,
+        'elapsed_sec': round(elapsed, 2),
+        'failed': sum(1 for r in results if r['target_source'] == 'Unknown'),
+        'limiter_stats': pipeline.rate_limiter.stats() if pipeline.rate_limiter else None
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rate limiter vs. blind retries against a rate-limited mock server")
+    parser.add_argument('--questions', type=int, default=90)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--rpm', type=int, default=60, help="Server-side limit (the client budget uses the same value)")
+    parser.add_argument('--latency', type=float, default=0.05)
+    args = parser.parse_args()
+
+    questions = [{'question_id': i, 'question': f"Total sales for product {i}"} for i in range(1, args.questions + 1)]
+    report = {}
+    for limiter in (False, True):
+        server = MockLLMServer(rpm=args.rpm, latency=args.latency).start()
+        try:
+            outcome = run(server.url, questions, args.concurrency, args.rpm, limiter)
+        finally:
+            server.stop()
+        outcome['server_requests'] = server.stats['requests']
+        outcome['server_429s'] = server.stats['rate_limited']
+        report['with_limiter' if limiter else 'without_limiter'] = outcome
+        print(f"{'With' if limiter else 'Without'} scheduler: {outcome['elapsed_sec']}s, "
+              f"{outcome['server_requests']} requests sent, {outcome['server_429s']} answered 429, "
+              f"{outcome['failed']}/{len(questions)} questions failed")
+
+    os.makedirs('output/benchmarks', exist_ok=True)
+    out = f"output/benchmarks/rate_limiter_{time.strftime('%Y%m%d_%H%M%S')}.json"
+    with open(out, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results saved to {out}")
+
+
+if __name__ == "__main__":
+    main()
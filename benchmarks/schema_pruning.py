@@ -0,0 +1,94 @@
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+from datetime import datetime
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from app import SQLGenerationPipeline  # noqa: E402
+
+TABLE_IN_SQL_RE = re.compile(r"\b(?:FROM|JOIN)\s+([A-Za-z_][A-Za-z0-9_]*)", re.IGNORECASE)
+
+
+def approx_tokens(text: str) -> int:
+    """Rough token estimate (~4 characters per token) — good enough for relative comparisons"""
+    return max(1, len(text) // 4)
+
+
+def load_reference(path: str) -> dict:
+    """question_id -> (target_source, tables used by the reference SQL)"""
+    reference = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            tables = {t.lower() for t in TABLE_IN_SQL_RE.findall(row['sql'] or '')}
+            reference[int(row['question_id'])] = (row['target_source'].strip(), tables)
+    return reference
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prompt-token reduction and table recall of schema pruning")
+    parser.add_argument('--data-dir', default=REPO_ROOT,
+                        help="Directory with sales_dw.json, marketing_dw.json, questions.csv (default: the repository root)")
+    parser.add_argument('--reference', help="Earlier queries_*.csv export used as ground truth for table recall")
+    parser.add_argument('--max-tables', type=int, default=8)
+    args = parser.parse_args()
+
+    pipeline = SQLGenerationPipeline()
+    with open(os.path.join(args.data_dir, 'sales_dw.json'), 'r', encoding='utf-8') as f:
+        pipeline.sales_schema = json.load(f)
+    with open(os.path.join(args.data_dir, 'marketing_dw.json'), 'r', encoding='utf-8') as f:
+        pipeline.marketing_schema = json.load(f)
+    with open(os.path.join(args.data_dir, 'questions.csv'), 'r', encoding='utf-8') as f:
+        questions = [{'question_id': int(r['question_id']), 'question': r['question']} for r in csv.DictReader(f)]
+    pipeline.config['schema_prune_max_tables'] = args.max_tables
+    reference = load_reference(args.reference) if args.reference else {}
+
+    rows = []
+    for q in questions:
+        pipeline.config['schema_pruning'] = False
+        full = sum(approx_tokens(m['content']) for m in pipeline.build_prompt_messages(q))
+        pipeline.config['schema_pruning'] = True
+        pruned = sum(approx_tokens(m['content']) for m in pipeline.build_prompt_messages(q))
+
+        kept = {name: set(index.select_tables(q['question'], max_tables=args.max_tables))
+                for name, index in pipeline._schema_indexes.items()}
+        row = {'question_id': q['question_id'], 'full_tokens': full, 'pruned_tokens': pruned,
+               'kept_tables': {name: sorted(t) for name, t in kept.items()}}
+
+        if q['question_id'] in reference:
+            target, used = reference[q['question_id']]
+            if target in kept:
+                known = set(pipeline._table_texts[target])
+                needed = used & known
+                row['tables_retained'] = needed <= kept[target]
+        rows.append(row)
+
+    total_full = sum(r['full_tokens'] for r in rows)
+    total_pruned = sum(r['pruned_tokens'] for r in rows)
+    judged = [r for r in rows if 'tables_retained' in r]
+    retained = sum(1 for r in judged if r['tables_retained'])
+
+    print(f"Questions:            {len(rows)}")
+    print(f"Prompt tokens (full): {total_full:,}  (≈{total_full / len(rows):.0f}/question)")
+    print(f"Prompt tokens (pruned): {total_pruned:,}  (≈{total_pruned / len(rows):.0f}/question)")
+    print(f"Reduction:            {(1 - total_pruned / total_full) * 100:.1f}%")
+    if judged:
+        print(f"Table recall vs reference: {retained}/{len(judged)} ({retained / len(judged) * 100:.1f}%)")
+        for r in judged:
+            if not r['tables_retained']:
+                print(f"  ✗ Q{r['question_id']} lost a table used by the reference SQL: kept {r['kept_tables']}")
+
+    os.makedirs('output/benchmarks', exist_ok=True)
+    out = f"output/benchmarks/schema_pruning_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(out, 'w', encoding='utf-8') as f:
+        json.dump({'total_full_tokens': total_full, 'total_pruned_tokens': total_pruned,
+                   'table_recall': retained / len(judged) if judged else None, 'questions': rows}, f, indent=2)
+    print(f"Results saved to {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+from typing import Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sql_dialect import DIALECTS, normalize_sql  # noqa: E402
+
+TABLES = [('sales', 'sales_amount', 'sale_date', 'region'), ('campaigns', 'budget', 'start_date', 'channel'),
+          ('orders', 'order_total', 'order_date', 'status'), ('leads', 'score', 'created_date', 'source')]
+
+
+def legacy_validate_and_fix_sql(sql: str, target_source: str = '') -> str:
+    """validate_and_fix_sql as it was before sql_dialect.py (baseline, copied verbatim)"""
+    sql = sql.rstrip(';')
+    if 'TOP ' in sql.upper():
+        match = re.search(r'TOP\s+(\d+)', sql, re.IGNORECASE)
+        if match:
+            limit_num = match.group(1)
+            sql = re.sub(r'SELECT\s+TOP\s+\d+', 'SELECT', sql, flags=re.IGNORECASE)
+            if 'LIMIT' not in sql.upper():
+                sql += f' LIMIT {limit_num}'
+    sql = re.sub(r'DATE_SUBKATEX_INLINE_OPENCURRENT_DATE,\s*INTERVAL\s+(\d+)\s+(\w+)KATEX_INLINE_CLOSE',
+                 r"CURRENT_DATE - INTERVAL '\1 \2'", sql, flags=re.IGNORECASE)
+    sql = re.sub(r"INTERVAL\s+'(\d+)'\s+DAY", r"INTERVAL '\1 day'", sql, flags=re.IGNORECASE)
+    sql = re.sub(r"INTERVAL\s+'(\d+)'\s+MONTH", r"INTERVAL '\1 month'", sql, flags=re.IGNORECASE)
+    sql = re.sub(r"INTERVAL\s+'(\d+)'\s+YEAR", r"INTERVAL '\1 year'", sql, flags=re.IGNORECASE)
+    return sql
+
+
+def generate_cases(count: int, seed: int) -> List[Dict]:
+    """(input SQL, expected PostgreSQL) pairs mixing clean queries with the vendor-isms LLMs produce"""
+    rng = random.Random(seed)
+    cases = []
+    for i in range(count):
+        table, measure, date_col, dim = rng.choice(TABLES)
+        n = rng.randint(1, 120)
+        k = rng.randint(1, 50)
+        unit = rng.choice(['DAY', 'MONTH', 'YEAR'])
+        kind = rng.choice(['clean', 'top', 'top_subquery', 'top_in_string', 'date_sub', 'interval_quoted',
+                           'interval_mysql', 'brackets', 'functions', 'top_comment', 'clean_limit'])
+        where = f"WHERE {date_col} >= CURRENT_DATE - INTERVAL '{n} {unit.lower()}'"
+        body = f"{dim}, SUM({measure}) AS total FROM {table} {where} GROUP BY {dim} ORDER BY total DESC"
+        if kind == 'clean':
+            sql, expected = f"SELECT {body}", f"SELECT {body}"
+        elif kind == 'clean_limit':
+            sql = expected = f"SELECT {body} LIMIT {k}"
+        elif kind == 'top':
+            sql, expected = f"SELECT TOP {k} {body};", f"SELECT {body} LIMIT {k}"
+        elif kind == 'top_subquery':
+            sql = f"SELECT * FROM (SELECT TOP {k} {body}) ranked"
+            expected = f"SELECT * FROM (SELECT {body} LIMIT {k}) ranked"
+        elif kind == 'top_in_string':
+            sql = expected = f"SELECT {dim} FROM {table} WHERE {dim} = 'TOP {k} LIMIT'"
+        elif kind == 'top_comment':
+            sql = f"SELECT TOP {k} {body} -- best first"
+            expected = f"SELECT {body} LIMIT {k} -- best first"
+        elif kind == 'date_sub':
+            sql = f"SELECT {dim} FROM {table} WHERE {date_col} >= DATE_SUB(CURRENT_DATE, INTERVAL {n} {unit})"
+            expected = f"SELECT {dim} FROM {table} WHERE {date_col} >= CURRENT_DATE - INTERVAL '{n} {unit.lower()}'"
+        elif kind == 'interval_quoted':
+            sql = f"SELECT {dim} FROM {table} WHERE {date_col} >= CURRENT_DATE - INTERVAL '{n}' {unit}"
+            expected = f"SELECT {dim} FROM {table} WHERE {date_col} >= CURRENT_DATE - INTERVAL '{n} {unit.lower()}'"
+        elif kind == 'interval_mysql':
+            sql = f"SELECT {dim} FROM {table} WHERE {date_col} >= CURRENT_DATE - INTERVAL {n} {unit}"
+            expected = f"SELECT {dim} FROM {table} WHERE {date_col} >= CURRENT_DATE - INTERVAL '{n} {unit.lower()}'"
+        elif kind == 'brackets':
+            sql = f"SELECT [{dim}], SUM([{measure}]) FROM [{table}] GROUP BY [{dim}]"
+            expected = f'SELECT "{dim}", SUM("{measure}") FROM "{table}" GROUP BY "{dim}"'
+        else:
+            sql = f"SELECT ISNULL({dim}, 'n/a'), LEN({dim}), GETDATE() FROM {table}"
+            expected = f"SELECT COALESCE({dim}, 'n/a'), LENGTH({dim}), CURRENT_TIMESTAMP FROM {table}"
+        cases.append({'kind': kind, 'sql': sql, 'expected': expected})
+    return cases
+
+
+def evaluate(name: str, fn: Callable[[str], str], cases: List[Dict], repeat: int) -> Dict:
+    by_kind: Dict[str, List[int]] = {}
+    for case in cases:
+        ok = ' '.join(fn(case['sql']).split()) == ' '.join(case['expected'].split())
+        by_kind.setdefault(case['kind'], [0, 0])
+        by_kind[case['kind']][0] += ok
+        by_kind[case['kind']][1] += 1
+
+    sqls = [case['sql'] for case in cases]
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for sql in sqls:
+            fn(sql)
+    elapsed = time.perf_counter() - start
+    correct = sum(ok for ok, _ in by_kind.values())
+    return {'normalizer': name, 'correct': correct, 'total': len(cases),
+            'us_per_query': round(elapsed / (repeat * len(cases)) * 1e6, 2),
+            'by_kind': {kind: f"{ok}/{total}" for kind, (ok, total) in sorted(by_kind.items())}}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dialect normalizer vs. the old regex chain on generated SQL")
+    parser.add_argument('--queries', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    cases = generate_cases(args.queries, args.seed)
+    report = {'settings': vars(args), 'results': []}
+    candidates = {'legacy_regex_chain': legacy_validate_and_fix_sql}
+    candidates.update({f"normalizer_{name}": (lambda sql, d=name: normalize_sql(sql, d)) for name in sorted(DIALECTS)})
+    for name, fn in candidates.items():
+        outcome = evaluate(name, fn, cases, args.repeat)
+        # Expected outputs are PostgreSQL; the other dialects are timed only
+        if name not in ('legacy_regex_chain', 'normalizer_postgres'):
+            outcome.pop('correct')
+            outcome.pop('by_kind')
+        report['results'].append(outcome)
+        accuracy = f"{outcome['correct']}/{outcome['total']} correct, " if 'correct' in outcome else ''
+        print(f"{name:>20}: {accuracy}{outcome['us_per_query']} µs/query")
+        if 'by_kind' in outcome:
+            print(f"{'':>22}{outcome['by_kind']}")
+
+    os.makedirs('output/benchmarks', exist_ok=True)
+    out = f"output/benchmarks/sql_dialect_{time.strftime('%Y%m%d_%H%M%S')}.json"
+    with open(out, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results saved to {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import SQLGenerationPipeline, percentile  # noqa: E402
+from llm_backend import HTTPBackend  # noqa: E402
+from mock_llm_server import MockLLMServer  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CHATTER = "\n\nExplanation: the query joins sales to products and aggregates the amount per product. " * 8
+
+
+def run(server_url: str, questions, streaming: bool, concurrency: int, batch_size: int) -> dict:
+    pipeline = SQLGenerationPipeline()
+    for name in ('sales_dw', 'marketing_dw'):
+        with open(os.path.join(ROOT, f'{name}.json'), 'r', encoding='utf-8') as f:
+            setattr(pipeline, f"{name.split('_')[0]}_schema", json.load(f))
+    pipeline.config.update({
+        'streaming': streaming, 'concurrency': concurrency, 'rate_limiting': False,
+        'response_cache': False, 'semantic_cache': False, 'pre_routing': False
+    })
+    pipeline.llm_client = HTTPBackend(server_url)
+
+    units = [questions[i:i + batch_size] for i in range(0, len(questions), batch_size)]
+    start = time.time()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = [r for unit in executor.map(pipeline._answer_unit, units) for r in unit]
+    elapsed = time.time() - start
+    latencies = [l['latency_sec'] for l in pipeline.latency_log]
+    outcome = {
+        'streaming': streaming,
+        'elapsed_sec': round(elapsed, 2),
+        'latency_p50_sec': percentile(latencies, 50),
+        'latency_p95_sec': percentile(latencies, 95),
+        'completion_tokens': sum(t['completion_tokens'] for t in pipeline.token_usage),
+        'answered': sum(1 for r in results if r['confidence'] > 0)
+    }
+    if streaming:
+        outcome['ttft_p50_sec'] = percentile([l['ttft_sec'] for l in pipeline.latency_log if l['ttft_sec']], 50)
+        outcome['closed_early'] = sum(1 for l in pipeline.latency_log if l['closed_early'])
+    return outcome
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming with early close vs. waiting for the full completion")
+    parser.add_argument('--questions', type=int, default=32)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--batch-size', type=int, default=1)
+    parser.add_argument('--chunk-chars', type=int, default=8, help="Characters per streamed delta (~2 tokens)")
+    parser.add_argument('--chunk-delay', type=float, default=0.01, help="Seconds per delta, i.e. generation speed")
+    parser.add_argument('--chatter-chars', type=int, default=len(CHATTER), help="Text the model adds after the JSON")
+    args = parser.parse_args()
+
+    questions = [{'question_id': i, 'question': f"Total sales for product {i}"} for i in range(1, args.questions + 1)]
+    chatter = (CHATTER * (args.chatter_chars // len(CHATTER) + 1))[:args.chatter_chars]
+    report = {'settings': vars(args), 'runs': []}
+    for streaming in (False, True):
+        server = MockLLMServer(chunk_chars=args.chunk_chars, chunk_delay=args.chunk_delay, chatter=chatter).start()
+        try:
+            outcome = run(server.url, questions, streaming, args.concurrency, args.batch_size)
+        finally:
+            server.stop()
+        report['runs'].append(outcome)
+        print(f"{'Streaming' if streaming else 'Blocking':>9}: {outcome['elapsed_sec']}s total, "
+              f"p50 {outcome['latency_p50_sec']}s / p95 {outcome['latency_p95_sec']}s per call, "
+              f"{outcome['answered']}/{len(questions)} answered"
+              + (f", {outcome['closed_early']} closed early" if streaming else ''))
+
+    os.makedirs('output/benchmarks', exist_ok=True)
+    out = f"output/benchmarks/streaming_{time.strftime('%Y%m%d_%H%M%S')}.json"
+    with open(out, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results saved to {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import json
+import os
+import threading
+from typing import Dict, Iterator, Set
+
+
+class CheckpointWriter:
+    """Append-only JSONL log of finished results; every line is flushed and fsynced"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def write(self, result: Dict):
+        line = json.dumps(result, ensure_ascii=False) + '\n'
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+
+def _scan(path: str) -> Iterator[tuple]:
+    """Yield (offset, result) for every intact line; a torn last line from a crash is skipped"""
+    with open(path, 'rb') as f:
+        offset = 0
+        for raw in f:
+            try:
+                result = json.loads(raw.decode('utf-8'))
+            except (UnicodeDecodeError, json.JSONDecodeError):
+                result = None
+            if isinstance(result, dict) and 'question_id' in result:
+                yield offset, result
+            offset += len(raw)
+
+
+def load_completed_ids(path: str) -> Set[int]:
+    """Question IDs with a usable result in the checkpoint (generation errors are retried on resume)"""
+    if not os.path.exists(path):
+        return set()
+    latest = {}
+    for _, result in _scan(path):
+        latest[result['question_id']] = result.get('target_source') != 'Unknown'
+    return {qid for qid, ok in latest.items() if ok}
+
+
+def iter_checkpoint(path: str) -> Iterator[Dict]:
+    """Stream results in question order, keeping the last entry per question_id.
+
+    Only an id -> file offset map is held in memory; each result is re-read from disk
+    when it is yielded.
+    """
+    if not os.path.exists(path):
+        return
+    offsets = {}
+    for offset, result in _scan(path):
+        offsets[result['question_id']] = offset
+    with open(path, 'rb') as f:
+        for qid in sorted(offsets):
+            f.seek(offsets[qid])
+            yield json.loads(f.readline().decode('utf-8'))
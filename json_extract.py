@@ -0,0 +1,178 @@
+import json
+import re
+from typing import Dict, Iterator, List, Optional
+
+# Inside an object: a whole string literal (escapes included), a lone quote (string not yet
+# terminated), or a structural character. Matching strings whole keeps braces inside SQL
+# literals from counting and lets the regex engine, not Python, walk the string contents.
+TOKEN_RE = re.compile(r'"(?:[^"\\]|\\.)*"|["{},\]]')
+# strict=False accepts raw newlines/tabs inside strings, which LLMs emit in multi-line SQL
+DECODER = json.JSONDecoder(strict=False)
+MAX_COMMA_REPAIRS = 8
+
+
+def decode_at(text: str, idx: int):
+    """raw_decode from idx, deleting trailing commas the decoder trips over; returns (object, end in text)"""
+    removed = 0
+    for _ in range(MAX_COMMA_REPAIRS):
+        try:
+            obj, end = DECODER.raw_decode(text, idx)
+            return obj, end + removed
+        except json.JSONDecodeError as e:
+            if e.pos >= len(text) or text[e.pos] not in '}]':
+                raise
+            comma = e.pos - 1
+            while comma > idx and text[comma] in ' \t\r\n':
+                comma -= 1
+            if text[comma] != ',':
+                raise
+            text = text[:comma] + text[comma + 1:]
+            removed += 1
+    raise ValueError("Too many trailing commas")
+
+
+class JSONObjectScanner:
+    """Single-pass, incremental extractor of JSON objects from free-form LLM output.
+
+    feed() accepts the response in arbitrary chunks (e.g. streamed deltas) and returns
+    every top-level object completed so far — objects nested in another object stay
+    inside their parent, objects inside a top-level array are returned one by one.
+
+    Each object start is first handed to the C decoder (raw_decode), which consumes a
+    well-formed object — or one whose only flaw is trailing commas — in one go. Only when
+    that fails (the object is still streaming in, or is otherwise malformed) does the
+    scanner walk it token by token, balancing braces and dropping trailing commas, and
+    decode the balanced text once it closes.
+    """
+
+    def __init__(self):
+        self._buffer = ''
+        self._pos = 0            # next index of _buffer to scan
+        self._depth = 0          # open-brace depth of the current object
+        self._start = None       # buffer index of the current object's '{'
+        self._last_comma = None
+        self._trailing = []      # trailing-comma indexes inside the current object
+        self.errors = 0          # balanced regions that still failed to decode
+
+    def feed(self, chunk: str) -> List[Dict]:
+        return list(self.iter_objects(chunk))
+
+    def iter_objects(self, chunk: str) -> Iterator[Dict]:
+        self._buffer += chunk
+        buffer = self._buffer
+        pos = self._pos
+        while True:
+            if self._start is None:
+                # Between objects: skip prose up to the next opening brace
+                idx = buffer.find('{', pos)
+                if idx == -1:
+                    pos = len(buffer)
+                    break
+                try:
+                    obj, end = decode_at(buffer, idx)
+                except ValueError:
+                    obj = None
+                if isinstance(obj, dict):
+                    yield obj
+                    pos = end
+                    continue
+                self._start = idx
+                self._depth = 1
+                self._last_comma = None
+                self._trailing = []
+                pos = idx + 1
+
+            pos, closed, obj = self._scan_object(buffer, pos)
+            if obj is not None:
+                yield obj
+            if not closed:
+                break
+
+        # Keep memory flat while streaming: drop everything before the open object
+        keep_from = self._start if self._start is not None else pos
+        self._buffer = buffer[keep_from:]
+        self._pos = pos - keep_from
+        if self._start is not None:
+            self._start = 0
+            if self._last_comma is not None:
+                self._last_comma -= keep_from
+            self._trailing = [t - keep_from for t in self._trailing]
+
+    def _scan_object(self, buffer: str, pos: int):
+        """Walk the open object from pos; returns (next pos, closed?, decoded object or None)"""
+        for match in TOKEN_RE.finditer(buffer, pos):
+            token = match.group()
+            idx = match.start()
+            ch = token[0]
+            if ch == '"':
+                if len(token) == 1:
+                    # Unterminated string — resume from its opening quote when more text arrives
+                    return idx, False, None
+            elif ch == ',':
+                self._last_comma = idx
+            elif ch == '{':
+                self._depth += 1
+            else:
+                # '}' or ']' — a comma followed only by whitespace is a trailing comma
+                if self._last_comma is not None and not buffer[self._last_comma + 1:idx].strip():
+                    self._trailing.append(self._last_comma)
+                self._last_comma = None
+                if ch == '}':
+                    self._depth -= 1
+                    if self._depth == 0:
+                        start, self._start = self._start, None
+                        return idx + 1, True, self._decode(buffer, start, idx + 1)
+        return len(buffer), False, None
+
+    @property
+    def pending(self) -> bool:
+        """True while an object has been opened but not closed"""
+        return self._start is not None
+
+    def _decode(self, buffer: str, start: int, end: int) -> Optional[Dict]:
+        if self._trailing:
+            pieces = []
+            prev = start
+            for comma in self._trailing:
+                pieces.append(buffer[prev:comma])
+                prev = comma + 1
+            pieces.append(buffer[prev:end])
+            text = ''.join(pieces)
+        else:
+            text = buffer[start:end]
+        try:
+            obj = DECODER.decode(text)
+        except ValueError:
+            self.errors += 1
+            return None
+        return obj if isinstance(obj, dict) else None
+
+
+def _scanner_at(start: int) -> JSONObjectScanner:
+    """A scanner whose first feed starts scanning at index `start` of the text, without slicing it"""
+    scanner = JSONObjectScanner()
+    scanner._pos = start
+    return scanner
+
+
+def extract_json_object(text: str) -> Optional[Dict]:
+    """First complete JSON object in text, or None"""
+    start = 0
+    while True:
+        scanner = _scanner_at(start)
+        obj = next(scanner.iter_objects(text), None)
+        if obj is not None or not scanner.pending:
+            return obj
+        # An unmatched '{' in leading prose swallowed the rest — retry after it
+        start = text.index('{', start) + 1
+
+
+def extract_json_objects(text: str) -> List[Dict]:
+    """Every top-level JSON object in text (e.g. the items of a batch answer array)"""
+    start = 0
+    while True:
+        scanner = _scanner_at(start)
+        objects = scanner.feed(text)
+        if objects or not scanner.pending:
+            return objects
+        start = text.index('{', start) + 1
@@ -0,0 +1,237 @@
+import http.client
+import json
+import threading
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from groq import Groq
+
+
+class LLMError(Exception):
+    """Non-2xx answer from an HTTP backend; carries status_code/response like the Groq SDK errors"""
+
+    def __init__(self, message: str, status_code: int, response=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.response = response
+
+
+def request_body(messages: List[Dict], model: str, temperature: Optional[float], max_tokens: Optional[int]) -> Dict:
+    body = {'model': model, 'messages': messages}
+    if temperature is not None:
+        body['temperature'] = temperature
+    if max_tokens is not None:
+        body['max_tokens'] = max_tokens
+    return body
+
+
+class LLMStream:
+    """Text deltas of a streamed completion. close() abandons the rest of the response.
+
+    usage is filled in from the final chunk when the provider reports it; finished is True
+    once the provider signalled the end of the stream.
+    """
+
+    def __init__(self, events: Iterator[Tuple[Optional[str], Optional[Dict]]], close: Callable[[], None]):
+        self._events = events
+        self._close = close
+        self.usage = None
+        self.finished = False
+        self.closed = False
+
+    def __iter__(self) -> Iterator[str]:
+        for delta, usage in self._events:
+            if usage:
+                self.usage = {'prompt_tokens': usage.get('prompt_tokens', 0),
+                              'completion_tokens': usage.get('completion_tokens', 0),
+                              'total_tokens': usage.get('total_tokens', 0)}
+            if delta:
+                yield delta
+        self.finished = True
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self._close()
+
+    def __enter__(self) -> 'LLMStream':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class LLMBackend:
+    """One chat-completions provider. complete() returns {'text', 'usage'} with OpenAI-style token counts;
+    stream() returns an LLMStream of text deltas."""
+
+    name = 'base'
+
+    def complete(self, messages: List[Dict], model: str, temperature: Optional[float] = None,
+                 max_tokens: Optional[int] = None) -> Dict:
+        raise NotImplementedError
+
+    def stream(self, messages: List[Dict], model: str, temperature: Optional[float] = None,
+               max_tokens: Optional[int] = None) -> LLMStream:
+        raise NotImplementedError
+
+    def describe(self) -> str:
+        return self.name
+
+
+class GroqBackend(LLMBackend):
+    name = 'groq'
+
+    def __init__(self, api_key: str, base_url: Optional[str] = None, max_retries: int = 2):
+        self.base_url = base_url
+        self.client = Groq(api_key=api_key, base_url=base_url, max_retries=max_retries)
+
+    def complete(self, messages: List[Dict], model: str, temperature: Optional[float] = None,
+                 max_tokens: Optional[int] = None) -> Dict:
+        response = self.client.chat.completions.create(**request_body(messages, model, temperature, max_tokens))
+        usage = response.usage
+        return {
+            'text': response.choices[0].message.content or '',
+            'usage': {'prompt_tokens': usage.prompt_tokens, 'completion_tokens': usage.completion_tokens,
+                      'total_tokens': usage.total_tokens}
+        }
+
+    def stream(self, messages: List[Dict], model: str, temperature: Optional[float] = None,
+               max_tokens: Optional[int] = None) -> LLMStream:
+        response = self.client.chat.completions.create(
+            **request_body(messages, model, temperature, max_tokens), stream=True)
+
+        def events():
+            for chunk in response:
+                # Groq reports usage on the last chunk under x_groq
+                usage = getattr(getattr(chunk, 'x_groq', None), 'usage', None) or getattr(chunk, 'usage', None)
+                if usage is not None and not isinstance(usage, dict):
+                    usage = {'prompt_tokens': usage.prompt_tokens, 'completion_tokens': usage.completion_tokens,
+                             'total_tokens': usage.total_tokens}
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                yield delta, usage
+
+        return LLMStream(events(), response.close)
+
+    def describe(self) -> str:
+        return f"groq ({self.base_url})" if self.base_url else 'groq'
+
+
+class HTTPBackend(LLMBackend):
+    """Any OpenAI-compatible /chat/completions endpoint (e.g. mock_llm_server.py) over plain http.client.
+
+    Keeps one keep-alive connection per thread, so high fan-out load tests measure the
+    pipeline rather than TCP handshakes. No retries here — the pipeline owns retry policy.
+    """
+
+    name = 'http'
+
+    def __init__(self, base_url: str, api_key: Optional[str] = None, timeout: float = 60.0):
+        parts = urlsplit(base_url)
+        if parts.scheme not in ('http', 'https') or not parts.netloc:
+            raise ValueError(f"Invalid base URL: {base_url!r}")
+        self.base_url = base_url
+        self.timeout = timeout
+        self._scheme = parts.scheme
+        self._netloc = parts.netloc
+        self._path = parts.path.rstrip('/') + '/chat/completions'
+        self._headers = {'Content-Type': 'application/json'}
+        if api_key:
+            self._headers['Authorization'] = f"Bearer {api_key}"
+        self._local = threading.local()
+
+    def _connection(self) -> http.client.HTTPConnection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            cls = http.client.HTTPSConnection if self._scheme == 'https' else http.client.HTTPConnection
+            conn = self._local.conn = cls(self._netloc, timeout=self.timeout)
+        return conn
+
+    def _post(self, body: bytes) -> http.client.HTTPResponse:
+        for attempt in range(2):
+            conn = self._connection()
+            try:
+                conn.request('POST', self._path, body=body, headers=self._headers)
+                return conn.getresponse()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                # The server closed an idle keep-alive connection — reconnect once
+                conn.close()
+                self._local.conn = None
+                if attempt:
+                    raise
+
+    def _raise_for_status(self, response: http.client.HTTPResponse, data: bytes):
+        if response.status >= 400:
+            try:
+                message = json.loads(data)['error']['message']
+            except (ValueError, KeyError, TypeError):
+                message = data.decode('utf-8', 'replace')[:200]
+            raise LLMError(f"Error code: {response.status} - {message}", response.status, response)
+
+    def complete(self, messages: List[Dict], model: str, temperature: Optional[float] = None,
+                 max_tokens: Optional[int] = None) -> Dict:
+        payload = request_body(messages, model, temperature, max_tokens)
+        response = self._post(json.dumps(payload).encode('utf-8'))
+        data = response.read()
+        self._raise_for_status(response, data)
+
+        body = json.loads(data)
+        usage = body.get('usage') or {}
+        return {
+            'text': body['choices'][0]['message'].get('content') or '',
+            'usage': {'prompt_tokens': usage.get('prompt_tokens', 0),
+                      'completion_tokens': usage.get('completion_tokens', 0),
+                      'total_tokens': usage.get('total_tokens', 0)}
+        }
+
+    def stream(self, messages: List[Dict], model: str, temperature: Optional[float] = None,
+               max_tokens: Optional[int] = None) -> LLMStream:
+        payload = request_body(messages, model, temperature, max_tokens)
+        payload['stream'] = True
+        response = self._post(json.dumps(payload).encode('utf-8'))
+        if response.status >= 400:
+            self._raise_for_status(response, response.read())
+        conn = self._local.conn
+
+        def events():
+            # Server-sent events: one 'data: {chunk}' line per delta, terminated by 'data: [DONE]'
+            for raw in response:
+                line = raw.strip()
+                if not line.startswith(b'data:'):
+                    continue
+                data = line[5:].strip()
+                if data == b'[DONE]':
+                    break
+                chunk = json.loads(data)
+                usage = chunk.get('usage') or (chunk.get('x_groq') or {}).get('usage')
+                choices = chunk.get('choices') or []
+                yield (choices[0].get('delta') or {}).get('content') if choices else None, usage
+
+        def close():
+            if not stream.finished:
+                # A half-read response cannot be reused — drop the connection so the server stops sending
+                conn.close()
+                if getattr(self._local, 'conn', None) is conn:
+                    self._local.conn = None
+            else:
+                response.read()
+
+        stream = LLMStream(events(), close)
+        return stream
+
+    def describe(self) -> str:
+        return f"http ({self.base_url})"
+
+
+BACKENDS = {'groq': GroqBackend, 'http': HTTPBackend}
+
+
+def create_backend(name: str, api_key: Optional[str] = None, base_url: Optional[str] = None,
+                   max_retries: int = 2) -> LLMBackend:
+    if name == 'groq':
+        return GroqBackend(api_key, base_url=base_url, max_retries=max_retries)
+    if name == 'http':
+        if not base_url:
+            raise ValueError("The http backend needs a base URL")
+        return HTTPBackend(base_url, api_key=api_key)
+    raise ValueError(f"Unknown LLM backend {name!r} (choose from {', '.join(BACKENDS)})")
@@ -0,0 +1,306 @@
+import argparse
+import json
+import math
+import random
+import re
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+QUESTION_ID_RE = re.compile(r"Question ID: (\d+)")
+LATENCY_DISTRIBUTIONS = ('fixed', 'uniform', 'exponential', 'lognormal')
+
+
+def load_recordings(path: str) -> Dict[int, dict]:
+    """Recorded answers by question id, from a checkpoint JSONL or an exported queries JSON file"""
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    try:
+        records = json.loads(text)
+        if isinstance(records, dict):
+            records = [records]
+    except ValueError:
+        records = [json.loads(line) for line in text.splitlines() if line.strip()]
+    return {int(r['question_id']): r for r in records if 'question_id' in r}
+
+
+class MockLLMServer:
+    """Local stand-in for the Groq chat-completions endpoint.
+
+    Answers every request with a well-formed SQL JSON object — replayed from `recordings`
+    when the question id was recorded — after a latency drawn from `latency_dist` with mean
+    `latency` seconds. It enforces a sliding-window RPM limit by returning 429 + Retry-After,
+    and fails a random share of requests with the statuses in `error_rates`, so the client
+    side can be load-tested without a network. Requests with "stream": true are answered as
+    server-sent events of `chunk_chars` characters every `chunk_delay` seconds; `chatter`
+    is appended after the JSON, as models often do. A `broken_json` / `broken_sql` share of
+    first answers is truncated / names a column that does not exist; repair follow-ups
+    (prompts quoting "Your previous output") always get a good answer. `model_latency` and
+    `unsure` map a model-name substring to that model's mean latency / share of answers given
+    with confidence 0.4, so a small-to-large model cascade can be exercised.
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, rpm: Optional[int] = None, latency: float = 0.0,
+                 latency_dist: str = 'fixed', recordings: Optional[Dict[int, dict]] = None,
+                 error_rates: Optional[Dict[int, float]] = None, seed: Optional[int] = None,
+                 chunk_chars: int = 16, chunk_delay: float = 0.0, chatter: str = '',
+                 broken_json: float = 0.0, broken_sql: float = 0.0,
+                 model_latency: Optional[Dict[str, float]] = None, unsure: Optional[Dict[str, float]] = None):
+        if latency_dist not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution {latency_dist!r}")
+        self.rpm = rpm
+        self.latency = latency
+        self.latency_dist = latency_dist
+        self.recordings = recordings or {}
+        self.error_rates = error_rates or {}
+        self.chunk_chars = chunk_chars
+        self.chunk_delay = chunk_delay
+        self.chatter = chatter
+        self.broken_json = broken_json
+        self.broken_sql = broken_sql
+        self.model_latency = model_latency or {}
+        self.unsure = unsure or {}
+        self.stats = {'requests': 0, 'rate_limited': 0, 'errors': 0, 'replayed': 0,
+                      'streamed': 0, 'stream_cancelled': 0, 'broken': 0, 'repairs': 0, 'unsure': 0}
+        self._random = random.Random(seed)
+        self._recent = deque()
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'MockLLMServer':
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _admit(self) -> Optional[float]:
+        """None if the request may proceed, else seconds until the window frees a slot"""
+        now = time.monotonic()
+        with self._lock:
+            self.stats['requests'] += 1
+            while self._recent and now - self._recent[0] >= 60:
+                self._recent.popleft()
+            if self.rpm and len(self._recent) >= self.rpm:
+                self.stats['rate_limited'] += 1
+                return 60 - (now - self._recent[0])
+            self._recent.append(now)
+            return None
+
+    @staticmethod
+    def _for_model(values: Dict[str, float], model: str, default: float) -> float:
+        return next((value for name, value in values.items() if name in model), default)
+
+    def _sample(self, model: str = ''):
+        """(latency seconds, injected error status or None) for one request"""
+        latency = self._for_model(self.model_latency, model, self.latency)
+        with self._lock:
+            rng = self._random
+            if not latency or self.latency_dist == 'fixed':
+                delay = latency
+            elif self.latency_dist == 'uniform':
+                delay = rng.uniform(0, 2 * latency)
+            elif self.latency_dist == 'exponential':
+                delay = rng.expovariate(1 / latency)
+            else:
+                # sigma 0.5 gives a realistic long tail; mu is chosen so the mean stays `latency`
+                delay = rng.lognormvariate(math.log(latency) - 0.125, 0.5)
+
+            roll = rng.random()
+            for status, rate in self.error_rates.items():
+                if roll < rate:
+                    self.stats['errors'] += 1
+                    return delay, status
+                roll -= rate
+            return delay, None
+
+    def completion(self, body: dict) -> dict:
+        prompt = ''.join(m.get('content', '') for m in body.get('messages', []))
+        ids = [int(i) for i in QUESTION_ID_RE.findall(prompt)] or [0]
+        repair = 'Your previous output' in prompt
+        unsure_rate = self._for_model(self.unsure, body.get('model', ''), 0.0)
+        with self._lock:
+            if repair:
+                self.stats['repairs'] += 1
+                fault = None
+            else:
+                roll = self._random.random()
+                fault = 'json' if roll < self.broken_json else 'sql' if roll < self.broken_json + self.broken_sql else None
+                self.stats['broken'] += fault is not None
+            unsure = self._random.random() < unsure_rate
+            self.stats['unsure'] += unsure
+        answers = []
+        for qid in ids:
+            if qid in self.recordings:
+                with self._lock:
+                    self.stats['replayed'] += 1
+                answers.append(self.recordings[qid])
+                continue
+            answers.append({
+                "question_id": qid,
+                "question": "",
+                "target_source": "sales_dw",
+                "sql": "SELECT product_id, SUM({}) AS total FROM sales GROUP BY product_id".format(
+                    'revenue' if fault == 'sql' else 'sales_amount'),
+                "assumptions": "Mock response",
+                "confidence": 0.4 if unsure else 0.9
+            })
+        content = json.dumps(answers if len(ids) > 1 else answers[0])
+        if fault == 'json':
+            content = content[:len(content) // 2]
+        content += self.chatter
+        prompt_tokens = len(prompt) // 4
+        completion_tokens = len(content) // 4
+        return {
+            "id": f"mock-{time.time_ns()}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get('model', 'mock'),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": prompt_tokens + completion_tokens}
+        }
+
+    def stream_events(self, completion: dict):
+        """Server-sent event payloads for a completion: content deltas, then usage, then [DONE]"""
+        content = completion['choices'][0]['message']['content']
+        base = {"id": completion['id'], "object": "chat.completion.chunk", "created": completion['created'],
+                "model": completion['model']}
+        for i in range(0, len(content), self.chunk_chars):
+            yield json.dumps(dict(base, choices=[{"index": 0, "delta": {"content": content[i:i + self.chunk_chars]},
+                                                   "finish_reason": None}]))
+        yield json.dumps(dict(base, choices=[{"index": 0, "delta": {}, "finish_reason": "stop"}],
+                              usage=completion['usage']))
+        yield '[DONE]'
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status: int, payload: dict, headers: Optional[dict] = None):
+                data = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_POST(self):
+                if not self.path.rstrip('/').endswith('/chat/completions'):
+                    self._send(404, {"error": {"message": f"Unknown path {self.path}"}})
+                    return
+                length = int(self.headers.get('Content-Length', 0))
+                body = json.loads(self.rfile.read(length) or b'{}')
+
+                retry_after = server._admit()
+                if retry_after is not None:
+                    self._send(429, {"error": {"message": "Rate limit reached", "type": "requests", "code": "rate_limit_exceeded"}},
+                               {'Retry-After': f"{retry_after:.2f}", 'x-ratelimit-reset-requests': f"{retry_after:.2f}s"})
+                    return
+                delay, error_status = server._sample(body.get('model', ''))
+                if delay:
+                    time.sleep(delay)
+                if error_status:
+                    self._send(error_status, {"error": {"message": f"Injected error {error_status}", "type": "server_error"}})
+                    return
+                completion = server.completion(body)
+                if body.get('stream'):
+                    self._stream(completion)
+                    return
+                if server.chunk_delay:
+                    # Without streaming the client still waits for the whole generation
+                    content = completion['choices'][0]['message']['content']
+                    time.sleep(server.chunk_delay * -(-len(content) // server.chunk_chars))
+                self._send(200, completion)
+
+            def _stream(self, completion: dict):
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/event-stream')
+                self.send_header('Cache-Control', 'no-cache')
+                self.send_header('Connection', 'close')
+                self.end_headers()
+                with server._lock:
+                    server.stats['streamed'] += 1
+                try:
+                    for event in server.stream_events(completion):
+                        if server.chunk_delay:
+                            time.sleep(server.chunk_delay)
+                        self.wfile.write(f"data: {event}\n\n".encode('utf-8'))
+                        self.wfile.flush()
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client closed the stream early — stop generating
+                    with server._lock:
+                        server.stats['stream_cancelled'] += 1
+                finally:
+                    self.close_connection = True
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local mock of the Groq chat-completions API")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--rpm', type=int, default=None, help="Requests per minute before answering 429")
+    parser.add_argument('--latency', type=float, default=0.0, help="Mean seconds to wait before each answer")
+    parser.add_argument('--latency-dist', choices=LATENCY_DISTRIBUTIONS, default='fixed')
+    parser.add_argument('--replay', help="Checkpoint JSONL or exported queries JSON whose answers are replayed by question id")
+    parser.add_argument('--error', action='append', default=[], metavar='STATUS:RATE',
+                        help="Fail this share of requests with STATUS, e.g. 500:0.02 (repeatable)")
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--chunk-chars', type=int, default=16, help="Characters per streamed delta")
+    parser.add_argument('--chunk-delay', type=float, default=0.0, help="Seconds between streamed deltas")
+    parser.add_argument('--chatter', default='', help="Text the 'model' appends after its JSON answer")
+    parser.add_argument('--broken-json', type=float, default=0.0, help="Share of first answers cut off mid-JSON")
+    parser.add_argument('--broken-sql', type=float, default=0.0,
+                        help="Share of first answers whose SQL names a column that does not exist")
+    parser.add_argument('--model-latency', action='append', default=[], metavar='MODEL:SECONDS',
+                        help="Mean latency for models whose name contains MODEL, e.g. 8b:0.2 (repeatable)")
+    parser.add_argument('--unsure', action='append', default=[], metavar='MODEL:RATE',
+                        help="Share of that model's answers given with confidence 0.4, e.g. 8b:0.3 (repeatable)")
+    args = parser.parse_args()
+
+    error_rates = {}
+    for spec in args.error:
+        status, rate = spec.split(':')
+        error_rates[int(status)] = float(rate)
+    model_latency = {}
+    for spec in args.model_latency:
+        name, seconds = spec.rsplit(':', 1)
+        model_latency[name] = float(seconds)
+    unsure = {}
+    for spec in args.unsure:
+        name, rate = spec.rsplit(':', 1)
+        unsure[name] = float(rate)
+    recordings = load_recordings(args.replay) if args.replay else None
+
+    server = MockLLMServer(args.host, args.port, rpm=args.rpm, latency=args.latency, latency_dist=args.latency_dist,
+                           recordings=recordings, error_rates=error_rates, seed=args.seed,
+                           chunk_chars=args.chunk_chars, chunk_delay=args.chunk_delay, chatter=args.chatter,
+                           broken_json=args.broken_json, broken_sql=args.broken_sql,
+                           model_latency=model_latency, unsure=unsure)
+    print(f"Mock LLM server listening on {server.url} (use it as the Groq base_url or with --backend http)")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
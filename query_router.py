@@ -0,0 +1,78 @@
+from typing import Dict, List, Tuple
+
+from schema_index import TABLE_WEIGHT, SchemaIndex, tokenize
+
+# Words that match columns in every warehouse (dates, ids, generic measures) and so say nothing about routing
+GENERIC_TERMS = {
+    'day', 'daily', 'date', 'week', 'weekly', 'month', 'monthly', 'year', 'yearly', 'quarter',
+    'time', 'period', 'last', 'current', 'id', 'unique', 'identifier', 'name', 'type', 'number',
+    'total', 'sum', 'average', 'top', 'trend', 'per', 'highest', 'lowest', 'foreign', 'key'
+}
+
+
+class QueryRouter:
+    """Decide target_source from schema vocabulary overlap before any LLM call.
+
+    A schema "claims" a question when the question names a whole table or column that only
+    that schema has ("start date" claims start_date; "start" alone does not). A claim is
+    strong with a table name or two column names. One claimant -> route there; a strong
+    claim from several schemas -> the question spans warehouses and is refused; anything
+    weaker -> undecided, and the LLM sees both schemas. With no claim at all, single words
+    from names and descriptions can still route a question, but never refuse one.
+    """
+
+    def __init__(self, indexes: Dict[str, SchemaIndex], min_score: float = 2.0):
+        self.indexes = indexes
+        self.min_score = min_score
+
+    def route(self, question: str) -> Dict:
+        words = tokenize(question)
+        claims = {name: self._claims(name, words) for name in self.indexes}
+        scores = {name: sum(claim.values()) for name, claim in claims.items()}
+
+        claimants = [name for name, claim in claims.items() if claim]
+        strong = [name for name in claimants
+                  if any(w >= TABLE_WEIGHT for w in claims[name].values()) or len(claims[name]) >= 2]
+        if len(strong) > 1:
+            detail = '; '.join(f"{n}: {', '.join(sorted(claims[n]))}" for n in strong)
+            return {'decision': 'refuse', 'source': 'N/A', 'scores': scores,
+                    'reason': f"question needs data from {' and '.join(strong)} ({detail})"}
+        if len(claimants) == 1 and scores[claimants[0]] >= self.min_score:
+            return {'decision': 'route', 'source': claimants[0], 'scores': scores,
+                    'reason': f"only {claimants[0]} has {', '.join(sorted(claims[claimants[0]]))}"}
+        if not claimants:
+            return self._route_by_hints(set(words) - GENERIC_TERMS)
+        return {'decision': 'undecided', 'source': None, 'scores': scores,
+                'reason': f"no strong claim from more than one schema ({', '.join(claimants)} named)"}
+
+    def _claims(self, name: str, words: List[str]) -> Dict[str, float]:
+        """{table or column name: weight} for whole names in `words` that no other schema has"""
+        others = [index.names for o, index in self.indexes.items() if o != name]
+        claims = {}
+        for tokens, weight in self.indexes[name].names.items():
+            if set(tokens) <= GENERIC_TERMS or any(tokens in names for names in others):
+                continue
+            if _contains(words, tokens):
+                claims['_'.join(tokens)] = weight
+        return claims
+
+    def _route_by_hints(self, tokens) -> Dict:
+        """Route on single words (name fragments, descriptions) that only one schema knows"""
+        scores: Dict[str, float] = {}
+        evidence: Dict[str, List[str]] = {}
+        for name, index in self.indexes.items():
+            exclusive = [t for t in tokens if t in index.vocabulary
+                         and not any(t in other.vocabulary for o, other in self.indexes.items() if o != name)]
+            scores[name] = sum(index.vocabulary[t] for t in exclusive)
+            evidence[name] = sorted(exclusive)
+        hinted = [name for name, score in scores.items() if score >= self.min_score]
+        if len(hinted) == 1 and all(s == 0 for n, s in scores.items() if n != hinted[0]):
+            return {'decision': 'route', 'source': hinted[0], 'scores': scores,
+                    'reason': f"only {hinted[0]} matches: {', '.join(evidence[hinted[0]])}"}
+        return {'decision': 'undecided', 'source': None, 'scores': scores,
+                'reason': 'no confident schema match'}
+
+
+def _contains(words: List[str], tokens: Tuple[str, ...]) -> bool:
+    n = len(tokens)
+    return any(tuple(words[i:i + n]) == tokens for i in range(len(words) - n + 1))
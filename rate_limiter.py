@@ -0,0 +1,168 @@
+import random
+import re
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at `per_minute` tokens per minute"""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = float(per_minute)
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` tokens are available (0 if they are available now)"""
+        self._refill(now)
+        amount = min(amount, self.capacity)  # A request bigger than the bucket waits for a full bucket
+        return 0.0 if self.tokens >= amount else (amount - self.tokens) / self.rate
+
+    def take(self, amount: float):
+        self.tokens -= amount
+
+    def give_back(self, amount: float):
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class ModelRateLimiter:
+    """RPM/TPM budgets plus an AIMD concurrency window for one model.
+
+    Every request reserves one RPM token and an estimate of its tokens before it is
+    sent; the TPM reservation is reconciled with the real usage afterwards. A 429
+    halves the concurrency window and pauses everyone until Retry-After has passed;
+    each success grows the window by 1/window (additive increase).
+    """
+
+    def __init__(self, rpm: Optional[int], tpm: Optional[int], max_concurrency: int, min_concurrency: int = 1):
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.window = float(max_concurrency)
+        self.in_flight = 0
+        self.cooldown_until = 0.0
+        self.stats = {'requests': 0, 'rate_limited': 0, 'wait_sec': 0.0, 'min_window': float(max_concurrency)}
+        self._cond = threading.Condition()
+
+    def acquire(self, est_tokens: int):
+        start = time.monotonic()
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                wait = max(0.0, self.cooldown_until - now)
+                if not wait and self.in_flight >= int(self.window):
+                    wait = None  # Woken by release()
+                if wait == 0.0 and self.requests:
+                    wait = self.requests.wait_time(1, now)
+                if wait == 0.0 and self.tokens:
+                    wait = self.tokens.wait_time(est_tokens, now)
+                if wait == 0.0:
+                    break
+                self._cond.wait(timeout=wait)
+
+            if self.requests:
+                self.requests.take(1)
+            if self.tokens:
+                self.tokens.take(est_tokens)
+            self.in_flight += 1
+            self.stats['requests'] += 1
+            self.stats['wait_sec'] += time.monotonic() - start
+
+    def release(self, est_tokens: int, actual_tokens: Optional[int] = None, rate_limited: bool = False,
+                retry_after: Optional[float] = None):
+        with self._cond:
+            self.in_flight -= 1
+            if self.tokens and actual_tokens is not None:
+                diff = est_tokens - actual_tokens
+                if diff > 0:
+                    self.tokens.give_back(diff)
+                else:
+                    self.tokens.take(-diff)
+            if rate_limited:
+                self.stats['rate_limited'] += 1
+                self.window = max(self.min_concurrency, self.window / 2)
+                self.stats['min_window'] = min(self.stats['min_window'], self.window)
+                pause = retry_after if retry_after is not None else 1.0
+                self.cooldown_until = max(self.cooldown_until, time.monotonic() + pause)
+            elif actual_tokens is not None:
+                self.window = min(self.max_concurrency, self.window + 1.0 / self.window)
+            self._cond.notify_all()
+
+
+class RateLimitScheduler:
+    """Shared scheduler handing out one ModelRateLimiter per model"""
+
+    def __init__(self, rpm: Optional[int] = None, tpm: Optional[int] = None, max_concurrency: int = 8,
+                 per_model: Optional[Dict[str, Dict]] = None, backoff_base: float = 1.0, backoff_cap: float = 60.0):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.max_concurrency = max_concurrency
+        self.per_model = per_model or {}
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self._limiters: Dict[str, ModelRateLimiter] = {}
+        self._lock = threading.Lock()
+
+    def for_model(self, model: str) -> ModelRateLimiter:
+        with self._lock:
+            if model not in self._limiters:
+                limits = self.per_model.get(model, {})
+                self._limiters[model] = ModelRateLimiter(
+                    rpm=limits.get('rpm', self.rpm),
+                    tpm=limits.get('tpm', self.tpm),
+                    max_concurrency=self.max_concurrency
+                )
+            return self._limiters[model]
+
+    def backoff_delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Retry-After when the server gave one, otherwise full-jitter exponential backoff"""
+        if retry_after is not None:
+            return retry_after + random.uniform(0, self.backoff_base)
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * (2 ** attempt)))
+
+    def stats(self) -> Dict[str, Dict]:
+        with self._lock:
+            return {model: dict(limiter.stats, window=round(limiter.window, 2))
+                    for model, limiter in self._limiters.items()}
+
+
+def is_rate_limited(exc: Exception) -> bool:
+    return getattr(exc, 'status_code', None) == 429 or type(exc).__name__ == 'RateLimitError'
+
+
+DURATION_RE = re.compile(r'(?:(\d+(?:\.\d+)?)h)?(?:(\d+(?:\.\d+)?)m(?!s))?(?:(\d+(?:\.\d+)?)s)?(?:(\d+(?:\.\d+)?)ms)?$')
+
+
+def parse_retry_after(exc: Exception) -> Optional[float]:
+    """Seconds to wait from Retry-After (seconds or HTTP date) or Groq's x-ratelimit-reset-* headers"""
+    response = getattr(exc, 'response', None)
+    headers = getattr(response, 'headers', None)
+    if not headers:
+        return None
+
+    value = headers.get('retry-after')
+    if value:
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+
+    # Groq reports resets as durations such as "2m59.56s" or "7.66s"
+    resets = []
+    for name in ('x-ratelimit-reset-requests', 'x-ratelimit-reset-tokens'):
+        match = DURATION_RE.match(headers.get(name, '') or '')
+        if match and any(match.groups()):
+            h, m, s, ms = (float(g) if g else 0.0 for g in match.groups())
+            resets.append(h * 3600 + m * 60 + s + ms / 1000)
+    return max(resets) if resets else None
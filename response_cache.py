@@ -0,0 +1,92 @@
+import json
+import os
+import sqlite3
+import hashlib
+import threading
+import time
+from typing import Dict, List, Optional
+
+
+class ResponseCache:
+    """Content-addressed on-disk cache of LLM responses, backed by SQLite"""
+
+    def __init__(self, path: str = '.cache/llm_responses.sqlite', max_entries: int = 10000,
+                 max_age_days: float = 30):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_age_sec = max_age_days * 86400
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                prompt_tokens INTEGER,
+                completion_tokens INTEGER,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_access ON responses(last_access)")
+        self._conn.commit()
+        self.evict()
+
+    @staticmethod
+    def make_key(model: str, config: Dict, messages: List[Dict]) -> str:
+        """Hash of the model, generation settings and full prompt"""
+        payload = json.dumps({'model': model, 'config': config, 'messages': messages},
+                             sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, prompt_tokens, completion_tokens, created_at FROM responses WHERE key = ?",
+                (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if now - row[3] > self.max_age_sec:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+        return {'response': row[0], 'prompt_tokens': row[1], 'completion_tokens': row[2]}
+
+    def put(self, key: str, response: str, prompt_tokens: int = 0, completion_tokens: int = 0):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (key, response, prompt_tokens, completion_tokens, now, now)
+            )
+            self._conn.commit()
+            count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        if count > self.max_entries:
+            self.evict()
+
+    def evict(self):
+        """Drop entries older than max_age, then least-recently-used entries beyond max_entries"""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses WHERE created_at < ?", (time.time() - self.max_age_sec,))
+            self._conn.execute("""
+                DELETE FROM responses WHERE key IN (
+                    SELECT key FROM responses ORDER BY last_access DESC LIMIT -1 OFFSET ?
+                )
+            """, (self.max_entries,))
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
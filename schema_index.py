@@ -0,0 +1,101 @@
+import math
+import re
+from collections import defaultdict
+from typing import Dict, List, Set, Tuple
+
+from semantic_cache import STOPWORDS
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+TABLE_REF_RE = re.compile(r"\b([A-Za-z_][A-Za-z0-9_]*)\.([A-Za-z_][A-Za-z0-9_]*)\b")
+
+# Field weights: a hit on a table name says more than a hit on a column description
+TABLE_WEIGHT = 3.0
+COLUMN_WEIGHT = 2.0
+DESCRIPTION_WEIGHT = 1.0
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens with stopwords dropped and a naive plural strip"""
+    tokens = []
+    for tok in TOKEN_RE.findall(text.replace('_', ' ').lower()):
+        if tok in STOPWORDS:
+            continue
+        if len(tok) > 4 and tok.endswith('ies'):
+            tok = tok[:-3] + 'y'
+        elif len(tok) > 3 and tok.endswith('s') and not tok.endswith('ss'):
+            tok = tok[:-1]
+        tokens.append(tok)
+    return tokens
+
+
+class SchemaIndex:
+    """Inverted index over one warehouse schema's table names, column names and descriptions"""
+
+    def __init__(self, schema: Dict):
+        self.schema = schema
+        self.database = schema['database']
+        self.tables = list(schema['tables'].keys())
+        self.postings: Dict[str, Dict[str, float]] = defaultdict(dict)
+        self.vocabulary: Dict[str, float] = {}  # token -> strongest raw field weight anywhere in the schema
+        self.names: Dict[Tuple[str, ...], float] = {}  # whole table / column name, as tokens -> field weight
+        self.neighbours: Dict[str, Set[str]] = {t: set() for t in self.tables}
+
+        for table_name, table_info in schema['tables'].items():
+            self._post(table_name, table_name, TABLE_WEIGHT)
+            self._name(table_name, TABLE_WEIGHT)
+            for col_name, col_info in table_info['columns'].items():
+                self._post(table_name, col_name, COLUMN_WEIGHT)
+                self._name(col_name, COLUMN_WEIGHT)
+                self._post(table_name, col_info.get('description', ''), DESCRIPTION_WEIGHT)
+                self._link(table_name, col_info.get('description', ''))
+            for rel in table_info.get('relationships', []):
+                self._link(table_name, str(rel))
+
+        # Down-weight tokens that appear in most tables (ids, dates, ...)
+        n_tables = max(len(self.tables), 1)
+        for token, tables in self.postings.items():
+            idf = math.log(1.0 + n_tables / len(tables))
+            for table in tables:
+                tables[table] *= idf
+
+    def _post(self, table: str, text: str, weight: float):
+        for token in tokenize(text):
+            if self.postings[token].get(table, 0.0) < weight:
+                self.postings[token][table] = weight
+            if self.vocabulary.get(token, 0.0) < weight:
+                self.vocabulary[token] = weight
+
+    def _name(self, name: str, weight: float):
+        tokens = tuple(tokenize(name))
+        if tokens and self.names.get(tokens, 0.0) < weight:
+            self.names[tokens] = weight
+
+    def _link(self, table: str, text: str):
+        """Record FK neighbours from 'other_table.column' references"""
+        for ref_table, _ in TABLE_REF_RE.findall(text):
+            if ref_table in self.neighbours and ref_table != table:
+                self.neighbours[table].add(ref_table)
+                self.neighbours[ref_table].add(table)
+
+    def score(self, question: str) -> Dict[str, float]:
+        scores: Dict[str, float] = defaultdict(float)
+        for token in set(tokenize(question)):
+            for table, weight in self.postings.get(token, {}).items():
+                scores[table] += weight
+        return dict(scores)
+
+    def select_tables(self, question: str, max_tables: int = 8, min_ratio: float = 0.25) -> List[str]:
+        """Best-matching tables (within min_ratio of the top score) plus their FK neighbours"""
+        scores = self.score(question)
+        if not scores:
+            return []
+        top = max(scores.values())
+        ranked = sorted((t for t, s in scores.items() if s >= top * min_ratio),
+                        key=lambda t: -scores[t])[:max_tables]
+        selected = list(ranked)
+        for table in ranked:
+            for neighbour in sorted(self.neighbours[table]):
+                if neighbour not in selected:
+                    selected.append(neighbour)
+        # Keep schema order so prompts stay stable across questions
+        return [t for t in self.tables if t in selected]
@@ -0,0 +1,193 @@
+import json
+import os
+import re
+import threading
+import zlib
+from collections import deque
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+STOPWORDS = {
+    'a', 'an', 'the', 'of', 'in', 'on', 'for', 'by', 'to', 'and', 'or', 'with', 'from', 'per',
+    'what', 'which', 'who', 'show', 'list', 'find', 'give', 'me', 'get', 'are', 'is', 'was',
+    'were', 'do', 'does', 'did', 'how', 'many', 'much', 'each', 'all', 'their', 'its', 'that',
+    'this', 'these', 'those', 'be', 'been', 'over', 'during', 'within', 'as', 'at'
+}
+
+# Collapse common paraphrases onto one canonical word before vectorising
+SYNONYMS = {
+    'best': 'top', 'highest': 'top', 'leading': 'top', 'biggest': 'top', 'largest': 'top',
+    'worst': 'bottom', 'lowest': 'bottom',
+    'past': 'last', 'previous': 'last', 'prior': 'last', 'recent': 'last',
+    'revenue': 'sales', 'sale': 'sales', 'selling': 'sales', 'sold': 'sales',
+    'product': 'products', 'item': 'products', 'items': 'products',
+    'customer': 'customers', 'client': 'customers', 'clients': 'customers',
+    'day': 'days', 'month': 'months', 'year': 'years', 'week': 'weeks',
+    'avg': 'average', 'mean': 'average', 'total': 'sum', 'count': 'number'
+}
+
+# Words that fix which way a ranking runs (after SYNONYMS); a reused answer must keep its direction
+DIRECTION_TERMS = {'top', 'bottom', 'most', 'least', 'fewest', 'ascending', 'descending', 'asc', 'desc',
+                   'max', 'maximum', 'min', 'minimum'}
+
+NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+class SemanticQuestionCache:
+    """Local near-duplicate lookup over previously answered questions.
+
+    Questions are turned into hashed TF-IDF vectors (word unigrams, word bigrams and
+    character trigrams) held in a NumPy matrix; lookup is one matrix-vector product.
+
+    Every entry carries a `namespace` (a digest of whatever the answer depends on: schema
+    content, model, dialect…); only entries of this cache's namespace are loaded and served.
+    The file keeps the newest `max_entries` entries across all namespaces.
+
+    Similarity alone cannot tell "CTR per channel" from "CTR per campaign", so a match is only
+    served when both questions name the same `entity_terms` (table and column names) and the
+    same ranking direction (top / bottom …).
+    """
+
+    def __init__(self, threshold: float = 0.8, dim: int = 4096, path: Optional[str] = None,
+                 namespace: str = '', max_entries: int = 5000, entity_terms: Iterable[str] = ()):
+        self.threshold = threshold
+        self.entity_terms = {singular(SYNONYMS.get(t, t)) for t in entity_terms}
+        self.dim = dim
+        self.path = path
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._matrix = np.zeros((64, dim), dtype=np.float32)  # raw term frequencies, grown by doubling
+        self._doc_freq = np.zeros(dim, dtype=np.float32)
+        self._entries: List[Dict] = []
+        self._records = deque(maxlen=max_entries)  # newest file lines, any namespace
+        self._file_lines = 0
+
+        if path and os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        self._records.append(line if line.endswith('\n') else line + '\n')
+                        self._file_lines += 1
+            for line in self._records:
+                entry = json.loads(line)
+                if entry.get('namespace') == namespace:
+                    self._add_entry(entry['question'], entry['result'])
+            if self._file_lines > max_entries:
+                self._compact()
+
+    @staticmethod
+    def normalize(question: str) -> List[str]:
+        words = WORD_RE.findall(question.lower())
+        return [SYNONYMS.get(w, w) for w in words if w not in STOPWORDS]
+
+    def _guard_terms(self, question: str) -> Tuple[FrozenSet[str], FrozenSet[str]]:
+        """(entity terms, direction terms) a question must share with a cached one to reuse its answer"""
+        words = [singular(w) for w in self.normalize(question)]
+        return (frozenset(w for w in words if w in self.entity_terms),
+                frozenset(w for w in words if w in DIRECTION_TERMS))
+
+    def _features(self, question: str) -> np.ndarray:
+        words = self.normalize(question)
+        vec = np.zeros(self.dim, dtype=np.float32)
+        grams = list(words)
+        grams += [f"{a}_{b}" for a, b in zip(words, words[1:])]
+        for w in words:
+            padded = f"#{w}#"
+            grams += [f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2)]
+        for g in grams:
+            vec[zlib.crc32(g.encode('utf-8')) % self.dim] += 1.0
+        return np.log1p(vec)
+
+    def _add_entry(self, question: str, result: Dict):
+        vec = self._features(question)
+        n = len(self._entries)
+        if n == self._matrix.shape[0]:
+            self._matrix = np.vstack([self._matrix, np.zeros_like(self._matrix)])
+        self._matrix[n] = vec
+        self._doc_freq += (vec > 0)
+        self._entries.append({'question': question, 'result': result})
+
+    def add(self, question: str, result: Dict):
+        with self._lock:
+            if len(self._entries) < self.max_entries:
+                self._add_entry(question, result)
+            if self.path:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                line = json.dumps({'namespace': self.namespace, 'question': question, 'result': result},
+                                  ensure_ascii=False) + '\n'
+                self._records.append(line)
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(line)
+                self._file_lines += 1
+                # Rewrite once the file is a quarter over the cap, not on every add
+                if self._file_lines > self.max_entries + self.max_entries // 4:
+                    self._compact()
+
+    def _compact(self):
+        """Rewrite the file with only the newest max_entries lines"""
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.writelines(self._records)
+        os.replace(tmp_path, self.path)
+        self._file_lines = len(self._records)
+
+    def lookup(self, question: str) -> Optional[Tuple[Dict, float]]:
+        """Return (cached result, similarity) for the closest question above the threshold that names
+        the same entities and ranking direction"""
+        with self._lock:
+            n = len(self._entries)
+            if n == 0:
+                return None
+            idf = np.log((1.0 + n) / (1.0 + self._doc_freq)) + 1.0
+            docs = self._matrix[:n] * idf
+            query = self._features(question) * idf
+            norms = np.linalg.norm(docs, axis=1) * (np.linalg.norm(query) or 1.0)
+            scores = (docs @ query) / np.where(norms == 0, 1.0, norms)
+            candidates = [(float(scores[i]), self._entries[i]) for i in np.argsort(-scores)
+                          if scores[i] >= self.threshold]
+        guard = self._guard_terms(question)
+        for score, entry in candidates:
+            if self._guard_terms(entry['question']) != guard:
+                continue
+            adapted = self.adapt(entry['question'], question, entry['result'])
+            if adapted is not None:
+                return adapted, score
+        return None
+
+    @staticmethod
+    def adapt(cached_question: str, question: str, result: Dict) -> Optional[Dict]:
+        """Carry numeric literals (top N, last N days) over to the new question, or refuse"""
+        old_nums = NUMBER_RE.findall(cached_question)
+        new_nums = NUMBER_RE.findall(question)
+        adapted = dict(result)
+        if old_nums == new_nums:
+            return adapted
+        if len(old_nums) != len(new_nums):
+            return None
+        sql = adapted.get('sql', '')
+        for old, new in zip(old_nums, new_nums):
+            if old == new:
+                continue
+            pattern = re.compile(rf'(?<![\w.]){re.escape(old)}(?![\w.])')
+            if len(pattern.findall(sql)) != 1:
+                return None  # Ambiguous or missing literal — not safe to rewrite
+            sql = pattern.sub(new, sql)
+        adapted['sql'] = sql
+        return adapted
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def singular(word: str) -> str:
+    """Naive plural strip, so "campaigns" and "campaign" name the same entity"""
+    if len(word) > 4 and word.endswith('ies'):
+        return word[:-3] + 'y'
+    if len(word) > 3 and word.endswith('s') and not word.endswith('ss'):
+        return word[:-1]
+    return word
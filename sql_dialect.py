@@ -0,0 +1,367 @@
+import re
+import string
+from typing import Dict, List, Optional, Tuple, Union
+
+UNIT_ALIASES = {
+    'second': 'second', 'seconds': 'second', 'minute': 'minute', 'minutes': 'minute',
+    'hour': 'hour', 'hours': 'hour', 'day': 'day', 'days': 'day', 'week': 'week', 'weeks': 'week',
+    'month': 'month', 'months': 'month', 'quarter': 'quarter', 'quarters': 'quarter',
+    'year': 'year', 'years': 'year',
+}
+# All rules run case-sensitively on a lower-cased copy of the SQL; lowering ASCII only keeps
+# every offset in the copy valid for the original, so replacements are sliced from it
+ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+# Anchored at the end of a keyword: what may follow it for the rule to apply
+INTERVAL_TAIL_RE = re.compile(
+    r"\s*(?:'\s*(\d+)\s*([a-z]+)\s*'|'\s*(\d+)\s*'\s*([a-z]+)\b|(\d+)\s+([a-z]+)\b)")
+TOP_TAIL_RE = re.compile(r"\s*(?:(\d+)\b|\(\s*(\d+)\s*\))(?!\s*(?:percent|with)\b)\s*")
+LIMIT_TAIL_RE = re.compile(r"\s+(\d+)\b(?!\s*(?:offset\b|,))")
+FETCH_TAIL_RE = re.compile(r"\s+(?:first|next)\s+(\d+)\s+rows?\s+only\b")
+CALL_RE = re.compile(r"\s*\(")
+EMPTY_CALL_RE = re.compile(r"\s*\(\s*\)")
+# Inside a DATE_SUB/DATE_ADD call: strings are skipped whole, only parens and commas matter
+ARGS_RE = re.compile(r"'(?:[^']|'')*'|[(),]")
+ARITHMETIC = '+-*/|'
+
+
+def fold_case(sql: str) -> str:
+    return sql.lower() if sql.isascii() else sql.translate(ASCII_LOWER)
+
+
+class Dialect:
+    """Target dialect: how LIMIT, intervals, date arithmetic, quoted identifiers and functions are written.
+
+    `functions` maps a source function name to (replacement, drop_empty_parens). Subclass and
+    register_dialect() to add a target.
+    """
+
+    name = 'ansi'
+    identifier_quote = '"'
+    limit_syntax = {'FETCH'}   # row-limit clauses the dialect accepts as written
+    functions: Dict[str, Tuple[str, bool]] = {
+        'GETDATE': ('CURRENT_TIMESTAMP', True), 'NOW': ('CURRENT_TIMESTAMP', True),
+        'SYSDATE': ('CURRENT_TIMESTAMP', True), 'CURDATE': ('CURRENT_DATE', True),
+        'ISNULL': ('COALESCE', False), 'IFNULL': ('COALESCE', False), 'NVL': ('COALESCE', False),
+        'LEN': ('CHAR_LENGTH', False),
+    }
+    units = {'second', 'minute', 'hour', 'day', 'month', 'year'}
+    # What follows INTERVAL when it is already written the dialect's way (matched lower-cased)
+    interval_form = r"\s*'\d+'\s*(?:second|minute|hour|day|month|year)\b"
+
+    def __init__(self):
+        self.quotes = ''.join(sorted({'"', '`', '['} - {self.identifier_quote}))
+        words = ['top', 'interval', 'date_sub', 'date_add']
+        words += [name.lower() for name, (replacement, _) in self.functions.items() if replacement != name]
+        words += sorted({'limit', 'fetch'} - {syntax.lower() for syntax in self.limit_syntax})
+        self.trigger_words = words
+        self.foreign_interval = re.compile(r'interval\b(?!%s)' % self.interval_form)
+        self._lexers: Dict[frozenset, re.Pattern] = {}
+
+    def triggered(self, lowered: str) -> frozenset:
+        """Rules that can possibly apply: substring checks, so clean SQL is never lexed"""
+        words = {word for word in self.trigger_words if word in lowered}
+        if 'interval' in words and not self.foreign_interval.search(lowered):
+            words.discard('interval')
+        if any(quote in lowered for quote in self.quotes):
+            words.add('quote')
+        return frozenset(words)
+
+    def lexer(self, words: frozenset) -> re.Pattern:
+        """One compiled pattern yielding only the lexemes the triggered rules care about.
+
+        Literals, comments and quoted identifiers are matched whole so nothing inside them is
+        ever mistaken for a keyword; everything between lexemes is copied through as is.
+        """
+        lexer = self._lexers.get(words)
+        if lexer is None:
+            keywords = set(words) - {'quote'}
+            if 'top' in words:
+                # TOP needs its frame's own LIMIT/FETCH and subquery nesting
+                keywords |= {'limit', 'fetch'}
+            # Deliberately no groups and no leading \b: either defeats the regex engine's
+            # first-character scan. The caller tells lexemes apart by their first character.
+            pattern = r"""
+                 '(?:[^']|'')*'?|--[^\n]*|/\*.*?(?:\*/|$)
+                |"(?:[^"]|"")*"?|`(?:[^`]|``)*`?|\[[a-z_][^\]]*\]
+            """
+            if 'top' in words:
+                pattern += r"|[()]"
+            if keywords:
+                pattern += r"|(?:%s)\b" % '|'.join(sorted(keywords))
+            lexer = self._lexers[words] = re.compile(pattern, re.S | re.X)
+        return lexer
+
+    def limit(self, count: str) -> str:
+        return f" FETCH FIRST {count} ROWS ONLY"
+
+    def to_units(self, count: int, unit: str) -> Tuple[int, str]:
+        """Rewrite units the dialect lacks in terms of ones it has"""
+        if unit not in self.units:
+            if unit == 'week':
+                return count * 7, 'day'
+            if unit == 'quarter':
+                return count * 3, 'month'
+        return count, unit
+
+    def interval(self, count: int, unit: str) -> str:
+        count, unit = self.to_units(count, unit)
+        return f"INTERVAL '{count}' {unit.upper()}"
+
+    def date_arithmetic(self, func: str, expr: str, count: int, unit: str) -> str:
+        return f"{expr} {'-' if func == 'DATE_SUB' else '+'} {self.interval(count, unit)}"
+
+    def quote_identifier(self, name: str) -> str:
+        q = self.identifier_quote
+        return q + name.replace(q, q + q) + q
+
+
+class PostgresDialect(Dialect):
+    name = 'postgres'
+    limit_syntax = {'LIMIT', 'FETCH'}
+    functions = dict(Dialect.functions, NOW=('NOW', False), LEN=('LENGTH', False))
+    units = Dialect.units | {'week'}
+    interval_form = r"\s*'\d+\s*(?:second|minute|hour|day|week|month|year)s?'"
+
+    def limit(self, count: str) -> str:
+        return f" LIMIT {count}"
+
+    def interval(self, count: int, unit: str) -> str:
+        count, unit = self.to_units(count, unit)
+        return f"INTERVAL '{count} {unit}'"
+
+
+class MySQLDialect(Dialect):
+    name = 'mysql'
+    identifier_quote = '`'
+    limit_syntax = {'LIMIT'}
+    # MySQL has NOW/CURDATE/IFNULL natively, and its one-argument ISNULL() means IS NULL
+    functions = {'GETDATE': ('NOW', False), 'SYSDATE': ('NOW', False), 'NVL': ('IFNULL', False),
+                 'LEN': ('CHAR_LENGTH', False)}
+    units = Dialect.units | {'week', 'quarter'}
+    interval_form = r"\s*\d+\s+(?:second|minute|hour|day|week|month|quarter|year)\b"
+
+    def limit(self, count: str) -> str:
+        return f" LIMIT {count}"
+
+    def interval(self, count: int, unit: str) -> str:
+        count, unit = self.to_units(count, unit)
+        return f"INTERVAL {count} {unit.upper()}"
+
+    def date_arithmetic(self, func: str, expr: str, count: int, unit: str) -> str:
+        return f"{func}({expr}, {self.interval(count, unit)})"
+
+
+DIALECTS: Dict[str, Dialect] = {}
+
+
+def register_dialect(dialect: Dialect):
+    DIALECTS[dialect.name] = dialect
+
+
+for _dialect in (Dialect(), PostgresDialect(), MySQLDialect()):
+    register_dialect(_dialect)
+
+
+class SQLNormalizer:
+    """Rewrites LLM-generated SQL into one target dialect in a single left-to-right lexing pass.
+
+    Handles SELECT TOP n (also in subqueries) → the dialect's row limit, LIMIT ↔ FETCH FIRST,
+    DATE_SUB/DATE_ADD, every INTERVAL spelling, [bracketed]/`backtick`/"double" quoted
+    identifiers and common vendor functions. String literals and comments are never touched.
+    """
+
+    def __init__(self, dialect: Union[str, Dialect] = 'postgres'):
+        if isinstance(dialect, Dialect):
+            self.dialect = dialect
+            return
+        if dialect not in DIALECTS:
+            raise ValueError(f"Unknown SQL dialect {dialect!r} (choose from {', '.join(sorted(DIALECTS))})")
+        self.dialect = DIALECTS[dialect]
+
+    def normalize(self, sql: str) -> str:
+        sql = sql.strip().rstrip(';').rstrip()
+        lowered = fold_case(sql)
+        words = self.dialect.triggered(lowered)
+        if not words:
+            return sql
+        return self._rewrite(sql, lowered, words)
+
+    def _rewrite(self, sql: str, lowered: str, words: frozenset) -> str:
+        dialect = self.dialect
+        edits: List[Tuple[int, int, str]] = []   # (start, end, replacement), in order
+        # One frame per parenthesis level: [pending TOP count, has LIMIT/FETCH]
+        frames = [[None, False]]
+        trailing_comment = None
+        pos = 0
+        search = dialect.lexer(words).search
+        while True:
+            match = search(lowered, pos)
+            if match is None:
+                break
+            start, pos = match.span()
+            first = lowered[start]
+
+            if first in "'-/":
+                if pos == len(sql) and first == '-':
+                    trailing_comment = start
+                continue
+            if first in '"`[':
+                if first != dialect.identifier_quote:
+                    name = self._unquote(sql[start:pos])
+                    if name is not None:
+                        edits.append((start, pos, dialect.quote_identifier(name)))
+                continue
+            if first == '(':
+                frames.append([None, False])
+                continue
+            if first == ')':
+                if len(frames) > 1:
+                    self._close_frame(sql, frames.pop(), start, edits)
+                continue
+
+            if start and (lowered[start - 1].isalnum() or lowered[start - 1] == '_'):
+                continue   # tail of a longer identifier
+            word = match.group()
+            if word == 'top':
+                tail = TOP_TAIL_RE.match(lowered, pos) if self._after_select(lowered, start) else None
+                if tail:
+                    frames[-1][0] = tail.group(1) or tail.group(2)
+                    edits.append((start, tail.end(), ''))
+                    pos = tail.end()
+            elif word in ('limit', 'fetch'):
+                frames[-1][1] = True
+                if word.upper() not in dialect.limit_syntax:
+                    tail = (LIMIT_TAIL_RE if word == 'limit' else FETCH_TAIL_RE).match(lowered, pos)
+                    if tail:
+                        edits.append((start, tail.end(), dialect.limit(tail.group(1)).lstrip()))
+                        pos = tail.end()
+            elif word == 'interval':
+                parsed = self._parse_interval(lowered, pos)
+                if parsed:
+                    count, unit, end = parsed
+                    edits.append((start, end, dialect.interval(count, unit)))
+                    pos = end
+            elif word in ('date_sub', 'date_add'):
+                parsed = self._parse_date_call(sql, lowered, start, pos, word.upper())
+                if parsed:
+                    rendered, end = parsed
+                    edits.append((start, end, rendered))
+                    pos = end
+            elif word.upper() in dialect.functions:
+                replacement, drop_parens = dialect.functions[word.upper()]
+                call = EMPTY_CALL_RE.match(lowered, pos) if drop_parens else None
+                if call:
+                    edits.append((start, call.end(), replacement))
+                    pos = call.end()
+                elif drop_parens or CALL_RE.match(lowered, pos):
+                    edits.append((start, pos, replacement))
+
+        end = trailing_comment if trailing_comment is not None else len(sql)
+        for frame in reversed(frames):
+            self._close_frame(sql, frame, end, edits)
+        if not edits:
+            return sql
+
+        pieces = []
+        last = 0
+        for start, end, replacement in edits:
+            pieces.append(sql[last:start])
+            pieces.append(replacement)
+            last = end
+        pieces.append(sql[last:])
+        return ''.join(pieces)
+
+    def _close_frame(self, sql: str, frame: list, end: int, edits: List[Tuple[int, int, str]]):
+        count, has_limit = frame
+        if count is not None and not has_limit:
+            # Right after the last code before `end`, so the clause never lands inside a comment
+            at = len(sql[:end].rstrip())
+            edits.append((at, at, self.dialect.limit(count)))
+
+    @staticmethod
+    def _after_select(lowered: str, start: int) -> bool:
+        """TOP only counts directly after SELECT [DISTINCT | ALL], comments aside"""
+        head = lowered[:start].rstrip()
+        while head.endswith('*/') and '/*' in head:
+            head = head[:head.rfind('/*')].rstrip()
+        for keyword in ('select', 'distinct', 'all'):
+            if head.endswith(keyword):
+                before = head[-len(keyword) - 1:-len(keyword)]
+                return not (before.isalnum() or before == '_')
+        return False
+
+    @staticmethod
+    def _parse_interval(lowered: str, pos: int) -> Optional[Tuple[int, str, int]]:
+        """After INTERVAL: 90 DAY | '90' DAY | '90 day(s)' → (count, unit, end)"""
+        tail = INTERVAL_TAIL_RE.match(lowered, pos)
+        if not tail:
+            return None
+        groups = tail.groups()
+        count, unit_text = next((groups[i], groups[i + 1]) for i in (0, 2, 4) if groups[i] is not None)
+        unit = UNIT_ALIASES.get(unit_text)
+        return (int(count), unit, tail.end()) if unit else None
+
+    def _parse_date_call(self, sql: str, lowered: str, start: int, pos: int,
+                         func: str) -> Optional[Tuple[str, int]]:
+        """DATE_SUB(expr, INTERVAL n unit) → (rendered replacement, end of the call)"""
+        opening = CALL_RE.match(lowered, pos)
+        if not opening:
+            return None
+        depth = 1
+        comma = close = None
+        for token in ARGS_RE.finditer(lowered, opening.end()):
+            text = token.group()
+            if text == '(':
+                depth += 1
+            elif text == ')':
+                depth -= 1
+                if depth == 0:
+                    close = token.start()
+                    break
+            elif text == ',' and depth == 1:
+                if comma is not None:
+                    return None
+                comma = token.start()
+        if comma is None or close is None:
+            return None
+
+        interval = lowered[comma + 1:close].strip()
+        if not interval.startswith('interval'):
+            return None
+        parsed = self._parse_interval(interval, 8)
+        if not parsed or interval[parsed[2]:].strip():
+            return None
+        count, unit, _ = parsed
+
+        expr = sql[opening.end():comma].strip()
+        expr_lowered = fold_case(expr)
+        inner = self.dialect.triggered(expr_lowered)
+        if inner:
+            expr = self._rewrite(expr, expr_lowered, inner)
+        rendered = self.dialect.date_arithmetic(func, expr, count, unit)
+        if not rendered.startswith(func):
+            # Operator form: parenthesise when the call sits inside other arithmetic
+            before = sql[:start].rstrip()[-1:]
+            after = sql[close + 1:].lstrip()[:1]
+            if (before and before in ARITHMETIC) or (after and after in ARITHMETIC):
+                rendered = f"({rendered})"
+        return rendered, close + 1
+
+    @staticmethod
+    def _unquote(text: str) -> Optional[str]:
+        opener = text[0]
+        closer = ']' if opener == '[' else opener
+        if len(text) < 2 or text[-1] != closer:
+            return None  # unterminated — leave it alone
+        inner = text[1:-1]
+        return inner if opener == '[' else inner.replace(closer * 2, closer)
+
+
+_NORMALIZERS: Dict[str, SQLNormalizer] = {}
+
+
+def normalize_sql(sql: str, dialect: str = 'postgres') -> str:
+    normalizer = _NORMALIZERS.get(dialect)
+    if normalizer is None:
+        normalizer = _NORMALIZERS[dialect] = SQLNormalizer(dialect)
+    return normalizer.normalize(sql)
@@ -0,0 +1,154 @@
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+from sql_dialect import Dialect, SQLNormalizer
+
+VALID = 'valid'
+INVALID = 'invalid'
+UNVERIFIED = 'unverified'
+
+# Warehouse column types → SQLite type names (affinity is all EXPLAIN needs)
+SQLITE_TYPES = {
+    'INT': 'INTEGER', 'INTEGER': 'INTEGER', 'BIGINT': 'INTEGER', 'SMALLINT': 'INTEGER', 'BOOLEAN': 'INTEGER',
+    'DECIMAL': 'NUMERIC', 'NUMERIC': 'NUMERIC', 'FLOAT': 'REAL', 'DOUBLE': 'REAL', 'REAL': 'REAL',
+    'DATE': 'DATE', 'DATETIME': 'TIMESTAMP', 'TIMESTAMP': 'TIMESTAMP',
+}
+TYPE_NAME_RE = re.compile(r"[A-Za-z]+")
+
+# Warehouse functions SQLite lacks, registered as stubs so EXPLAIN gets as far as name resolution
+STUB_FUNCTIONS = {
+    'date_trunc': 2, 'date_part': 2, 'to_char': 2, 'to_date': 2, 'datediff': 2, 'date_format': 2,
+    'year': 1, 'quarter': 1, 'month': 1, 'week': 1, 'day': 1, 'dayofweek': 1,
+    'concat': -1, 'greatest': -1, 'least': -1,
+}
+STUB_AGGREGATES = {'string_agg': 2, 'stddev': 1, 'variance': 1, 'median': 1}
+
+# Errors that prove the SQL cannot run against the warehouse whatever its dialect. Anything else
+# (e.g. a Postgres-only cast SQLite cannot parse) says more about SQLite than about the query.
+SCHEMA_ERRORS = ('no such table', 'no such column', 'ambiguous column name', 'incomplete input')
+READ_ONLY_RE = re.compile(r"\s*(?:SELECT|WITH)\b", re.I)
+
+
+class ShadowDialect(Dialect):
+    """SQLite spellings for the constructs the pipeline's dialects emit — for preparing, not for running"""
+
+    name = 'sqlite_shadow'
+    limit_syntax = {'LIMIT'}
+    functions = dict(Dialect.functions, LEN=('LENGTH', False))
+    interval_form = r"(?!)"   # no INTERVAL is native to SQLite
+
+    def limit(self, count: str) -> str:
+        return f" LIMIT {count}"
+
+    def interval(self, count: int, unit: str) -> str:
+        # date ± n still prepares; the value never matters to EXPLAIN
+        return str(count)
+
+
+class _StubAggregate:
+    def step(self, *args):
+        pass
+
+    def finalize(self):
+        return None
+
+
+class ShadowValidator:
+    """Prepares generated SQL against empty (or synthetic-row) SQLite copies of the warehouse schemas.
+
+    Each schema gets its own shadow connection, attached under its database name so both `sales`
+    and `sales_dw.sales` resolve — and a query joining tables of two warehouses fails as it would
+    on either of them. validate() checks against the answer's target_source, or, when that names
+    no single known schema, passes if any one schema accepts the query.
+    EXPLAIN compiles the statement without executing it, unless `synthetic_rows` is set, in which
+    case the query also runs over that many generated rows per table.
+    The shadow databases are built once, up front, and shared under a lock: a check takes
+    microseconds, while building them costs milliseconds per hundred tables.
+    """
+
+    def __init__(self, schemas: Dict[str, Dict], synthetic_rows: int = 0):
+        self.synthetic_rows = synthetic_rows
+        self.scripts = {database: self._build_script(database, schema, synthetic_rows)
+                        for database, schema in schemas.items()}
+        self.normalizer = SQLNormalizer(ShadowDialect())
+        self._conns = {database.lower(): self._connect(script) for database, script in self.scripts.items()}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _build_script(database: str, schema: Dict, rows: int) -> List[str]:
+        statements = [f"ATTACH DATABASE ':memory:' AS \"{database}\""]
+        for table, info in schema['tables'].items():
+            columns = []
+            for column, column_info in info['columns'].items():
+                type_name = TYPE_NAME_RE.match(column_info.get('type', ''))
+                columns.append((column, SQLITE_TYPES.get(type_name.group().upper(), 'TEXT') if type_name else 'TEXT'))
+            ddl = ', '.join(f'"{column}" {sqlite_type}' for column, sqlite_type in columns)
+            statements.append(f'CREATE TABLE "{database}"."{table}" ({ddl})')
+            for i in range(1, rows + 1):
+                values = ', '.join(ShadowValidator._synthetic_value(column, sqlite_type, i)
+                                   for column, sqlite_type in columns)
+                statements.append(f'INSERT INTO "{database}"."{table}" VALUES ({values})')
+        return statements
+
+    @staticmethod
+    def _synthetic_value(column: str, sqlite_type: str, i: int) -> str:
+        if sqlite_type == 'INTEGER':
+            return str(i)
+        if sqlite_type in ('NUMERIC', 'REAL'):
+            return f"{i * 10.5}"
+        if sqlite_type in ('DATE', 'TIMESTAMP'):
+            return f"'2024-{(i - 1) % 12 + 1:02d}-{(i - 1) % 28 + 1:02d}'"
+        return f"'{column}_{i}'"
+
+    @staticmethod
+    def _connect(script: List[str]) -> sqlite3.Connection:
+        conn = sqlite3.connect(':memory:', check_same_thread=False)
+        for statement in script:
+            conn.execute(statement)
+        for name, arity in STUB_FUNCTIONS.items():
+            conn.create_function(name, arity, lambda *args: None)
+        for name, arity in STUB_AGGREGATES.items():
+            conn.create_aggregate(name, arity, _StubAggregate)
+        # Compile the schema now rather than inside the first check
+        conn.execute("SELECT 1 FROM sqlite_master LIMIT 1")
+        return conn
+
+    def validate(self, sql: str, source: Optional[str] = None) -> Dict:
+        """{'status': valid | invalid | unverified, 'error': str or None, 'ms': float}"""
+        start = time.perf_counter()
+        status, error = self._check(sql, source)
+        return {'status': status, 'error': error, 'ms': (time.perf_counter() - start) * 1000}
+
+    def _check(self, sql: str, source: Optional[str] = None):
+        if not READ_ONLY_RE.match(sql):
+            return INVALID, "not a read-only SELECT/WITH query"
+        shadow_sql = self.normalizer.normalize(sql)
+        source = (source or '').strip().lower()
+        databases = [source] if source in self._conns else list(self._conns)
+        outcomes = []
+        for database in databases:
+            status, error = self._prepare(self._conns[database], shadow_sql)
+            if status == VALID:
+                return VALID, None
+            outcomes.append((status, f"{error} (in {database})" if status == INVALID else error))
+        # A query joining both warehouses fails in each. Unverified anywhere beats invalid everywhere
+        return next((o for o in outcomes if o[0] == UNVERIFIED), outcomes[0])
+
+    def _prepare(self, conn: sqlite3.Connection, shadow_sql: str):
+        try:
+            with self._lock:
+                if self.synthetic_rows:
+                    conn.execute(shadow_sql).fetchmany(1)
+                else:
+                    conn.execute('EXPLAIN ' + shadow_sql)
+        except (sqlite3.Error, sqlite3.Warning) as e:
+            message = str(e)
+            if message.startswith('You can only execute one statement'):
+                return INVALID, "more than one SQL statement"
+            if message.startswith(SCHEMA_ERRORS):
+                return INVALID, message
+            return UNVERIFIED, message
+        return VALID, None